@@ -1,18 +1,32 @@
 import streamlit as st
-import netCDF4 as nc
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-import plotly.express as px
-from sklearn.cluster import KMeans
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score
-import plotly.graph_objects as go
+import calendar
+from datetime import datetime
+from typing import TYPE_CHECKING
 import warnings
 warnings.filterwarnings('ignore')
 import os
+from ocealyze.catalog import Catalog, source_fingerprint
+from ocealyze.climatology import climatology_levels, climatology_map
+from ocealyze.columnstore import is_table_cached, load_observation_table
+from ocealyze.density import RAW_POINT_LIMIT, density_cells
+from ocealyze.instrumentation import cache_miss, collect, configure_log, section, timed
+from ocealyze.models import ModelRegistry, estimator_spec, model_key
+from ocealyze.prediction import predict_grid, predict_with_spread
+from ocealyze.profiles import standard_depth_edges, uniform_depth_edges
+from ocealyze.ragged import ObservationTable
+from ocealyze.reports import DEPTH_ZONE_EDGES, DEPTH_ZONES, depth_zone_frame, summary_record
+from ocealyze.spatial import GridIndex
+from ocealyze.theme import APP_STYLE, plotly_express
+from ocealyze.timecodec import MISSING
+from ocealyze.timeseries import SeriesPartials, linear_trend, period_means, trend_band
+from ocealyze.watermass import DEFAULT_RULES, OTHER, categories, classify, parse_polygon
+
+# Plotly and scikit-learn cost seconds to import, so each tab imports what it needs on first use.
+if TYPE_CHECKING:
+    from sklearn.cluster import KMeans
+    from sklearn.ensemble import RandomForestRegressor
 
 # Set page configuration
 st.set_page_config(
@@ -22,704 +36,170 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Enhanced CSS with beautiful ocean-themed styling
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Poppins:wght@300;400;500;600;700&family=Dancing+Script:wght@400;500;600;700&display=swap');
-
-/* Enhanced Ocean Color Palette */
-:root {
-    /* Primary Ocean Colors */
-    --deep-ocean: #0B1426;
-    --midnight-blue: #1B2951;
-    --ocean-blue: #2E4F99;
-    --wave-blue: #4A90E2;
-    --aqua-blue: #00C4FF;
-    --sea-foam: #7FDBDA;
-    --coral: #FF6B6B;
-    --pearl: #F8FFFE;
-    
-    /* Gradient Colors */
-    --ocean-gradient: linear-gradient(135deg, #0B1426 0%, #1B2951 25%, #2E4F99 50%, #4A90E2 75%, #00C4FF 100%);
-    --wave-gradient: linear-gradient(45deg, #4A90E2, #00C4FF, #7FDBDA);
-    --sunset-gradient: linear-gradient(135deg, #FF6B6B, #4A90E2, #00C4FF);
-    
-    /* Glass Effects */
-    --glass-bg: rgba(255, 255, 255, 0.08);
-    --glass-border: rgba(255, 255, 255, 0.15);
-    --glass-shadow: rgba(0, 0, 0, 0.2);
-    --glass-hover: rgba(255, 255, 255, 0.12);
-    
-    /* Text Colors */
-    --text-primary: #F8FFFE;
-    --text-secondary: #B8D4F0;
-    --text-accent: #00C4FF;
-    --text-muted: #7A9CC6;
-}
-
-/* Animated Ocean Background */
-.stApp {
-    background: var(--ocean-gradient);
-    font-family: 'Poppins', sans-serif;
-    position: relative;
-    overflow-x: hidden;
-}
-
-.stApp::before {
-    content: '';
-    position: fixed;
-    top: 0;
-    left: 0;
-    width: 100%;
-    height: 100%;
-    background: 
-        radial-gradient(circle at 20% 80%, rgba(0, 196, 255, 0.1) 0%, transparent 50%),
-        radial-gradient(circle at 80% 20%, rgba(127, 219, 218, 0.1) 0%, transparent 50%),
-        radial-gradient(circle at 40% 40%, rgba(74, 144, 226, 0.05) 0%, transparent 50%);
-    animation: oceanWaves 20s ease-in-out infinite;
-    pointer-events: none;
-    z-index: -1;
-}
-
-@keyframes oceanWaves {
-    0%, 100% { 
-        transform: translateY(0px) rotate(0deg);
-        opacity: 0.7;
-    }
-    33% { 
-        transform: translateY(-10px) rotate(1deg);
-        opacity: 0.9;
-    }
-    66% { 
-        transform: translateY(5px) rotate(-1deg);
-        opacity: 0.8;
-    }
-}
-
-/* Enhanced Main Container */
-.main .block-container {
-    padding-top: 6rem !important;
-    margin-top: 0 !important;
-    padding-bottom: 2rem;
-    max-width: 1400px;
-    backdrop-filter: blur(10px);
-}
-
-/* Hide Streamlit Elements */
-.stApp > header { display: none !important; }
-#MainMenu { visibility: hidden; }
-footer { visibility: hidden; }
-.stDeployButton { display: none; }
-.stDecoration { display: none; }
-
-/* Enhanced TideTrace Navigation */
-.tidetrace-navbar {
-    background: rgba(11, 20, 38, 0.9);
-    backdrop-filter: blur(20px);
-    -webkit-backdrop-filter: blur(20px);
-    padding: 1rem 2rem;
-    border-bottom: 1px solid var(--glass-border);
-    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-    position: fixed;
-    top: 0;
-    left: 0;
-    right: 0;
-    z-index: 1000;
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-}
-
-.tidetrace-navbar.hidden {
-    transform: translateY(-100%);
-}
-
-.tidetrace-title {
-    font-family: 'Dancing Script', cursive;
-    font-size: 4rem;
-    font-weight: 700;
-    background: linear-gradient(45deg, #00C4FF, #7FDBDA, #4A90E2);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    background-clip: text;
-    text-align: center;
-    margin: 0;
-    letter-spacing: 3px;
-    text-shadow: 0 0 30px rgba(0, 196, 255, 0.5);
-    animation: titleGlow 3s ease-in-out infinite alternate;
-    position: relative;
-}
-
-.tidetrace-title::after {
-    content: '';
-    position: absolute;
-    bottom: -10px;
-    left: 50%;
-    transform: translateX(-50%);
-    width: 100px;
-    height: 3px;
-    background: var(--wave-gradient);
-    border-radius: 2px;
-    animation: waveFlow 2s ease-in-out infinite;
-}
-
-@keyframes titleGlow {
-    from {
-        filter: drop-shadow(0 0 20px rgba(0, 196, 255, 0.7));
-    }
-    to {
-        filter: drop-shadow(0 0 40px rgba(127, 219, 218, 0.9));
-    }
-}
-
-@keyframes waveFlow {
-    0%, 100% { width: 100px; }
-    50% { width: 150px; }
-}
-
-.main {
-    padding-top: 120px !important;
-}
-
-/* Enhanced Section Headers */
-.sub-header {
-    font-size: 2rem;
-    font-weight: 600;
-    color: var(--text-primary);
-    margin: 2rem 0 1.5rem;
-    padding: 1.5rem 2rem;
-    background: var(--glass-bg);
-    backdrop-filter: blur(15px);
-    -webkit-backdrop-filter: blur(15px);
-    border-radius: 20px;
-    border: 1px solid var(--glass-border);
-    box-shadow: 0 8px 32px var(--glass-shadow);
-    position: relative;
-    overflow: hidden;
-    animation: slideInUp 0.8s cubic-bezier(0.4, 0, 0.2, 1);
-}
-
-.sub-header::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    height: 4px;
-    background: var(--wave-gradient);
-    animation: shimmer 2s ease-in-out infinite;
-}
-
-@keyframes shimmer {
-    0% { transform: translateX(-100%); }
-    100% { transform: translateX(100%); }
-}
-
-@keyframes slideInUp {
-    from {
-        opacity: 0;
-        transform: translateY(30px);
-    }
-    to {
-        opacity: 1;
-        transform: translateY(0);
-    }
-}
-
-/* Enhanced Card Containers */
-.card-container {
-    background: var(--glass-bg);
-    backdrop-filter: blur(20px);
-    -webkit-backdrop-filter: blur(20px);
-    border-radius: 24px;
-    border: 1px solid var(--glass-border);
-    box-shadow: 
-        0 8px 32px rgba(0, 0, 0, 0.2),
-        inset 0 1px 0 rgba(255, 255, 255, 0.1);
-    padding: 2rem;
-    margin-bottom: 2rem;
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-    position: relative;
-    overflow: hidden;
-    animation: fadeInScale 0.6s cubic-bezier(0.4, 0, 0.2, 1);
-}
-
-.card-container::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    height: 1px;
-    background: var(--wave-gradient);
-}
-
-.card-container:hover {
-    transform: translateY(-8px) scale(1.02);
-    box-shadow: 
-        0 20px 60px rgba(0, 0, 0, 0.3),
-        0 0 40px rgba(0, 196, 255, 0.1),
-        inset 0 1px 0 rgba(255, 255, 255, 0.2);
-    background: var(--glass-hover);
-}
-
-@keyframes fadeInScale {
-    from {
-        opacity: 0;
-        transform: scale(0.9);
-    }
-    to {
-        opacity: 1;
-        transform: scale(1);
-    }
-}
-
-/* Enhanced Metrics */
-.stMetric {
-    background: var(--glass-bg);
-    backdrop-filter: blur(15px);
-    -webkit-backdrop-filter: blur(15px);
-    border-radius: 16px;
-    padding: 1.5rem;
-    border: 1px solid var(--glass-border);
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);
-    position: relative;
-    overflow: hidden;
-}
-
-.stMetric::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    width: 100%;
-    height: 2px;
-    background: var(--wave-gradient);
-    transform: translateX(-100%);
-    animation: loadingBar 2s ease-in-out infinite;
-}
-
-.stMetric:hover {
-    transform: translateY(-4px);
-    box-shadow: 0 12px 40px rgba(0, 196, 255, 0.2);
-    background: var(--glass-hover);
-}
-
-@keyframes loadingBar {
-    0% { transform: translateX(-100%); }
-    50% { transform: translateX(0%); }
-    100% { transform: translateX(100%); }
-}
-
-/* Enhanced Sidebar */
-[data-testid="stSidebar"] {
-    background: rgba(11, 20, 38, 0.95);
-    backdrop-filter: blur(20px);
-    -webkit-backdrop-filter: blur(20px);
-    border-right: 1px solid var(--glass-border);
-    box-shadow: 4px 0 20px rgba(0, 0, 0, 0.3);
-}
-
-.sidebar-header {
-    background: var(--glass-bg);
-    backdrop-filter: blur(15px);
-    -webkit-backdrop-filter: blur(15px);
-    padding: 1rem;
-    border-radius: 16px;
-    margin: 1rem 0;
-    text-align: center;
-    box-shadow: 0 4px 20px rgba(0, 0, 0, 0.2);
-    border: 1px solid var(--glass-border);
-    position: relative;
-    overflow: hidden;
-}
-
-.sidebar-header::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    height: 2px;
-    background: var(--wave-gradient);
-}
-
-.sidebar-header h2 {
-    color: var(--text-primary);
-    margin: 0;
-    font-size: 1.5rem;
-    font-weight: 600;
-}
-
-/* Enhanced Buttons */
-[data-testid="stSidebar"] .stButton > button,
-.stButton > button {
-    background: var(--glass-bg);
-    color: var(--text-primary);
-    border: 1px solid var(--glass-border);
-    border-radius: 12px;
-    padding: 0.8rem 1.2rem;
-    font-weight: 500;
-    font-size: 0.95rem;
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-    width: 100%;
-    margin-bottom: 0.5rem;
-    position: relative;
-    overflow: hidden;
-    backdrop-filter: blur(10px);
-    -webkit-backdrop-filter: blur(10px);
-}
-
-[data-testid="stSidebar"] .stButton > button::before,
-.stButton > button::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: -100%;
-    width: 100%;
-    height: 100%;
-    background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.1), transparent);
-    transition: left 0.5s;
-}
-
-[data-testid="stSidebar"] .stButton > button:hover,
-.stButton > button:hover {
-    background: var(--glass-hover);
-    color: var(--text-accent);
-    transform: translateY(-2px);
-    box-shadow: 0 8px 25px rgba(0, 196, 255, 0.2);
-    border-color: var(--text-accent);
-}
-
-[data-testid="stSidebar"] .stButton > button:hover::before,
-.stButton > button:hover::before {
-    left: 100%;
-}
-
-[data-testid="stSidebar"] .stButton > button:active,
-.stButton > button:active {
-    transform: translateY(0px);
-    box-shadow: 0 4px 15px rgba(0, 196, 255, 0.3);
-}
-
-/* Enhanced Chart Containers */
-.plotly-chart-container {
-    background: var(--glass-bg);
-    backdrop-filter: blur(20px);
-    -webkit-backdrop-filter: blur(20px);
-    border-radius: 20px;
-    overflow: hidden;
-    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-    padding: 1.5rem;
-    margin: 1.5rem 0;
-    border: 1px solid var(--glass-border);
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-    position: relative;
-}
-
-.plotly-chart-container::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    height: 2px;
-    background: var(--wave-gradient);
-}
-
-.plotly-chart-container:hover {
-    box-shadow: 0 16px 50px rgba(0, 0, 0, 0.3);
-    transform: translateY(-4px);
-}
-
-/* Enhanced DataFrames */
-.stDataFrame {
-    border-radius: 16px;
-    overflow: hidden;
-    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-    background: var(--glass-bg);
-    backdrop-filter: blur(15px);
-    -webkit-backdrop-filter: blur(15px);
-    border: 1px solid var(--glass-border);
-}
-
-/* Enhanced Messages */
-.stSuccess {
-    background: rgba(127, 219, 218, 0.1);
-    backdrop-filter: blur(10px);
-    -webkit-backdrop-filter: blur(10px);
-    border-left: 4px solid #7FDBDA;
-    border-radius: 12px;
-    color: var(--text-primary);
-}
-
-.stError {
-    background: rgba(255, 107, 107, 0.1);
-    backdrop-filter: blur(10px);
-    -webkit-backdrop-filter: blur(10px);
-    border-left: 4px solid #FF6B6B;
-    border-radius: 12px;
-    color: var(--text-primary);
-}
-
-.stWarning {
-    background: rgba(255, 193, 7, 0.1);
-    backdrop-filter: blur(10px);
-    -webkit-backdrop-filter: blur(10px);
-    border-left: 4px solid #FFC107;
-    border-radius: 12px;
-    color: var(--text-primary);
-}
-
-.stInfo {
-    background: var(--glass-bg);
-    backdrop-filter: blur(10px);
-    -webkit-backdrop-filter: blur(10px);
-    border-left: 4px solid var(--text-accent);
-    border-radius: 12px;
-    color: var(--text-primary);
-}
-
-/* Enhanced Input Elements */
-.stSelectbox > div > div,
-.stSlider > div,
-.stNumberInput > div {
-    background: var(--glass-bg);
-    backdrop-filter: blur(10px);
-    -webkit-backdrop-filter: blur(10px);
-    border-radius: 12px;
-    border: 1px solid var(--glass-border);
-}
-
-/* Floating Elements Animation */
-@keyframes float {
-    0%, 100% { transform: translateY(0px); }
-    50% { transform: translateY(-10px); }
-}
-
-.floating {
-    animation: float 3s ease-in-out infinite;
-}
-
-/* Pulse Animation for Interactive Elements */
-@keyframes pulse {
-    0% { box-shadow: 0 0 0 0 rgba(0, 196, 255, 0.4); }
-    70% { box-shadow: 0 0 0 10px rgba(0, 196, 255, 0); }
-    100% { box-shadow: 0 0 0 0 rgba(0, 196, 255, 0); }
-}
-
-.pulse {
-    animation: pulse 2s infinite;
-}
-
-/* Responsive Design */
-@media (max-width: 768px) {
-    .tidetrace-title {
-        font-size: 2.5rem;
-    }
-    
-    .card-container {
-        padding: 1.5rem;
-        margin-bottom: 1.5rem;
-    }
-    
-    .sub-header {
-        font-size: 1.5rem;
-        padding: 1rem 1.5rem;
-    }
-}
-
-/* Custom Scrollbar */
-::-webkit-scrollbar {
-    width: 8px;
-}
-
-::-webkit-scrollbar-track {
-    background: rgba(11, 20, 38, 0.3);
-}
-
-::-webkit-scrollbar-thumb {
-    background: var(--wave-gradient);
-    border-radius: 4px;
-}
-
-::-webkit-scrollbar-thumb:hover {
-    background: linear-gradient(45deg, #00C4FF, #7FDBDA);
-}
-
-/* Text Styling */
-h1, h2, h3, h4, h5, h6 {
-    color: var(--text-primary) !important;
-}
-
-p, span, div {
-    color: var(--text-secondary) !important;
-}
-
-.metric-label {
-    color: var(--text-muted) !important;
-}
-
-.metric-value {
-    color: var(--text-primary) !important;
-    font-weight: 600 !important;
-}
-</style>
-
-<script>
-// Enhanced navbar scroll behavior
-document.addEventListener('DOMContentLoaded', function() {
-    let lastScrollTop = 0;
-    let ticking = false;
-    
-    function updateNavbar() {
-        const navbar = document.querySelector('.tidetrace-navbar');
-        const scrollTop = window.pageYOffset || document.documentElement.scrollTop;
-        
-        if (scrollTop > lastScrollTop && scrollTop > 100) {
-            if (navbar) {
-                navbar.classList.add('hidden');
-            }
-        } else {
-            if (navbar) {
-                navbar.classList.remove('hidden');
-            }
-        }
-        
-        lastScrollTop = scrollTop;
-        ticking = false;
-    }
-    
-    function requestTick() {
-        if (!ticking) {
-            requestAnimationFrame(updateNavbar);
-            ticking = true;
-        }
-    }
-    
-    window.addEventListener('scroll', requestTick);
-    
-    // Add floating animation to cards
-    setTimeout(() => {
-        const cards = document.querySelectorAll('.card-container');
-        cards.forEach((card, index) => {
-            setTimeout(() => {
-                card.style.animationDelay = `${index * 0.1}s`;
-                card.classList.add('floating');
-            }, index * 100);
-        });
-    }, 1000);
-});
-</script>
-""", unsafe_allow_html=True)
-
-# Enhanced Plotly theme with ocean colors
-custom_theme = {
-    "layout": {
-        "plot_bgcolor": "rgba(255, 255, 255, 0.05)",
-        "paper_bgcolor": "rgba(255, 255, 255, 0.05)",
-        "font": {"family": "Poppins, sans-serif", "color": "#F8FFFE", "size": 12},
-        "xaxis": {
-            "gridcolor": "rgba(255, 255, 255, 0.1)",
-            "linecolor": "rgba(255, 255, 255, 0.2)",
-            "tickcolor": "rgba(255, 255, 255, 0.2)",
-            "titlefont": {"color": "#F8FFFE"}
-        },
-        "yaxis": {
-            "gridcolor": "rgba(255, 255, 255, 0.1)",
-            "linecolor": "rgba(255, 255, 255, 0.2)",
-            "tickcolor": "rgba(255, 255, 255, 0.2)",
-            "titlefont": {"color": "#F8FFFE"}
-        },
-        "colorway": ["#00C4FF", "#7FDBDA", "#4A90E2", "#FF6B6B", "#2E4F99", "#1B2951"]
-    }
-}
-
-px.defaults.template = custom_theme
+st.markdown(APP_STYLE, unsafe_allow_html=True)
 
 class StreamlitWODAnalyzer:
     def __init__(self):
         self.default_file_path = r"C:\Users\Memoona\Desktop\WOD\WOD1.nc"
+        self.max_observations = 2_000_000
+        self.load_workers = min(os.cpu_count() or 1, 8)
         self.parameters = {
             'Temperature': {'variable': 'Temperature', 'unit': '°C', 'color': '#00C4FF', 'icon': '🌡️'},
             'Salinity': {'variable': 'Salinity', 'unit': 'PSU', 'color': '#7FDBDA', 'icon': '🧂'},
             'Oxygen': {'variable': 'Oxygen', 'unit': 'µmol/kg', 'color': '#4A90E2', 'icon': '💨'}
         }
+        # (lat_min, lat_max, lon_min, lon_max); lon_min > lon_max wraps across 180°
+        self.regions = {
+            '🌍 Global Ocean': None,
+            '🌊 North Atlantic': (0.0, 65.0, -80.0, 0.0),
+            '🌊 South Atlantic': (-60.0, 0.0, -70.0, 20.0),
+            '🌏 North Pacific': (0.0, 65.0, 120.0, -100.0),
+            '🌏 South Pacific': (-60.0, 0.0, 150.0, -70.0),
+            '🌴 Indian Ocean': (-60.0, 30.0, 20.0, 120.0),
+            '🧊 Southern Ocean': (-90.0, -60.0, -180.0, 180.0),
+            '❄️ Arctic Ocean': (65.0, 90.0, -180.0, 180.0),
+            '🏛️ Mediterranean Sea': (30.0, 46.0, -6.0, 36.0),
+            '✏️ Custom Bounding Box': 'custom'
+        }
 
-    @st.cache_resource
-    def load_data(_self, file_path: str) -> nc.Dataset:
+    # Per-file caches are bounded so switching between many files does not grow memory without limit.
+    @timed(cached=True)
+    @st.cache_resource(max_entries=8)
+    def get_catalog(_self, data_path: str, data_key: str) -> Catalog:
+        cache_miss()
         try:
-            if not os.path.exists(file_path):
-                st.error(f"📁 File not found at: {file_path}. Please verify the file path.")
+            if not os.path.exists(data_path):
+                st.error(f"📁 Nothing found at: {data_path}. Please verify the file or directory path.")
                 return None
-            dataset = nc.Dataset(file_path, 'r')
-            return dataset
-        except FileNotFoundError:
-            st.error(f"❌ FileNotFoundError: The file {file_path} does not exist.")
-            return None
+            return Catalog.scan(data_path, max_workers=_self.load_workers)
         except OSError as e:
-            st.error(f"❌ OSError: Failed to open {file_path}. It may be corrupted or not a valid NetCDF file.")
+            st.error(f"❌ OSError: Failed to read {data_path}. A file may be corrupted or not a valid NetCDF file.")
             st.error(f"Error details: {str(e)}")
             return None
         except Exception as e:
-            st.error(f"❌ Unexpected error loading NetCDF file {file_path}: {str(e)}")
+            st.error(f"❌ Unexpected error cataloguing {data_path}: {str(e)}")
             return None
 
-    @st.cache_data
-    def get_basic_metadata(_self, _dataset: nc.Dataset) -> dict:
-        if _dataset is None:
-            return None
+    @timed(cached=True)
+    @st.cache_data(max_entries=32)
+    def get_basic_metadata(_self, _catalog: Catalog, data_key: str) -> dict:
+        cache_miss()
         try:
-            metadata = {
-                'total_casts': len(_dataset.dimensions.get('casts', [])),
-                'total_temperature_obs': len(_dataset.dimensions.get('Temperature_obs', [])),
-                'total_salinity_obs': len(_dataset.dimensions.get('Salinity_obs', [])),
-                'total_oxygen_obs': len(_dataset.dimensions.get('Oxygen_obs', [])),
-                'depth_obs': len(_dataset.dimensions.get('z_obs', []))
-            }
-
-            lat = _dataset.variables.get('lat', None)
-            lon = _dataset.variables.get('lon', None)
-            if lat is None or lon is None:
-                metadata['lat_range'] = (None, None)
-                metadata['lon_range'] = (None, None)
-            else:
-                lat_valid = lat[lat != lat._FillValue] if hasattr(lat, '_FillValue') else lat[:]
-                lon_valid = lon[lon != lon._FillValue] if hasattr(lon, '_FillValue') else lon[:]
-                metadata['lat_range'] = (float(lat_valid.min()), float(lat_valid.max())) if len(lat_valid) > 0 else (None, None)
-                metadata['lon_range'] = (float(lon_valid.min()), float(lon_valid.max())) if len(lon_valid) > 0 else (None, None)
-
-            time_var = _dataset.variables.get('time', None)
-            if time_var is None:
-                metadata['time_range'] = (None, None)
-            else:
-                time_vals = time_var[:]
-                time_valid = time_vals[time_vals != time_var._FillValue] if hasattr(time_var, '_FillValue') else time_vals
-                base_date = datetime(1770, 1, 1)
-                min_date = base_date + timedelta(days=float(time_valid.min())) if len(time_valid) > 0 else None
-                max_date = base_date + timedelta(days=float(time_valid.max())) if len(time_valid) > 0 else None
-                metadata['time_range'] = (min_date, max_date)
-
-            return metadata
+            return _catalog.metadata()
         except Exception as e:
             st.error(f"❌ Error extracting metadata: {e}")
             return None
 
-    @st.cache_data
-    def get_valid_data(_self, _dataset: nc.Dataset, variable: str, sample_size: int = None) -> np.ndarray:
+    @timed(cached=True)
+    @st.cache_resource(max_entries=4)
+    def get_observation_table(_self, _catalog: Catalog, data_path: str, data_key: str,
+                              sample_size: int = None) -> ObservationTable:
+        cache_miss()
         try:
-            data = _dataset.variables.get(variable, None)
-            if data is None:
-                st.warning(f"⚠️ Variable '{variable}' not found in dataset.")
-                return np.array([])
-            if sample_size:
-                indices = np.random.choice(len(data), min(sample_size, len(data)), replace=False)
-                data = data[indices]
-            valid_data = data[data != data._FillValue] if hasattr(data, '_FillValue') else data[:]
-            return valid_data.astype(np.float32)
+            variables = [info['variable'] for info in _self.parameters.values()]
+            return _catalog.table(variables, max_observations=sample_size, seed=42)
         except Exception as e:
-            st.error(f"❌ Error extracting data for {variable}: {e}")
-            return np.array([])
+            st.error(f"❌ Error building observation table for {data_path}: {e}")
+            return None
+
+    @timed()
+    def convert_observation_table(self, catalog: Catalog, sample_size: int = None):
+        variables = [info['variable'] for info in self.parameters.values()]
+        pending = [
+            (info['path'], budget) for info, budget in zip(catalog.files, catalog.budgets(catalog.files, sample_size))
+            if not is_table_cached(info['path'], variables, sample_size=budget, seed=42, root=catalog.root)
+        ]
+        if not pending:
+            return
+
+        progress_bar = st.progress(0.0, text="📥 Reading cast and observation variables...")
+        for position, (file_path, budget) in enumerate(pending):
+            def report(done, total, name):
+                progress_bar.progress(
+                    (position + done / total) / len(pending),
+                    text=f"📥 Loaded {name} ({done}/{total}) from {os.path.basename(file_path)}"
+                )
+
+            try:
+                load_observation_table(
+                    file_path, variables, sample_size=budget, seed=42, root=catalog.root,
+                    max_workers=self.load_workers, progress=report
+                )
+            except Exception:
+                # get_observation_table reports the failure when it retries the build.
+                pass
+        progress_bar.empty()
+
+    @st.cache_resource
+    def get_model_registry(_self, cache_dir: str) -> ModelRegistry:
+        return ModelRegistry(os.path.join(cache_dir, 'models'))
+
+    @timed(cached=True)
+    @st.cache_resource(max_entries=8)
+    def get_spatial_index(_self, _table: ObservationTable, data_key: str, sample_size: int = None) -> GridIndex:
+        cache_miss()
+        return GridIndex(_table.casts['lat'], _table.casts['lon'], resolution=1.0)
+
+    @timed(cached=True)
+    @st.cache_resource(max_entries=8)
+    def get_region_table(_self, _table: ObservationTable, data_key: str, sample_size: int, bounds: tuple) -> ObservationTable:
+        cache_miss()
+        index = _self.get_spatial_index(_table, data_key, sample_size)
+        return _table.select_casts(index.query_bbox(*bounds))
+
+    def select_region(self) -> tuple:
+        st.markdown("#### 🧭 Region Filter")
+        region = st.selectbox("Restrict analyses to:", list(self.regions.keys()))
+        bounds = self.regions[region]
+        if bounds == 'custom':
+            col1, col2 = st.columns(2)
+            with col1:
+                lat_min = st.number_input("Lat min (°)", -90.0, 90.0, -30.0, step=1.0)
+                lon_min = st.number_input("Lon min (°)", -180.0, 180.0, -60.0, step=1.0)
+            with col2:
+                lat_max = st.number_input("Lat max (°)", -90.0, 90.0, 30.0, step=1.0)
+                lon_max = st.number_input("Lon max (°)", -180.0, 180.0, 60.0, step=1.0)
+            bounds = (min(lat_min, lat_max), max(lat_min, lat_max), lon_min, lon_max)
+        return region, bounds
+
+    def show_figure(self, fig):
+        with section('plotly_chart', traces=len(fig.data)):
+            st.plotly_chart(fig, use_container_width=True)
+
+    def display_performance(self, records: list):
+        records = [record for record in records if record is not None]
+        history = st.session_state.setdefault('performance_history', {})
+        for record in records:
+            totals = history.setdefault(record['section'], {'calls': 0, 'seconds': 0.0, 'hit': 0, 'miss': 0})
+            totals['calls'] += 1
+            totals['seconds'] += record['seconds']
+            if record['cache'] is not None:
+                totals[record['cache']] += 1
+
+        with st.expander("⏱️ Performance", expanded=True):
+            total = sum(record['seconds'] for record in records if record['depth'] == 0)
+            st.caption(f"This run: {total:.2f} s in {len(records)} timed sections")
+            st.dataframe(pd.DataFrame({
+                'Section': ['· ' * record['depth'] + record['section'] for record in records],
+                'Seconds': [round(record['seconds'], 3) for record in records],
+                'Rows': [record['rows'] for record in records],
+                'MB read': [round(record['bytes_read'] / 1e6, 1) for record in records],
+                'Hits': [record['cache_hits'] for record in records],
+                'Misses': [record['cache_misses'] for record in records],
+            }), hide_index=True, use_container_width=True)
+
+            st.caption("This session")
+            session = pd.DataFrame.from_dict(history, orient='index').rename_axis('Section').reset_index()
+            lookups = session['hit'] + session['miss']
+            session['Hit rate'] = (session['hit'] / lookups.where(lookups > 0)).map(
+                lambda rate: '' if pd.isna(rate) else f"{rate:.0%}"
+            )
+            session['Mean s'] = (session['seconds'] / session['calls']).round(3)
+            st.dataframe(
+                session[['Section', 'calls', 'Mean s', 'Hit rate']].rename(columns={'calls': 'Calls'})
+                .sort_values('Mean s', ascending=False),
+                hide_index=True, use_container_width=True
+            )
 
     def display_header(self):
         st.markdown(
@@ -731,6 +211,7 @@ class StreamlitWODAnalyzer:
             unsafe_allow_html=True
         )
 
+    @timed()
     def display_overview_metrics(self, metadata: dict):
         st.markdown('<h2 class="sub-header">🌊 Dataset Overview & Ocean Statistics</h2>', unsafe_allow_html=True)
         
@@ -770,29 +251,66 @@ class StreamlitWODAnalyzer:
             
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_geographic_map(self, data_cache: dict, sample_size: int = 1000):
+    @timed(cached=True)
+    @st.cache_data(max_entries=16)
+    def get_density_cells(_self, _table: ObservationTable, data_key: str, bounds: tuple, resolution: float) -> pd.DataFrame:
+        cache_miss()
+        return pd.DataFrame(density_cells(_table.casts['lat'], _table.casts['lon'], resolution))
+
+    @timed()
+    def create_geographic_map(self, table: ObservationTable, data_key: str, bounds: tuple, sample_size: int = 1000):
+        px = plotly_express()
+
         st.markdown('<h2 class="sub-header">🗺️ Global Ocean Measurement Distribution</h2>', unsafe_allow_html=True)
         
         with st.container():
             st.markdown('<div class="card-container">', unsafe_allow_html=True)
             
-            sample_size = st.slider("🎛️ Sample Size for Map", 500, 5000, sample_size, step=500)
-            lat = data_cache['lat'][:sample_size]
-            lon = data_cache['lon'][:sample_size]
-            
-            if len(lat) == 0 or len(lon) == 0:
+            positioned = np.isfinite(table.casts['lat']) & np.isfinite(table.casts['lon'])
+            n_positions = int(positioned.sum())
+            if n_positions == 0:
                 st.warning("⚠️ No valid geographic data available.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
 
-            fig = px.scatter_mapbox(
-                lat=lat,
-                lon=lon,
-                zoom=1,
-                height=600,
-                title=f"🌍 Global Distribution of {len(lat):,} Measurement Locations",
-                color_discrete_sequence=['#00C4FF']
-            )
+            col1, col2 = st.columns(2)
+            with col1:
+                mode = st.radio("🗺️ Map Mode", ["Auto", "Points", "Density"], horizontal=True)
+            if mode == "Auto":
+                mode = "Points" if n_positions <= RAW_POINT_LIMIT else "Density"
+
+            if mode == "Points":
+                with col2:
+                    sample_size = st.slider("🎛️ Sample Size for Map", 500, 5000, sample_size, step=500)
+                lat = table.casts['lat'][positioned][:sample_size]
+                lon = table.casts['lon'][positioned][:sample_size]
+                fig = px.scatter_mapbox(
+                    lat=lat,
+                    lon=lon,
+                    zoom=1,
+                    height=600,
+                    title=f"🌍 Global Distribution of {len(lat):,} Measurement Locations",
+                    color_discrete_sequence=['#00C4FF']
+                )
+                message = f"📍 Successfully visualized {len(lat):,} measurement locations across global oceans"
+            else:
+                with col2:
+                    resolution = st.select_slider("🎛️ Grid Resolution (degrees)", [0.5, 1.0, 2.0, 5.0], value=2.0)
+                cells = self.get_density_cells(table, data_key, bounds, resolution)
+                fig = px.density_mapbox(
+                    cells,
+                    lat='lat',
+                    lon='lon',
+                    z=np.log10(cells['count'] + 1).round(2),
+                    hover_data={'count': True},
+                    radius=max(4, int(8 * resolution)),
+                    zoom=1,
+                    height=600,
+                    title=f"🌍 Density of {n_positions:,} Measurement Locations ({len(cells):,} cells of {resolution}°)",
+                    color_continuous_scale=['#1B2951', '#2E4F99', '#4A90E2', '#00C4FF', '#7FDBDA']
+                )
+                fig.update_layout(coloraxis_colorbar=dict(title="log₁₀ casts"))
+                message = f"📍 Aggregated all {n_positions:,} measurement locations into {len(cells):,} grid cells"
             
             fig.update_layout(
                 mapbox_style="open-street-map",
@@ -805,26 +323,49 @@ class StreamlitWODAnalyzer:
             )
             
             st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(fig)
             st.markdown('</div>', unsafe_allow_html=True)
             
-            st.success(f"📍 Successfully visualized {len(lat):,} measurement locations across global oceans")
+            st.success(message)
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_depth_analysis(self, data_cache: dict):
+    @timed(cached=True)
+    @st.cache_data(max_entries=64)
+    def get_histogram(_self, _catalog: Catalog, data_key: str, bounds: tuple, variable: str, bins: int = 50,
+                      edges: tuple = None, filter_name: str = None, right: bool = False) -> tuple:
+        cache_miss()
+        return _catalog.histogram(variable, bins, edges, bounds=bounds, filter_name=filter_name, right=right)
+
+    @timed(cached=True)
+    @st.cache_data(max_entries=64)
+    def get_summary(_self, _catalog: Catalog, data_key: str, bounds: tuple, variable: str,
+                    filter_name: str = None) -> dict:
+        cache_miss()
+        return _catalog.summarize(variable, bounds, filter_name=filter_name).to_dict()
+
+    def histogram_figure(self, counts: np.ndarray, edges: np.ndarray, title: str, x_label: str, color: str):
+        px = plotly_express()
+
+        fig = px.bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            title=title,
+            labels={'x': x_label, 'y': 'Frequency'},
+            color_discrete_sequence=[color]
+        )
+        fig.update_traces(width=np.diff(edges), marker_line_width=0)
+        fig.update_layout(bargap=0)
+        return fig
+
+    @timed()
+    def create_depth_analysis(self, table: ObservationTable, catalog: Catalog, data_key: str, bounds: tuple):
         st.markdown('<h2 class="sub-header">🌊 Ocean Depth Analysis</h2>', unsafe_allow_html=True)
         
         with st.container():
             st.markdown('<div class="card-container">', unsafe_allow_html=True)
             
-            depths = data_cache['z']
-            if len(depths) == 0:
-                st.warning("⚠️ No valid depth data available.")
-                st.markdown('</div>', unsafe_allow_html=True)
-                return
-
-            valid_depths = depths[depths > 0]
-            if len(valid_depths) == 0:
+            summary = self.get_summary(catalog, data_key, bounds, 'z', filter_name='positive')
+            if summary['count'] == 0:
                 st.warning("⚠️ No positive depth data available.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
@@ -835,35 +376,24 @@ class StreamlitWODAnalyzer:
                 stats_df = pd.DataFrame({
                     'Statistic': ['Minimum Depth', 'Maximum Depth', 'Mean Depth', 'Median Depth', 'Standard Deviation'],
                     'Value (meters)': [
-                        f"{valid_depths.min():.1f}",
-                        f"{valid_depths.max():.1f}",
-                        f"{valid_depths.mean():.1f}",
-                        f"{np.median(valid_depths):.1f}",
-                        f"{valid_depths.std():.1f}"
+                        f"{summary['min']:.1f}",
+                        f"{summary['max']:.1f}",
+                        f"{summary['mean']:.1f}",
+                        f"{summary['median']:.1f}",
+                        f"{summary['std']:.1f}"
                     ]
                 })
                 st.dataframe(stats_df, use_container_width=True)
 
             with col2:
                 st.markdown("#### 🌊 Depth Zone Distribution")
-                ranges = [
-                    ("🏖️ Surface (0-50m)", np.sum((valid_depths >= 0) & (valid_depths <= 50))),
-                    ("🐠 Shallow (50-200m)", np.sum((valid_depths > 50) & (valid_depths <= 200))),
-                    ("🐙 Mid-depth (200-1000m)", np.sum((valid_depths > 200) & (valid_depths <= 1000))),
-                    ("🦑 Deep (1000-4000m)", np.sum((valid_depths > 1000) & (valid_depths <= 4000))),
-                    ("🕳️ Abyssal (>4000m)", np.sum(valid_depths > 4000))
-                ]
-                range_df = pd.DataFrame(ranges, columns=['Depth Zone', 'Count'])
-                range_df['Percentage'] = (range_df['Count'] / len(valid_depths) * 100).round(2)
-                st.dataframe(range_df, use_container_width=True)
-
-            fig = px.histogram(
-                x=valid_depths[:2000],
-                nbins=50,
-                title="📊 Ocean Depth Distribution",
-                labels={'x': 'Depth (meters)', 'y': 'Frequency'},
-                color_discrete_sequence=['#7FDBDA']
-            )
+                zone_counts, _ = self.get_histogram(
+                    catalog, data_key, bounds, 'z', edges=DEPTH_ZONE_EDGES, filter_name='positive', right=True
+                )
+                st.dataframe(depth_zone_frame(zone_counts), use_container_width=True)
+
+            counts, edges = self.get_histogram(catalog, data_key, bounds, 'z', bins=50, filter_name='positive')
+            fig = self.histogram_figure(counts, edges, f"📊 Ocean Depth Distribution ({counts.sum():,} observations)", 'Depth (meters)', '#7FDBDA')
             fig.update_layout(
                 height=450, 
                 title_font_size=18,
@@ -871,11 +401,12 @@ class StreamlitWODAnalyzer:
             )
             
             st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(fig)
             st.markdown('</div>', unsafe_allow_html=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_parameter_analysis(self, data_cache: dict):
+    @timed()
+    def create_parameter_analysis(self, table: ObservationTable, catalog: Catalog, data_key: str, bounds: tuple):
         st.markdown('<h2 class="sub-header">🔬 Oceanographic Parameter Analysis</h2>', unsafe_allow_html=True)
         
         with st.container():
@@ -883,9 +414,9 @@ class StreamlitWODAnalyzer:
             
             parameter = st.selectbox("🎯 Select Parameter for Analysis:", list(self.parameters.keys()))
             param_info = self.parameters[parameter]
-            data = data_cache[param_info['variable']]
+            summary = self.get_summary(catalog, data_key, bounds, param_info['variable'])
             
-            if len(data) == 0:
+            if summary['count'] == 0:
                 st.warning(f"⚠️ No valid data available for {parameter}.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
@@ -894,32 +425,45 @@ class StreamlitWODAnalyzer:
             with col1:
                 st.markdown(f"#### {param_info['icon']} {parameter} Statistics")
                 stats_data = {
-                    'Total Measurements': f"{len(data):,}",
-                    'Mean Value': f"{data.mean():.3f} {param_info['unit']}",
-                    'Standard Deviation': f"{data.std():.3f} {param_info['unit']}",
-                    'Minimum Value': f"{data.min():.3f} {param_info['unit']}",
-                    'Maximum Value': f"{data.max():.3f} {param_info['unit']}",
-                    'Median Value': f"{np.median(data):.3f} {param_info['unit']}"
+                    'Total Measurements': f"{summary['count']:,}",
+                    'Mean Value': f"{summary['mean']:.3f} {param_info['unit']}",
+                    'Standard Deviation': f"{summary['std']:.3f} {param_info['unit']}",
+                    'Minimum Value': f"{summary['min']:.3f} {param_info['unit']}",
+                    'Maximum Value': f"{summary['max']:.3f} {param_info['unit']}",
+                    'Median Value': f"{summary['median']:.3f} {param_info['unit']}"
                 }
                 for key, value in stats_data.items():
                     st.metric(label=key, value=value)
 
             with col2:
-                fig = px.histogram(
-                    x=data[:2000],
-                    nbins=60,
-                    title=f"{param_info['icon']} {parameter} Distribution",
-                    labels={'x': f"{parameter} ({param_info['unit']})", 'y': 'Frequency'},
-                    color_discrete_sequence=[param_info['color']]
+                counts, edges = self.get_histogram(catalog, data_key, bounds, param_info['variable'], bins=60)
+                fig = self.histogram_figure(
+                    counts, edges,
+                    f"{param_info['icon']} {parameter} Distribution",
+                    f"{parameter} ({param_info['unit']})",
+                    param_info['color']
                 )
                 fig.update_layout(height=450, showlegend=False, title_font_size=16)
                 st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-                st.plotly_chart(fig, use_container_width=True)
+                self.show_figure(fig)
                 st.markdown('</div>', unsafe_allow_html=True)
             
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_depth_profiles(self, data_cache: dict):
+    @timed(cached=True)
+    @st.cache_data(max_entries=32)
+    def get_depth_profile(_self, _catalog: Catalog, data_key: str, bounds: tuple, variable: str, max_depth: float,
+                          bin_size: float = None, plausible_only: bool = True) -> pd.DataFrame:
+        cache_miss()
+        edges = standard_depth_edges(max_depth) if bin_size is None else uniform_depth_edges(max_depth, bin_size)
+        profile = _catalog.depth_profile(variable, edges, clip_to_range=plausible_only, bounds=bounds)
+        profile = pd.DataFrame(profile.to_dict())
+        return profile[profile['count'] > 0]
+
+    @timed()
+    def create_depth_profiles(self, catalog: Catalog, data_key: str, bounds: tuple):
+        import plotly.graph_objects as go
+
         st.markdown('<h2 class="sub-header">📈 Vertical Depth Profiles</h2>', unsafe_allow_html=True)
         
         with st.container():
@@ -927,70 +471,183 @@ class StreamlitWODAnalyzer:
             
             col1, col2, col3 = st.columns(3)
             with col1:
-                max_depth = st.slider("🌊 Maximum Depth (meters)", 0, 6000, 2000, step=100)
+                max_depth = st.slider("🌊 Maximum Depth (meters)", 100, 5500, 2000, step=100)
             with col2:
-                sample_size = st.slider("📊 Sample Size", 500, 5000, 1000, step=500)
+                binning = st.selectbox(
+                    "📏 Depth Bins", ["WOD standard levels", "10 m", "25 m", "50 m", "100 m", "250 m"]
+                )
             with col3:
                 parameter = st.selectbox("🎯 Parameter", list(self.parameters.keys()))
 
+            col1, col2 = st.columns(2)
+            with col1:
+                band = st.radio("📐 Spread Band", ["10–90th percentile", "25–75th percentile"], horizontal=True)
+            with col2:
+                plausible_only = st.checkbox("🧹 Drop physically implausible values", value=True)
+
             param_info = self.parameters[parameter]
-            depths = data_cache['z']
-            param_data = data_cache[param_info['variable']]
-            
-            if len(depths) == 0 or len(param_data) == 0:
-                st.warning(f"⚠️ No valid data for {parameter} or depth measurements.")
+            bin_size = None if binning.startswith("WOD") else float(binning.split()[0])
+            profile = self.get_depth_profile(
+                catalog, data_key, bounds, param_info['variable'], float(max_depth), bin_size, plausible_only
+            )
+            if profile.empty:
+                st.warning(f"⚠️ No valid {parameter} observations above {max_depth} m.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
 
-            valid_mask = (depths <= max_depth) & (depths > 0)
-            param_valid = param_data[valid_mask]
-            depth_valid = depths[valid_mask]
+            low, high = ('p10', 'p90') if band.startswith("10") else ('p25', 'p75')
+            fig = go.Figure([
+                go.Scatter(x=profile[high], y=profile['depth'], mode='lines', line=dict(width=0),
+                           showlegend=False, hoverinfo='skip'),
+                go.Scatter(x=profile[low], y=profile['depth'], mode='lines', line=dict(width=0), fill='tonextx',
+                           fillcolor='rgba(127, 219, 218, 0.25)', name=band, hoverinfo='skip'),
+                go.Scatter(x=profile['p50'], y=profile['depth'], mode='lines', name='Median',
+                           line=dict(color=param_info['color'], dash='dot', width=1.5)),
+                go.Scatter(
+                    x=profile['mean'], y=profile['depth'], mode='lines+markers', name='Mean',
+                    line=dict(color=param_info['color'], width=3), marker=dict(size=4),
+                    customdata=np.column_stack([profile['count'], profile[low], profile[high]]),
+                    hovertemplate=(
+                        "Depth %{y:.0f} m<br>Mean %{x:.3f}<br>Band %{customdata[1]:.3f} – %{customdata[2]:.3f}"
+                        "<br>%{customdata[0]:,} observations<extra></extra>"
+                    )
+                )
+            ])
+            fig.update_layout(
+                title=f"{param_info['icon']} {parameter} Vertical Profile",
+                xaxis_title=f"{parameter} ({param_info['unit']})", yaxis_title="Depth (meters)",
+                height=550, title_font_size=16, hovermode='y unified'
+            )
+            fig.update_yaxes(autorange="reversed")
+            
+            st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
+            self.show_figure(fig)
+            st.markdown('</div>', unsafe_allow_html=True)
             
-            if len(param_valid) == 0 or len(depth_valid) == 0:
-                st.warning("⚠️ No valid data points after applying depth filter.")
+            st.success(
+                f"📊 Profile of {int(profile['count'].sum()):,} observations in {len(profile)} depth bins "
+                f"(maximum depth: {max_depth}m)"
+            )
+            with st.expander("📋 Profile Table"):
+                st.dataframe(profile.round(3), hide_index=True, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    @timed()
+    def get_climatology(self, catalog: Catalog, resolution: float, build: bool = False) -> str:
+        return catalog.climatology(resolution, build=build)
+
+    @timed(cached=True)
+    @st.cache_data(max_entries=64)
+    def get_climatology_map(_self, path: str, variable: str, depth_index: int, month: int = None,
+                            bounds: tuple = None) -> dict:
+        cache_miss()
+        return climatology_map(path, variable, depth_index, month, bounds)
+
+    @timed()
+    def create_climatology(self, catalog: Catalog, metadata: dict, bounds: tuple):
+        import plotly.graph_objects as go
+
+        st.markdown('<h2 class="sub-header">🧭 Monthly Climatology</h2>', unsafe_allow_html=True)
+
+        with st.container():
+            st.markdown('<div class="card-container">', unsafe_allow_html=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                resolution = st.select_slider("🎛️ Grid Resolution (degrees)", [5.0, 2.0, 1.0], value=5.0)
+            with col2:
+                parameter = st.selectbox("🎯 Parameter", list(self.parameters.keys()))
+
+            path = self.get_climatology(catalog, resolution)
+            if path is None:
+                total = metadata['total_temperature_obs'] + metadata['total_salinity_obs'] + metadata['total_oxygen_obs']
+                st.info(
+                    f"🧮 The {resolution:g}° climatology grids all {total:,} observations once by month and standard "
+                    "depth level, then is kept on disk for every later session."
+                )
+                if not st.button("🧮 Build Climatology", type="primary"):
+                    st.markdown('</div>', unsafe_allow_html=True)
+                    return
+                with st.spinner(f"🧮 Gridding every observation onto a {resolution:g}° monthly climatology..."):
+                    path = self.get_climatology(catalog, resolution, build=True)
+
+            levels = climatology_levels(path)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                depth_index = st.select_slider(
+                    "🌊 Standard Depth Level", range(len(levels['depth'])),
+                    format_func=lambda index: f"{levels['depth'][index]:,.0f} m"
+                )
+            with col2:
+                month = st.select_slider(
+                    "📅 Month", range(13), format_func=lambda month: calendar.month_abbr[month] or "Annual"
+                )
+            with col3:
+                field = st.radio("Show:", ["Mean", "Std. deviation", "Observations"], horizontal=True)
+
+            param_info = self.parameters[parameter]
+            grid = self.get_climatology_map(path, param_info['variable'], depth_index, month or None, bounds)
+            values = {'Mean': grid['mean'], 'Std. deviation': grid['std'], 'Observations': grid['count']}[field]
+            period = calendar.month_name[month] or "Annual"
+            depth = levels['depth'][depth_index]
+
+            occupied = grid['count'] > 0
+            if not occupied.any():
+                st.warning(f"⚠️ No {parameter} observations at {depth:,.0f} m for {period.lower()}.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
 
-            if len(param_valid) > sample_size:
-                indices = np.random.choice(len(param_valid), sample_size, replace=False)
-                param_sample = param_valid[indices]
-                depth_sample = depth_valid[indices]
-            else:
-                param_sample = param_valid
-                depth_sample = depth_valid
-
-            fig = px.scatter(
-                x=param_sample,
-                y=depth_sample,
-                title=f"{param_info['icon']} {parameter} vs Ocean Depth Profile",
-                labels={'x': f"{parameter} ({param_info['unit']})", 'y': 'Depth (meters)'},
-                opacity=0.7,
-                color_discrete_sequence=[param_info['color']]
+            unit = "observations" if field == "Observations" else param_info['unit']
+            fig = go.Figure(go.Heatmap(
+                x=grid['lon'],
+                y=grid['lat'],
+                z=np.where(occupied, values, np.nan),
+                customdata=grid['count'],
+                colorscale=['#1B2951', '#2E4F99', '#4A90E2', '#00C4FF', '#7FDBDA', '#FF6B6B'],
+                colorbar=dict(title=unit),
+                hovertemplate=(
+                    "Lat %{y:.2f}°, Lon %{x:.2f}°<br>%{z:.3f} " + unit + "<br>%{customdata:,} observations<extra></extra>"
+                )
+            ))
+            fig.update_layout(
+                title=f"{param_info['icon']} {parameter} {field.lower()} at {depth:,.0f} m, {period}",
+                xaxis_title="Longitude (°)",
+                yaxis_title="Latitude (°)",
+                yaxis=dict(scaleanchor='x'),
+                height=550,
+                title_font_size=16
             )
-            fig.update_yaxes(autorange="reversed")
-            fig.update_layout(height=550, showlegend=False, title_font_size=16)
-            
+
             st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(fig)
             st.markdown('</div>', unsafe_allow_html=True)
-            
-            st.success(f"📊 Displaying {len(param_sample):,} data points (maximum depth: {max_depth}m)")
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(label="Grid Cells with Data", value=f"{int(occupied.sum()):,}")
+            with col2:
+                st.metric(label="Observations", value=f"{int(grid['count'].sum()):,}")
+            with col3:
+                weighted = float((grid['mean'][occupied] * grid['count'][occupied]).sum() / grid['count'].sum())
+                st.metric(label=f"Mean {parameter}", value=f"{weighted:.2f} {param_info['unit']}")
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_temporal_analysis(self, data_cache: dict):
+    @timed()
+    def create_temporal_analysis(self, table: ObservationTable):
+        px = plotly_express()
+
         st.markdown('<h2 class="sub-header">📅 Temporal Distribution Analysis</h2>', unsafe_allow_html=True)
         
         with st.container():
             st.markdown('<div class="card-container">', unsafe_allow_html=True)
             
-            time_vals = data_cache['time']
-            if len(time_vals) == 0:
+            dated = table.casts['year'] != MISSING
+            years = table.casts['year'][dated]
+            if len(years) == 0:
                 st.warning("⚠️ No valid temporal data available.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
 
-            base_date = datetime(1770, 1, 1)
-            years = [(base_date + timedelta(days=float(t))).year for t in time_vals]
             year_counts = pd.Series(years).value_counts().sort_index()
 
             fig = px.line(
@@ -1004,10 +661,10 @@ class StreamlitWODAnalyzer:
             fig.update_traces(line_width=3)
             
             st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(fig)
             st.markdown('</div>', unsafe_allow_html=True)
 
-            decades = [year // 10 * 10 for year in years]
+            decades = table.casts['decade'][dated]
             decade_counts = pd.Series(decades).value_counts().sort_index()
             
             col1, col2 = st.columns(2)
@@ -1029,12 +686,78 @@ class StreamlitWODAnalyzer:
                 )
                 fig_pie.update_layout(height=450, showlegend=True, title_font_size=16)
                 st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-                st.plotly_chart(fig_pie, use_container_width=True)
+                self.show_figure(fig_pie)
                 st.markdown('</div>', unsafe_allow_html=True)
             
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_kmeans_clustering(self, data_cache: dict):
+    def kmeans_spec(self, table_key: dict, sample_size: int, kmeans: 'KMeans') -> dict:
+        from ocealyze.clustering import CLUSTER_FEATURES
+
+        return {
+            'table': table_key, 'features': list(CLUSTER_FEATURES),
+            'sample': {'size': sample_size, 'seed': 42}, 'model': estimator_spec(kmeans)
+        }
+
+    @timed(cached=True)
+    @st.cache_data(max_entries=16)
+    def get_kmeans_sweep(_self, _models: ModelRegistry, _data: np.ndarray, table_key: dict, sample_size: int) -> pd.DataFrame:
+        cache_miss()
+        from sklearn.preprocessing import StandardScaler
+        from ocealyze.clustering import sweep_kmeans
+
+        def sweep():
+            # Registers every fit under the same spec the slider uses, so picking any k afterwards is a cache hit.
+            scaler = StandardScaler().fit(_data)
+            results = sweep_kmeans(scaler.transform(_data), range(2, 11), n_init=10, seed=42, max_workers=_self.load_workers)
+            for kmeans, _, _ in results:
+                _models.put(model_key(_self.kmeans_spec(table_key, sample_size, kmeans)), (scaler, kmeans))
+            return pd.DataFrame({
+                'k': [kmeans.n_clusters for kmeans, _, _ in results],
+                'inertia': [inertia for _, inertia, _ in results],
+                'silhouette': [silhouette for _, _, silhouette in results]
+            })
+
+        return _models.get_or_compute({'kmeans_sweep': table_key, 'sample_size': sample_size, 'counts': [2, 10]}, sweep)
+
+    def kmeans_sweep_figure(self, sweep: pd.DataFrame, n_clusters: int):
+        import plotly.graph_objects as go
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=sweep['k'], y=sweep['inertia'], mode='lines+markers', name='Inertia',
+            line=dict(color='#00C4FF', width=3), marker=dict(size=8)
+        ))
+        fig.add_trace(go.Scatter(
+            x=sweep['k'], y=sweep['silhouette'], mode='lines+markers', name='Silhouette (sampled)', yaxis='y2',
+            line=dict(color='#FF6B6B', width=3, dash='dash'), marker=dict(size=8)
+        ))
+        fig.add_vline(x=n_clusters, line_dash='dot', line_color='#7FDBDA')
+        fig.update_layout(
+            title="📈 Elbow & Silhouette by Number of Clusters",
+            xaxis=dict(title="Number of Clusters (k)", dtick=1),
+            yaxis=dict(title="Inertia (scaled units)"),
+            yaxis2=dict(title="Silhouette Score", overlaying='y', side='right'),
+            height=450,
+            title_font_size=16
+        )
+
+        st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
+        self.show_figure(fig)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        best = sweep.loc[sweep['silhouette'].idxmax()]
+        st.info(f"📈 Highest sampled silhouette: k = {int(best['k'])} ({best['silhouette']:.3f})")
+
+    @timed()
+    def create_kmeans_clustering(self, table: ObservationTable, models: ModelRegistry, table_key: dict,
+                                 catalog: Catalog, bounds: tuple):
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
+        from ocealyze.clustering import CHUNK_ROWS as CLUSTER_CHUNK_ROWS
+        from ocealyze.clustering import CLUSTER_FEATURES
+        px = plotly_express()
+
         st.markdown('<h2 class="sub-header">🔄 K-Means Clustering Analysis</h2>', unsafe_allow_html=True)
         
         with st.container():
@@ -1042,33 +765,45 @@ class StreamlitWODAnalyzer:
             
             n_clusters = st.slider("🎛️ Number of Clusters", 2, 10, 4, step=1)
             sample_size = st.slider("📊 Sample Size for Clustering", 500, 5000, 1000, step=500)
+            mode = st.radio(
+                "Fit clusters on:", ["🎯 Sample (interactive)", "🌐 All observations (streaming)"], horizontal=True
+            )
 
-            temp = data_cache['Temperature']
-            sal = data_cache['Salinity']
-            oxy = data_cache['Oxygen']
-            
-            if len(temp) == 0 or len(sal) == 0 or len(oxy) == 0:
-                st.warning("⚠️ Insufficient data for clustering analysis.")
+            sample_indices = table.sample_rows(sample_size, 'Temperature', 'Salinity', 'Oxygen', seed=42)
+            if len(sample_indices) < n_clusters:
+                st.warning("⚠️ Not enough data points with temperature, salinity and oxygen for clustering.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
 
-            common_indices = np.intersect1d(np.intersect1d(np.arange(len(temp)), np.arange(len(sal))), np.arange(len(oxy)))
-            if len(common_indices) < n_clusters:
-                st.warning("⚠️ Not enough data points for clustering.")
-                st.markdown('</div>', unsafe_allow_html=True)
-                return
+            data = np.vstack((table['Temperature'][sample_indices], table['Salinity'][sample_indices], table['Oxygen'][sample_indices])).T
+            if mode.startswith("🎯"):
+                if st.toggle("📈 Sweep all cluster counts (elbow & silhouette)", value=False):
+                    sweep = self.get_kmeans_sweep(models, data, table_key, sample_size)
+                    self.kmeans_sweep_figure(sweep, n_clusters)
 
-            if len(common_indices) > sample_size:
-                sample_indices = np.random.choice(common_indices, sample_size, replace=False)
-            else:
-                sample_indices = common_indices
+                kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=42)
+                spec = self.kmeans_spec(table_key, sample_size, kmeans)
 
-            data = np.vstack((temp[sample_indices], sal[sample_indices], oxy[sample_indices])).T
-            scaler = StandardScaler()
-            data_scaled = scaler.fit_transform(data)
-            
-            kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=42)
-            labels = kmeans.fit_predict(data_scaled)
+                def fit():
+                    scaler = StandardScaler()
+                    kmeans.fit(scaler.fit_transform(data))
+                    return scaler, kmeans
+
+                scaler, kmeans = models.get_or_fit(spec, fit)
+                labels = kmeans.labels_
+                counts = np.bincount(labels, minlength=n_clusters)
+                means = np.array([[data[labels == i, j].mean() for i in range(n_clusters)] for j in range(3)])
+            else:
+                # Fitted and labelled over every observation in the source files, not the sampled table.
+                spec = {
+                    'data': table_key['data'], 'bounds': bounds, 'features': list(CLUSTER_FEATURES),
+                    'model': {'class': 'MiniBatchKMeans', 'n_clusters': n_clusters, 'chunk_rows': CLUSTER_CHUNK_ROWS, 'seed': 42}
+                }
+                with st.spinner(f"🔄 Streaming K-Means over {len(catalog.select(bounds)):,} files..."):
+                    scaler, kmeans = models.get_or_fit(spec, lambda: catalog.fit_kmeans(n_clusters, bounds=bounds, seed=42))
+                    counts, means = catalog.clusters(scaler, kmeans, spec, bounds=bounds)
+                labels = kmeans.predict(scaler.transform(data.astype(np.float64)))
+                st.info(f"🌐 Labelled {counts.sum():,} observations; the chart shows a sample of {len(sample_indices):,}.")
 
             colors = ['#00C4FF', '#7FDBDA', '#4A90E2', '#FF6B6B', '#2E4F99', '#1B2951']
             color_map = {str(i): colors[i % len(colors)] for i in range(n_clusters)}
@@ -1084,68 +819,112 @@ class StreamlitWODAnalyzer:
             fig.update_layout(height=600, title_font_size=16)
             
             st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(fig)
             st.markdown('</div>', unsafe_allow_html=True)
 
             cluster_stats = pd.DataFrame({
                 'Cluster': range(n_clusters),
-                'Count': [np.sum(labels == i) for i in range(n_clusters)],
-                'Mean Temperature (°C)': [data[labels == i, 0].mean().round(3) for i in range(n_clusters)],
-                'Mean Salinity (PSU)': [data[labels == i, 1].mean().round(3) for i in range(n_clusters)],
-                'Mean Oxygen (µmol/kg)': [data[labels == i, 2].mean().round(3) for i in range(n_clusters)]
+                'Count': counts,
+                'Mean Temperature (°C)': means[0].round(3),
+                'Mean Salinity (PSU)': means[1].round(3),
+                'Mean Oxygen (µmol/kg)': means[2].round(3)
             })
             
             st.markdown("#### 📊 Cluster Statistics Summary")
             st.dataframe(cluster_stats, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_decision_tree_classification(self, data_cache: dict):
+    def water_mass_rules(self) -> list:
+        # Edited in the classification tab and kept in the session so every tab labels with the same rules.
+        frame = st.session_state.get('water_mass_rules', pd.DataFrame(DEFAULT_RULES))
+        rules = []
+        for record in frame.to_dict('records'):
+            if not isinstance(record.get('name'), str) or not record['name'].strip():
+                continue
+            rule = {'name': record['name'].strip(), 'inclusive': bool(record.get('inclusive') is True)}
+            for key in ('t_min', 't_max', 's_min', 's_max'):
+                if pd.notna(record.get(key)):
+                    rule[key] = float(record[key])
+            polygon = record.get('polygon')
+            if isinstance(polygon, str) and polygon.strip():
+                # "S,T; S,T; ..." vertex list in salinity-temperature space.
+                try:
+                    rule['polygon'] = parse_polygon(polygon)
+                except ValueError as error:
+                    st.error(f"❌ Skipping water mass rule '{rule['name']}': {error}")
+                    continue
+            rules.append(rule)
+        return rules
+
+    def edit_water_mass_rules(self):
+        with st.expander("⚙️ Water Mass Rules (first match wins)"):
+            frame = st.session_state.get('water_mass_rules', pd.DataFrame(DEFAULT_RULES))
+            for column in ('t_min', 't_max', 's_min', 's_max', 'inclusive', 'polygon'):
+                if column not in frame:
+                    frame[column] = '' if column == 'polygon' else (False if column == 'inclusive' else np.nan)
+            frame['inclusive'] = frame['inclusive'].fillna(False).astype(bool)
+            frame['polygon'] = frame['polygon'].fillna('')
+            edited = st.data_editor(
+                frame[['name', 't_min', 't_max', 's_min', 's_max', 'inclusive', 'polygon']],
+                num_rows="dynamic",
+                use_container_width=True,
+                column_config={
+                    'polygon': st.column_config.TextColumn(help="Optional T-S polygon as 'S,T; S,T; ...' vertices")
+                }
+            )
+            st.session_state['water_mass_rules'] = edited
+            st.caption("Blank bounds are unbounded; bounds are strict unless 'inclusive' is ticked. "
+                       f"Observations matching no rule are labelled {OTHER}.")
+
+    @timed(cached=True)
+    @st.cache_data(max_entries=16)
+    def get_water_mass_counts(_self, _catalog: Catalog, data_key: str, bounds: tuple, rules: list) -> np.ndarray:
+        cache_miss()
+        return _catalog.water_masses(rules, bounds)
+
+    @timed()
+    def create_decision_tree_classification(self, table: ObservationTable, models: ModelRegistry, table_key: dict,
+                                            catalog: Catalog, bounds: tuple):
+        from sklearn.metrics import accuracy_score
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.tree import DecisionTreeClassifier
+        px = plotly_express()
+
         st.markdown('<h2 class="sub-header">🌳 Water Mass Classification</h2>', unsafe_allow_html=True)
         
         with st.container():
             st.markdown('<div class="card-container">', unsafe_allow_html=True)
             
             sample_size = st.slider("📊 Sample Size for Classification", 500, 5000, 1000, step=500)
+            self.edit_water_mass_rules()
 
-            temp = data_cache['Temperature']
-            sal = data_cache['Salinity']
-            
-            if len(temp) == 0 or len(sal) == 0:
-                st.warning("⚠️ No valid temperature or salinity data.")
-                st.markdown('</div>', unsafe_allow_html=True)
-                return
-
-            common_indices = np.intersect1d(np.arange(len(temp)), np.arange(len(sal)))
-            if len(common_indices) == 0:
+            sample_indices = table.sample_rows(sample_size, 'Temperature', 'Salinity', seed=42)
+            if len(sample_indices) == 0:
                 st.warning("⚠️ No overlapping temperature and salinity data.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
 
-            if len(common_indices) > sample_size:
-                sample_indices = np.random.choice(common_indices, sample_size, replace=False)
-            else:
-                sample_indices = common_indices
+            rules = self.water_mass_rules()
+            names = np.array(categories(rules))
+            # Counted over every observation in the source files; the tree trains on the sample.
+            with st.spinner(f"🌳 Labelling water masses in {len(catalog.select(bounds)):,} files..."):
+                counts = self.get_water_mass_counts(catalog, table_key['data'], bounds, rules)
+            data = np.vstack((table['Temperature'][sample_indices], table['Salinity'][sample_indices])).T
+            labels = names[classify(data[:, 0], data[:, 1], rules)]
 
-            data = np.vstack((temp[sample_indices], sal[sample_indices])).T
-            labels = []
-            
-            for t, s in data:
-                if t > 20 and 34 < s < 36:
-                    labels.append("🌴 Tropical")
-                elif t < 5 and s > 34:
-                    labels.append("🧊 Polar")
-                elif 5 <= t <= 20 and 33 <= s <= 35:
-                    labels.append("🌊 Temperate")
-                else:
-                    labels.append("🌐 Other")
-            
-            labels = np.array(labels)
-            scaler = StandardScaler()
-            data_scaled = scaler.fit_transform(data)
-            
             clf = DecisionTreeClassifier(max_depth=5, random_state=42)
-            clf.fit(data_scaled, labels)
-            predictions = clf.predict(data_scaled)
+            spec = {
+                'table': table_key, 'features': ['Temperature', 'Salinity'], 'rules': rules,
+                'sample': {'size': sample_size, 'seed': 42}, 'model': estimator_spec(clf)
+            }
+
+            def fit():
+                scaler = StandardScaler()
+                clf.fit(scaler.fit_transform(data), labels)
+                return scaler, clf
+
+            scaler, clf = models.get_or_fit(spec, fit)
+            predictions = clf.predict(scaler.transform(data))
             accuracy = accuracy_score(labels, predictions)
 
             color_map = {
@@ -1165,18 +944,19 @@ class StreamlitWODAnalyzer:
             fig.update_layout(height=550, title_font_size=16)
             
             st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(fig)
             st.markdown('</div>', unsafe_allow_html=True)
 
-            class_counts = pd.Series(labels).value_counts()
+            class_counts = pd.Series(counts, index=names)
+            class_counts = class_counts[class_counts > 0].sort_values(ascending=False)
             col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown("#### 📊 Classification Statistics")
+                st.markdown(f"#### 📊 Classification Statistics ({counts.sum():,} observations)")
                 stats_df = pd.DataFrame({
                     'Water Mass Type': class_counts.index,
                     'Count': class_counts.values,
-                    'Percentage': (class_counts.values / len(labels) * 100).round(2)
+                    'Percentage': (class_counts.values / counts.sum() * 100).round(2)
                 })
                 st.dataframe(stats_df, use_container_width=True)
 
@@ -1187,71 +967,151 @@ class StreamlitWODAnalyzer:
             
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_time_series_analysis(self, data_cache: dict):
-        st.markdown('<h2 class="sub-header">📈 Temperature Time Series Analysis</h2>', unsafe_allow_html=True)
+    @timed(cached=True)
+    @st.cache_resource(max_entries=8)
+    def get_series_partials(_self, _catalog: Catalog, data_key: str) -> SeriesPartials:
+        cache_miss()
+        return _catalog.series_partials()
+
+    @timed(cached=True)
+    @st.cache_data(max_entries=64)
+    def get_time_series(_self, _partials: SeriesPartials, data_key: str, variable: str, bounds: tuple,
+                        band: int = None) -> dict:
+        cache_miss()
+        return period_means(_partials.monthly(variable, bounds, band))
+
+    @timed()
+    def create_time_series_analysis(self, catalog: Catalog, data_key: str, bounds: tuple):
+        import plotly.graph_objects as go
+
+        st.markdown('<h2 class="sub-header">📈 Time Series Analysis</h2>', unsafe_allow_html=True)
         
         with st.container():
             st.markdown('<div class="card-container">', unsafe_allow_html=True)
-            
-            time_vals = data_cache['time']
-            temp = data_cache['Temperature']
-            
-            if len(time_vals) == 0 or len(temp) == 0:
-                st.warning("⚠️ No valid time or temperature data.")
-                st.markdown('</div>', unsafe_allow_html=True)
-                return
 
-            common_indices = np.intersect1d(np.arange(len(time_vals)), np.arange(len(temp)))
-            if len(common_indices) == 0:
-                st.warning("⚠️ No overlapping time and temperature data.")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                parameter = st.selectbox("🎯 Parameter", list(self.parameters.keys()))
+            with col2:
+                band = st.selectbox(
+                    "🌊 Depth Band", [None] + list(range(len(DEPTH_ZONES))),
+                    format_func=lambda band: "🌐 All depths" if band is None else DEPTH_ZONES[band]
+                )
+            with col3:
+                basis = st.radio("📐 Trend Fitted To", ["Annual means", "Deseasonalized monthly means"])
+
+            param_info = self.parameters[parameter]
+            unit = param_info['unit']
+            with st.spinner("📈 Accumulating yearly and monthly means over every observation..."):
+                partials = self.get_series_partials(catalog, data_key)
+            series = self.get_time_series(partials, data_key, param_info['variable'], bounds, band)
+            dated = series['year_count'] > 0
+            if dated.sum() == 0:
+                st.warning(f"⚠️ No dated {parameter} observations for this region and depth band.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
 
-            time_vals = time_vals[common_indices]
-            temp = temp[common_indices]
-
-            base_date = datetime(1770, 1, 1)
-            years = [(base_date + timedelta(days=float(t))).year for t in time_vals]
-            yearly_means = pd.DataFrame({'Year': years, 'Temperature': temp}).groupby('Year').mean().reset_index()
+            years = series['years']
+            if basis == "Annual means":
+                x, y = years.astype(np.float64), series['year_mean']
+            else:
+                x = (years[:, None] + (np.arange(12) + 0.5) / 12).ravel()
+                y = series['anomaly'].ravel()
+            trend = linear_trend(x, y)
 
             fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=yearly_means['Year'],
-                y=yearly_means['Temperature'],
-                mode='lines+markers',
-                name='Mean Temperature',
-                line=dict(color='#00C4FF', width=3),
-                marker=dict(size=6)
-            ))
-
-            z = np.polyfit(yearly_means['Year'], yearly_means['Temperature'], 1)
-            p = np.poly1d(z)
-            fig.add_trace(go.Scatter(
-                x=yearly_means['Year'],
-                y=p(yearly_means['Year']),
-                mode='lines',
-                name='Trend Line',
-                line=dict(color='#FF6B6B', dash='dash', width=3)
-            ))
-
+            if trend is not None:
+                line_x = np.linspace(x[np.isfinite(y)].min(), x[np.isfinite(y)].max(), 100)
+                fitted, low, high = trend_band(trend, line_x)
+                fig.add_trace(go.Scatter(x=line_x, y=high, mode='lines', line=dict(width=0), showlegend=False,
+                                         hoverinfo='skip'))
+                fig.add_trace(go.Scatter(
+                    x=line_x, y=low, mode='lines', line=dict(width=0), fill='tonexty',
+                    fillcolor='rgba(255, 107, 107, 0.2)', name=f"{trend['confidence']:.0%} confidence band",
+                    hoverinfo='skip'
+                ))
+            if basis == "Annual means":
+                fig.add_trace(go.Scatter(
+                    x=years[dated], y=series['year_mean'][dated], mode='lines+markers', name=f'Mean {parameter}',
+                    line=dict(color=param_info['color'], width=3), marker=dict(size=6),
+                    customdata=np.column_stack([series['year_count'][dated], series['year_std'][dated]]),
+                    hovertemplate=(
+                        "%{x}: %{y:.3f} " + unit + " ± %{customdata[1]:.3f}<br>%{customdata[0]:,} observations"
+                        "<extra></extra>"
+                    )
+                ))
+            else:
+                fig.add_trace(go.Scatter(
+                    x=x[np.isfinite(y)], y=y[np.isfinite(y)], mode='markers', name='Monthly anomaly',
+                    marker=dict(color=param_info['color'], size=4)
+                ))
+            if trend is not None:
+                fig.add_trace(go.Scatter(
+                    x=line_x, y=fitted, mode='lines', name='Trend Line',
+                    line=dict(color='#FF6B6B', dash='dash', width=3)
+                ))
+
+            band_label = "all depths" if band is None else DEPTH_ZONES[band]
             fig.update_layout(
-                title="📈 Long-term Temperature Trend Analysis",
+                title=f"📈 Long-term {parameter} Trend Analysis ({band_label})",
                 xaxis_title="Year",
-                yaxis_title="Temperature (°C)",
+                yaxis_title=f"{parameter} {'anomaly ' if basis != 'Annual means' else ''}({unit})",
                 height=500,
                 title_font_size=16
             )
             
             st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(fig)
             st.markdown('</div>', unsafe_allow_html=True)
 
-            trend_slope = z[0]
-            trend_direction = "📈 Increasing" if trend_slope > 0 else "📉 Decreasing"
-            st.info(f"**Temperature Trend:** {trend_direction} (slope: {trend_slope:.4f} °C/year)")
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric(label="Observations", value=f"{int(series['year_count'].sum()):,}")
+            with col2:
+                st.metric(label="Years with Data", value=f"{int(dated.sum()):,}")
+            if trend is None:
+                st.warning("⚠️ At least three periods with data are needed to fit a trend.")
+            else:
+                with col3:
+                    st.metric(label="Trend per Decade", value=f"{trend['slope'] * 10:+.3f} {unit}")
+                with col4:
+                    st.metric(label=f"{trend['confidence']:.0%} CI per Decade",
+                              value=f"{trend['low'] * 10:+.3f} to {trend['high'] * 10:+.3f}")
+                trend_direction = "📈 Increasing" if trend['slope'] > 0 else "📉 Decreasing"
+                significance = "significant" if trend['low'] > 0 or trend['high'] < 0 else "not significant"
+                st.info(
+                    f"**{parameter} Trend:** {trend_direction} (slope: {trend['slope']:.4f} {unit}/year, "
+                    f"{significance} at {trend['confidence']:.0%}, R² = {trend['r2']:.3f}, n = {trend['n']} "
+                    f"{'years' if basis == 'Annual means' else 'months'})"
+                )
+
+            months = series['month_count'] > 0
+            fig = go.Figure(go.Bar(
+                x=[calendar.month_abbr[month] for month in np.flatnonzero(months) + 1],
+                y=series['month_mean'][months],
+                error_y=dict(type='data', array=series['month_std'][months], color='rgba(255, 255, 255, 0.5)'),
+                marker_color=param_info['color'],
+                customdata=series['month_count'][months],
+                hovertemplate="%{x}: %{y:.3f} " + unit + "<br>%{customdata:,} observations<extra></extra>"
+            ))
+            fig.update_layout(
+                title=f"🗓️ Mean Seasonal Cycle of {parameter} ({band_label})",
+                xaxis_title="Month",
+                yaxis_title=f"{parameter} ({unit})",
+                height=400,
+                title_font_size=16
+            )
+            st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
+            self.show_figure(fig)
+            st.markdown('</div>', unsafe_allow_html=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_prediction_section(self, data_cache: dict):
+    @timed()
+    def create_prediction_section(self, table: ObservationTable, models: ModelRegistry, table_key: dict,
+                                  sample_size: int = 5000):
+        from sklearn.ensemble import RandomForestRegressor
+        px = plotly_express()
+
         st.markdown('<h2 class="sub-header">🔮 Parameter Prediction</h2>', unsafe_allow_html=True)
         
         with st.container():
@@ -1269,35 +1129,31 @@ class StreamlitWODAnalyzer:
                 depth = st.number_input("📏 Depth (meters)", 0.0, 6000.0, 0.0, step=10.0)
                 year = st.number_input("📅 Year", 1900, 2025, 2020, step=1)
 
-            data = {
-                'lat': data_cache['lat'],
-                'lon': data_cache['lon'],
-                'z': data_cache['z'],
-                'time': data_cache['time'],
-                parameter: data_cache[param_info['variable']]
-            }
-
-            df = pd.DataFrame(data)
-            df = df.dropna()
+            rows = table.sample_rows(sample_size, 'lat', 'lon', 'z', 'time', param_info['variable'], seed=42)
+            df = pd.DataFrame({
+                'lat': table['lat'][rows],
+                'lon': table['lon'][rows],
+                'z': table['z'][rows],
+                'year': table['year'][rows],
+                parameter: table[param_info['variable']][rows]
+            })
             if len(df) < 10:
                 st.warning(f"⚠️ Insufficient valid data for {parameter} prediction.")
                 st.markdown('</div>', unsafe_allow_html=True)
                 return
 
-            base_date = datetime(1770, 1, 1)
-            df['year'] = [(base_date + timedelta(days=float(t))).year for t in df['time']]
-
             X = df[['lat', 'lon', 'z', 'year']]
             y = df[parameter]
 
             model = RandomForestRegressor(n_estimators=100, random_state=42)
-            model.fit(X, y)
+            spec = {
+                'table': table_key, 'features': list(X.columns), 'target': param_info['variable'],
+                'sample': {'size': sample_size, 'seed': 42}, 'model': estimator_spec(model)
+            }
+            model = models.get_or_fit(spec, lambda: model.fit(X, y))
 
             input_data = np.array([[lat, lon, depth, year]])
-            prediction = model.predict(input_data)[0]
-
-            tree_predictions = np.array([tree.predict(input_data) for tree in model.estimators_])
-            uncertainty = np.std(tree_predictions)
+            prediction, uncertainty = (values[0] for values in predict_with_spread(model, input_data))
 
             st.markdown(f"#### 🔮 Prediction Result for {param_info['icon']} {parameter}")
             st.metric(
@@ -1329,13 +1185,128 @@ class StreamlitWODAnalyzer:
             fig.update_layout(height=550, showlegend=True, title_font_size=16)
             
             st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(fig)
             st.markdown('</div>', unsafe_allow_html=True)
 
             st.success(f"✅ Predicted {parameter} for the given inputs with uncertainty estimate.")
+
+            self.create_prediction_map(model, models, model_key(spec), parameter, param_info, depth, year)
+            self.create_batch_prediction(model, parameter, param_info)
             st.markdown('</div>', unsafe_allow_html=True)
 
-    def create_export_section(self, data_cache: dict, metadata: dict):
+    @timed(cached=True)
+    @st.cache_data(max_entries=32)
+    def get_prediction_grid(_self, _model: 'RandomForestRegressor', _models: ModelRegistry, key: str, resolution: float,
+                            depth: float, year: int) -> dict:
+        cache_miss()
+        spec = {'predictions': key, 'resolution': resolution, 'depth': depth, 'year': year}
+        return _models.get_or_compute(
+            spec, lambda: predict_grid(_model, resolution, depth, year, max_workers=_self.load_workers)
+        )
+
+    @timed()
+    def create_prediction_map(self, model: 'RandomForestRegressor', models: ModelRegistry, key: str, parameter: str,
+                              param_info: dict, depth: float, year: int):
+        import plotly.graph_objects as go
+
+        st.markdown(f"#### 🗺️ Prediction Map at {depth:,.0f} m in {year}")
+        if not st.toggle("Compute global prediction map", value=False):
+            return
+
+        col1, col2 = st.columns(2)
+        with col1:
+            resolution = st.select_slider("🎛️ Grid Resolution (degrees)", [2.0, 1.0, 0.5, 0.25], value=1.0)
+        with col2:
+            field = st.radio("Show:", ["Prediction", "Uncertainty"], horizontal=True)
+
+        with st.spinner(f"🔮 Predicting {parameter} on a {resolution}° global grid..."):
+            grid = self.get_prediction_grid(model, models, key, resolution, float(depth), int(year))
+
+        values = grid['mean'] if field == "Prediction" else grid['std']
+        fig = go.Figure(go.Heatmap(
+            x=grid['lon'],
+            y=grid['lat'],
+            z=values,
+            colorscale=['#1B2951', '#2E4F99', '#4A90E2', '#00C4FF', '#7FDBDA', '#FF6B6B'],
+            colorbar=dict(title=param_info['unit']),
+            hovertemplate="Lat %{y:.2f}°, Lon %{x:.2f}°<br>%{z:.3f} " + param_info['unit'] + "<extra></extra>"
+        ))
+        fig.update_layout(
+            title=f"{param_info['icon']} {field} of {parameter} ({len(grid['lat'])}×{len(grid['lon'])} cells)",
+            xaxis_title="Longitude (°)",
+            yaxis_title="Latitude (°)",
+            yaxis=dict(scaleanchor='x'),
+            height=550,
+            title_font_size=16
+        )
+
+        st.markdown('<div class="plotly-chart-container">', unsafe_allow_html=True)
+        self.show_figure(fig)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    def read_query_points(self, uploaded) -> pd.DataFrame:
+        if uploaded.name.lower().endswith('.npy'):
+            points = np.load(uploaded, allow_pickle=False)
+            if points.ndim != 2 or points.shape[1] != 4:
+                raise ValueError("the array must have shape (n, 4): lat, lon, depth, year")
+            return pd.DataFrame(points, columns=['lat', 'lon', 'depth', 'year'])
+
+        points = pd.read_csv(uploaded)
+        points.columns = [column.strip().lower() for column in points.columns]
+        if 'depth' not in points and 'z' in points:
+            points = points.rename(columns={'z': 'depth'})
+        missing = [column for column in ('lat', 'lon', 'depth', 'year') if column not in points]
+        if missing:
+            raise ValueError(f"missing column(s): {', '.join(missing)}")
+        return points
+
+    @timed()
+    def create_batch_prediction(self, model: 'RandomForestRegressor', parameter: str, param_info: dict):
+        st.markdown("#### 📦 Batch Prediction")
+        uploaded = st.file_uploader(
+            "Upload query points (CSV with lat, lon, depth, year columns, or an (n, 4) .npy array)",
+            type=['csv', 'npy']
+        )
+        if uploaded is None:
+            return
+
+        try:
+            points = self.read_query_points(uploaded)
+        except Exception as e:
+            st.error(f"❌ Could not read query points: {e}")
+            return
+
+        features = points[['lat', 'lon', 'depth', 'year']].to_numpy(dtype=np.float64)
+        valid = np.isfinite(features).all(axis=1)
+        mean = np.full(len(points), np.nan)
+        spread = np.full(len(points), np.nan)
+        started = datetime.now()
+        mean[valid], spread[valid] = predict_with_spread(model, features[valid], max_workers=self.load_workers)
+        elapsed = max((datetime.now() - started).total_seconds(), 1e-6)
+
+        unit = param_info['unit']
+        points[f"predicted_{parameter.lower()}"] = mean
+        points[f"uncertainty_{parameter.lower()}"] = spread
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(label="Query Points", value=f"{len(points):,}")
+        with col2:
+            st.metric(label="Skipped (missing features)", value=f"{int((~valid).sum()):,}")
+        with col3:
+            st.metric(label="Throughput", value=f"{valid.sum() / elapsed:,.0f} pts/s")
+
+        st.dataframe(points.head(1000), use_container_width=True)
+        st.download_button(
+            label=f"📥 Download Predictions ({unit}, CSV)",
+            data=points.to_csv(index=False),
+            file_name=f"tidetrace_{parameter.lower()}_predictions.csv",
+            mime="text/csv"
+        )
+
+    @timed()
+    def create_export_section(self, table: ObservationTable, metadata: dict, catalog: Catalog, data_key: str,
+                              bounds: tuple):
         st.markdown('<h2 class="sub-header">💾 Data Export & Reporting</h2>', unsafe_allow_html=True)
         
         with st.container():
@@ -1344,19 +1315,10 @@ class StreamlitWODAnalyzer:
             if st.button("📊 Generate Comprehensive Summary Report", type="primary"):
                 summary_data = []
                 for param, param_info in self.parameters.items():
-                    data = data_cache[param_info['variable']]
-                    if len(data) == 0:
+                    summary = self.get_summary(catalog, data_key, bounds, param_info['variable'])
+                    if summary['count'] == 0:
                         continue
-                    summary_data.append({
-                        'Parameter': f"{param_info['icon']} {param}",
-                        'Unit': param_info['unit'],
-                        'Total_Measurements': len(data),
-                        'Mean': round(data.mean(), 4),
-                        'Standard_Deviation': round(data.std(), 4),
-                        'Minimum': round(data.min(), 4),
-                        'Maximum': round(data.max(), 4),
-                        'Median': round(np.median(data), 4)
-                    })
+                    summary_data.append(summary_record(f"{param_info['icon']} {param}", param_info['unit'], summary))
 
                 if not summary_data:
                     st.warning("⚠️ No valid data available for export.")
@@ -1381,29 +1343,40 @@ class StreamlitWODAnalyzer:
 
 def main():
     analyzer = StreamlitWODAnalyzer()
-    file_path = analyzer.default_file_path
-    
-    with st.spinner("🌊 Loading and processing oceanographic data..."):
-        dataset = analyzer.load_data(file_path)
-        if dataset is None:
-            st.error("❌ Failed to load oceanographic data. Please verify the file path and try again.")
+    configure_log()
+    with st.sidebar:
+        data_path = st.text_input("📂 WOD file or directory", analyzer.default_file_path)
+        show_performance = st.toggle("⏱️ Performance panel", value=False)
+
+    with collect() as records:
+        try:
+            dashboard(analyzer, data_path)
+        finally:
+            if show_performance:
+                with st.sidebar:
+                    analyzer.display_performance(records)
+
+def dashboard(analyzer: StreamlitWODAnalyzer, data_path: str):
+    # Sizes and modification times of the files behind data_path: every cache below is keyed on it,
+    # so replaced or modified files are re-read instead of served stale.
+    data_key = source_fingerprint(data_path)
+    with st.spinner("🌊 Cataloguing oceanographic data files..."):
+        catalog = analyzer.get_catalog(data_path, data_key)
+        if catalog is None or not catalog.files:
+            st.error("❌ Failed to load oceanographic data. Please verify the file or directory path and try again.")
             st.stop()
 
-    with st.spinner("📊 Extracting metadata and preparing data cache..."):
-        metadata = analyzer.get_basic_metadata(dataset)
+    with st.spinner("📊 Extracting metadata and aligning observations..."):
+        metadata = analyzer.get_basic_metadata(catalog, data_key)
         if metadata is None:
             st.error("❌ Failed to extract dataset metadata.")
             st.stop()
         
-        data_cache = {
-            'lat': analyzer.get_valid_data(dataset, 'lat', sample_size=5000),
-            'lon': analyzer.get_valid_data(dataset, 'lon', sample_size=5000),
-            'z': analyzer.get_valid_data(dataset, 'z', sample_size=5000),
-            'time': analyzer.get_valid_data(dataset, 'time', sample_size=5000),
-            'Temperature': analyzer.get_valid_data(dataset, 'Temperature', sample_size=5000),
-            'Salinity': analyzer.get_valid_data(dataset, 'Salinity', sample_size=5000),
-            'Oxygen': analyzer.get_valid_data(dataset, 'Oxygen', sample_size=5000)
-        }
+        analyzer.convert_observation_table(catalog, sample_size=analyzer.max_observations)
+        table = analyzer.get_observation_table(catalog, data_path, data_key, sample_size=analyzer.max_observations)
+        if table is None:
+            st.error("❌ Failed to read the cast and observation arrays.")
+            st.stop()
 
     analyzer.display_header()
 
@@ -1416,6 +1389,7 @@ def main():
             ("🌊 Depth Analysis", "depth"),
             ("🔬 Parameter Analysis", "parameter"),
             ("📈 Depth Profiles", "profiles"),
+            ("🧭 Climatology", "climatology"),
             ("📅 Temporal Analysis", "temporal"),
             ("🔄 K-Means Clustering", "clustering"),
             ("🌳 Water Mass Classification", "classification"),
@@ -1425,37 +1399,46 @@ def main():
         ]
         
         selected_analysis = st.radio("Select Analysis Type:", analysis_options, format_func=lambda x: x[0])
+        region, bounds = analyzer.select_region()
 
-    if selected_analysis[1] == "overview":
+    if bounds is not None:
+        table = analyzer.get_region_table(table, data_key, analyzer.max_observations, bounds)
+        if table.n_casts == 0:
+            st.warning(f"⚠️ No casts found in {region}. Choose another region.")
+            st.stop()
+
+    models = analyzer.get_model_registry(catalog.cache_dir)
+    table_key = {'data': data_key, 'sample_size': analyzer.max_observations, 'bounds': bounds}
+
+    with section('tab', tab=selected_analysis[1], table_rows=len(table)):
+        show_analysis(analyzer, selected_analysis[1], table, metadata, catalog, data_key, bounds, models, table_key)
+
+def show_analysis(analyzer: StreamlitWODAnalyzer, selected: str, table: ObservationTable, metadata: dict,
+                  catalog: Catalog, data_key: str, bounds: tuple, models: ModelRegistry, table_key: dict):
+    if selected == "overview":
         analyzer.display_overview_metrics(metadata)
-    elif selected_analysis[1] == "geographic":
-        analyzer.create_geographic_map(data_cache)
-    elif selected_analysis[1] == "depth":
-        analyzer.create_depth_analysis(data_cache)
-    elif selected_analysis[1] == "parameter":
-        analyzer.create_parameter_analysis(data_cache)
-    elif selected_analysis[1] == "profiles":
-        analyzer.create_depth_profiles(data_cache)
-    elif selected_analysis[1] == "temporal":
-        analyzer.create_temporal_analysis(data_cache)
-    elif selected_analysis[1] == "clustering":
-        analyzer.create_kmeans_clustering(data_cache)
-    elif selected_analysis[1] == "classification":
-        analyzer.create_decision_tree_classification(data_cache)
-    elif selected_analysis[1] == "timeseries":
-        analyzer.create_time_series_analysis(data_cache)
-    elif selected_analysis[1] == "prediction":
-        analyzer.create_prediction_section(data_cache)
-    elif selected_analysis[1] == "export":
-        analyzer.create_export_section(data_cache, metadata)
-
-if dataset and hasattr(dataset, 'close'):
-        try:
-            dataset.close()
-        except (OSError, RuntimeError) as e:
-            pass
-        except Exception as e:
-            st.warning(f"⚠️ Note: Dataset cleanup encountered an issue: {str(e)}")
+    elif selected == "geographic":
+        analyzer.create_geographic_map(table, data_key, bounds)
+    elif selected == "depth":
+        analyzer.create_depth_analysis(table, catalog, data_key, bounds)
+    elif selected == "parameter":
+        analyzer.create_parameter_analysis(table, catalog, data_key, bounds)
+    elif selected == "profiles":
+        analyzer.create_depth_profiles(catalog, data_key, bounds)
+    elif selected == "climatology":
+        analyzer.create_climatology(catalog, metadata, bounds)
+    elif selected == "temporal":
+        analyzer.create_temporal_analysis(table)
+    elif selected == "clustering":
+        analyzer.create_kmeans_clustering(table, models, table_key, catalog, bounds)
+    elif selected == "classification":
+        analyzer.create_decision_tree_classification(table, models, table_key, catalog, bounds)
+    elif selected == "timeseries":
+        analyzer.create_time_series_analysis(catalog, data_key, bounds)
+    elif selected == "prediction":
+        analyzer.create_prediction_section(table, models, table_key)
+    elif selected == "export":
+        analyzer.create_export_section(table, metadata, catalog, data_key, bounds)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1 @@
+"""Data access and analysis backends for the TideTrace dashboard."""
@@ -0,0 +1,212 @@
+"""Benchmark every analysis path on synthetic WOD files and write the timings as JSON.
+
+Usage::
+
+    python -m ocealyze.benchmark --sizes 1e4 1e5 1e6 --output benchmark.json
+
+For each size a synthetic file is generated, then each step (metadata, table
+conversion and cache hits, sampling, the computations behind every dashboard
+tab and each model fit/predict) is timed. Peak traced allocations (Python and
+NumPy, via ``tracemalloc``) are recorded with ``--memory``; tracing slows the
+steps, so timings and memory are best compared between runs with the same flag.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+
+class Recorder:
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.steps = {}
+
+    def __call__(self, name: str, function, *args, rows: int = None, **kwargs):
+        if self.memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds = time.perf_counter() - started
+        step = {'seconds': round(seconds, 6)}
+        if self.memory:
+            step['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if rows is not None:
+            step['rows'] = int(rows)
+            step['rows_per_second'] = round(rows / seconds, 1) if seconds > 0 else None
+        self.steps[name] = step
+        print(f'  {name:32s} {seconds:9.3f}s', file=sys.stderr)
+        return result
+
+
+def environment() -> dict:
+    import netCDF4
+    import pandas
+    import sklearn
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'netCDF4': netCDF4.__version__,
+        'scikit-learn': sklearn.__version__,
+    }
+
+
+def run_size(n_observations: int, workdir: str, record: Recorder, workers: int, sample_size: int,
+             query_points: int) -> dict:
+    from sklearn.cluster import KMeans
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.tree import DecisionTreeClassifier
+
+    from ocealyze.catalog import Catalog
+    from ocealyze.climatology import climatology_map, write_climatology
+    from ocealyze.clustering import CLUSTER_FEATURES, assign_labels, cluster_means, fit_streaming_kmeans
+    from ocealyze.columnstore import load_observation_table
+    from ocealyze.density import density_cells
+    from ocealyze.prediction import predict_grid, predict_with_spread
+    from ocealyze.profiles import depth_profile, standard_depth_edges
+    from ocealyze.reports import DEPTH_ZONE_EDGES, casts_per_year
+    from ocealyze.spatial import GridIndex
+    from ocealyze.synthetic import write_synthetic_wod
+    from ocealyze.timeseries import linear_trend, period_means
+    from ocealyze.watermass import category_counts, label_water_masses
+
+    path = os.path.join(workdir, f'synthetic_{n_observations}.nc')
+    cache = os.path.join(workdir, 'cache')
+    shutil.rmtree(cache, ignore_errors=True)
+    dimensions = record('generate', write_synthetic_wod, path, n_observations, chunk_size=1 << 16,
+                        rows=n_observations)
+
+    catalog = record('catalog_scan', Catalog.scan, path, max_workers=workers, root=cache, rows=dimensions['casts'])
+    record('metadata', catalog.metadata)
+    table = record('load_table_cold', load_observation_table, path, root=cache, max_workers=workers,
+                   rows=n_observations)
+    record('load_table_cached', load_observation_table, path, root=cache, rows=n_observations)
+    budget = max(n_observations // 10, 1)
+    record('load_sampled_cold', load_observation_table, path, sample_size=budget, seed=42, root=cache,
+           max_workers=workers, rows=budget)
+    rows = len(table)
+
+    # Overview / geographic
+    index = record('geographic_grid_index', GridIndex, table.casts['lat'], table.casts['lon'], 1.0,
+                   rows=table.n_casts)
+    region = record('region_query', lambda: table.select_casts(index.query_bbox(0, 65, -80, 0)), rows=rows)
+    record('geographic_density', density_cells, table.casts['lat'], table.casts['lon'], 2.0, rows=table.n_casts)
+
+    # Depth / parameter / export: streamed over the file
+    record('depth_summary', lambda: catalog.summarize('z', filter_name='positive').to_dict(), rows=rows)
+    record('depth_zones', catalog.histogram, 'z', edges=DEPTH_ZONE_EDGES, filter_name='positive', right=True,
+           rows=rows)
+    record('depth_histogram', catalog.histogram, 'z', bins=50, filter_name='positive', rows=rows)
+    for name in ('Temperature', 'Salinity', 'Oxygen'):
+        record(f'parameter_summary_{name}', lambda: catalog.summarize(name).to_dict(), rows=dimensions[f'{name}_obs'])
+        record(f'parameter_histogram_{name}', catalog.histogram, name, bins=60, rows=dimensions[f'{name}_obs'])
+    climatology = record('climatology_grid_5deg', catalog.climatology_grid, 5.0, rows=rows)
+    climatology_path = os.path.join(workdir, f'climatology_{n_observations}.nc')
+    record('climatology_write_5deg', write_climatology, climatology, climatology_path)
+    record('climatology_map_5deg', climatology_map, climatology_path, 'Temperature', 0, 1)
+    record('region_summary_Temperature', lambda: catalog.summarize('Temperature', (0, 65, -80, 0)).to_dict(),
+           rows=len(region))
+
+    # Profiles / temporal / time series: in-memory table work
+    record('profiles_standard_levels', lambda: depth_profile(table, 'Temperature', standard_depth_edges(2000)).to_dict(),
+           rows=rows)
+    record('temporal_casts_per_year', casts_per_year, table.casts['year'], rows=table.n_casts)
+    partials = record('timeseries_partials', catalog.series_partials, rows=rows)
+
+    def region_trend():
+        series = period_means(partials.monthly('Temperature', (0, 65, -80, 0), 1))
+        return linear_trend(series['years'].astype(np.float64), series['year_mean'])
+
+    record('timeseries_region_trend', region_trend)
+
+    # Clustering
+    sample = table.sample_rows(sample_size, *CLUSTER_FEATURES, seed=42)
+    data = np.column_stack([table[name][sample] for name in CLUSTER_FEATURES])
+    if len(sample) >= 4:
+        scaled = StandardScaler().fit_transform(data)
+        record('kmeans_sample_fit', KMeans(n_clusters=4, n_init=10, random_state=42).fit, scaled, rows=len(sample))
+        scaler, kmeans = record('kmeans_streaming_fit', fit_streaming_kmeans, table, 4, seed=42, rows=rows)
+        labels = np.empty(rows, dtype=np.int8)
+        record('kmeans_assign_labels', assign_labels, table, scaler, kmeans, labels, rows=rows)
+        record('kmeans_cluster_means', cluster_means, table, labels, 4, rows=rows)
+
+    # Water masses
+    codes = np.empty(rows, dtype=np.int8)
+    record('watermass_labels', label_water_masses, table, codes, rows=rows)
+    record('watermass_counts', category_counts, codes, 4, rows=rows)
+    sample = table.sample_rows(sample_size, 'Temperature', 'Salinity', seed=42)
+    if len(sample):
+        X = StandardScaler().fit_transform(np.column_stack([table['Temperature'][sample], table['Salinity'][sample]]))
+        record('decision_tree_fit', DecisionTreeClassifier(max_depth=5, random_state=42).fit, X, codes[sample],
+               rows=len(sample))
+
+    # Prediction
+    features = ('lat', 'lon', 'z', 'year')
+    sample = table.sample_rows(sample_size, *features, 'Temperature', seed=42)
+    if len(sample) >= 10:
+        X = np.column_stack([table[name][sample] for name in features])
+        model = record('random_forest_fit', RandomForestRegressor(n_estimators=100, random_state=42).fit, X,
+                       table['Temperature'][sample], rows=len(sample))
+        rng = np.random.default_rng(0)
+        queries = np.column_stack([rng.uniform(-90, 90, query_points), rng.uniform(-180, 180, query_points),
+                                   rng.uniform(0, 5000, query_points), rng.integers(1950, 2024, query_points)])
+        record('random_forest_batch_predict', predict_with_spread, model, queries, max_workers=workers,
+               rows=query_points)
+        record('random_forest_grid_1deg', predict_grid, model, 1.0, 100.0, 2000, max_workers=workers,
+               rows=180 * 360)
+
+    return {
+        'observations': n_observations,
+        'file_bytes': os.path.getsize(path),
+        'dimensions': dimensions,
+        'steps': record.steps,
+    }
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the analysis backends on synthetic WOD files.')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e4, 1e5, 1e6], help='observations per file')
+    parser.add_argument('--output', default='benchmark.json', help='JSON results file ("-" for stdout)')
+    parser.add_argument('--workdir', default=None, help='where to write the synthetic files (temporary by default)')
+    parser.add_argument('--workers', type=int, default=min(os.cpu_count() or 1, 8))
+    parser.add_argument('--sample-size', type=int, default=5000, help='rows for the sampled model fits')
+    parser.add_argument('--query-points', type=int, default=100_000, help='points for batch prediction')
+    parser.add_argument('--memory', action='store_true', help='record peak traced allocations per step')
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='ocealyze-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    results = {'environment': environment(), 'memory_traced': args.memory, 'runs': []}
+    try:
+        for size in args.sizes:
+            print(f'{int(size):,} observations', file=sys.stderr)
+            record = Recorder(args.memory)
+            results['runs'].append(run_size(int(size), workdir, record, args.workers, args.sample_size,
+                                            args.query_points))
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w') as handle:
+            handle.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,529 @@
+"""Catalog of WOD NetCDF files presented as one virtual dataset.
+
+Per-file metadata (extent, period, counts) is scanned in parallel and kept in
+``catalog.json`` under the cache directory, so only new or modified files are
+re-read. Queries prune files by region and period before touching them, and
+aggregations run per file in worker processes before their mergeable partial
+results are combined. K-Means fits stream every selected file's chunks
+through one model in shuffled order; per-file cluster and water-mass labels
+are kept as memory-mapped columns in each file's cache. Merged summaries and histograms are kept in a shared
+``DiskCache`` keyed by the selected files' identities and the query, so every
+process using the cache directory computes each aggregate once. Gridded
+climatologies are written as NetCDF files next to them, keyed the same way.
+"""
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import netCDF4 as nc
+import numpy as np
+
+from ocealyze.climatology import ClimatologyGrid, grid_file, write_climatology
+from ocealyze.clustering import (CHUNK_ROWS, CLUSTER_FEATURES, UNLABELLED, add_cluster_sums, dataset_feature_chunks,
+                                 fit_chunked_kmeans)
+from ocealyze.columnstore import cache_root, cached_column, load_observation_table
+from ocealyze.diskcache import LOCK_DIR, LOCK_SUFFIX, DiskCache, file_lock, spec_key
+from ocealyze.handles import open_dataset
+from ocealyze.histogram import FILTERS, stream_histogram, value_range
+from ocealyze.instrumentation import add, cache_miss
+from ocealyze.profiles import VALUE_RANGES, ProfileAccumulator, profile_file
+from ocealyze.ragged import (OBSERVED_VARIABLES, ObservationTable, concat_tables, decode_time_parts, read_variable,
+                             row_offsets, variable_chunks)
+from ocealyze.sampling import CHUNK_ELEMENTS, read_column
+from ocealyze.spatial import region_mask
+from ocealyze.reports import DEPTH_ZONE_EDGES
+from ocealyze.stats import StreamingSummary, summarize
+from ocealyze.timecodec import DEFAULT_UNITS, decode_times
+from ocealyze.timeseries import SERIES_RESOLUTION, SERIES_VERSION, SeriesPartials, series_file
+from ocealyze.watermass import DEFAULT_RULES, category_counts, label_dataset
+
+CATALOG_FILE = 'catalog.json'
+CATALOG_VERSION = 1
+AGGREGATES_DIR = 'aggregates'
+AGGREGATE_BYTES = 64 << 20
+CLIMATOLOGY_DIR = 'climatology'
+
+
+def source_files(path: str, pattern: str = '*.nc') -> list:
+    path = os.path.abspath(path)
+    if os.path.isfile(path):
+        return [path]
+    return sorted(glob.glob(os.path.join(path, '**', pattern), recursive=True))
+
+
+def state_fingerprint(states: list) -> str:
+    return hashlib.blake2b(json.dumps(states).encode(), digest_size=12).hexdigest()
+
+
+def source_fingerprint(path: str, pattern: str = '*.nc') -> str:
+    """Stat-only identity of a file or directory tree; equals ``Catalog.fingerprint()`` of a fresh scan.
+
+    Cheap enough to compute on every rerun, and changes whenever a file is added, removed, resized or touched.
+    """
+    states = []
+    for file_path in source_files(path, pattern):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        states.append((file_path, stat.st_size, stat.st_mtime_ns))
+    return state_fingerprint(states)
+
+
+def _finite_range(values: np.ndarray) -> list:
+    values = values[np.isfinite(values)]
+    return [float(values.min()), float(values.max())] if len(values) else None
+
+
+def scan_file(file_path: str) -> dict:
+    stat = os.stat(file_path)
+    with open_dataset(file_path) as dataset:
+        dimensions = dataset.dimensions
+        info = {
+            'path': file_path,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'casts': len(dimensions['casts']) if 'casts' in dimensions else 0,
+            'observations': {
+                name: len(dimensions[f'{name}_obs'])
+                for name in ('z',) + OBSERVED_VARIABLES if f'{name}_obs' in dimensions
+            },
+            'variables': sorted(dataset.variables),
+        }
+        for name in ('lat', 'lon'):
+            variable = dataset.variables.get(name, None)
+            info[f'{name}_range'] = _finite_range(read_column(variable)) if variable is not None else None
+
+        time_variable = dataset.variables.get('time', None)
+        info['time_range'] = None
+        info['year_range'] = None
+        if time_variable is not None:
+            time_range = _finite_range(read_column(time_variable, np.float64))
+            if time_range is not None:
+                units = getattr(time_variable, 'units', DEFAULT_UNITS)
+                calendar = getattr(time_variable, 'calendar', 'standard')
+                bounds = decode_times(time_range, units, calendar)
+                info['time_range'] = [str(bound) for bound in bounds]
+                info['year_range'] = [int(str(bound)[:4]) for bound in bounds]
+    return info
+
+
+def cast_selection(dataset: nc.Dataset, bounds: tuple = None, years: tuple = None) -> np.ndarray:
+    """Boolean mask over casts for a region and/or (first, last) year range; None when unfiltered."""
+    if bounds is None and years is None:
+        return None
+    n_casts = len(dataset.dimensions['casts'])
+    selected = np.ones(n_casts, dtype=bool)
+    if bounds is not None:
+        lat = read_column(dataset.variables['lat'])
+        lon = read_column(dataset.variables['lon'])
+        selected &= region_mask(lat, lon, bounds)
+    if years is not None:
+        year = decode_time_parts(dataset, read_column(dataset.variables['time'], np.float64))['year']
+        selected &= (year >= years[0]) & (year <= years[1])
+    return selected
+
+
+def summarize_file(file_path: str, variable: str, bounds: tuple = None, years: tuple = None,
+                   filter_name: str = None) -> StreamingSummary:
+    with open_dataset(file_path) as dataset:
+        if variable not in dataset.variables:
+            return StreamingSummary()
+        selected = cast_selection(dataset, bounds, years)
+        return summarize(lambda: variable_chunks(dataset, variable, selected), FILTERS[filter_name])
+
+
+def range_file(file_path: str, variable: str, bounds: tuple = None, years: tuple = None,
+               filter_name: str = None) -> tuple:
+    with open_dataset(file_path) as dataset:
+        if variable not in dataset.variables:
+            return (None, None)
+        selected = cast_selection(dataset, bounds, years)
+        return value_range(lambda: variable_chunks(dataset, variable, selected), FILTERS[filter_name])
+
+
+def histogram_file(file_path: str, variable: str, edges: tuple, bounds: tuple = None, years: tuple = None,
+                   filter_name: str = None, right: bool = False) -> np.ndarray:
+    with open_dataset(file_path) as dataset:
+        if variable not in dataset.variables:
+            return np.zeros(len(edges) - 1, dtype=np.int64)
+        selected = cast_selection(dataset, bounds, years)
+        counts, _ = stream_histogram(
+            lambda: variable_chunks(dataset, variable, selected), edges=edges, keep=FILTERS[filter_name], right=right
+        )
+        return counts
+
+
+def cluster_file(file_path: str, scaler, kmeans, key: dict, names=CLUSTER_FEATURES, bounds: tuple = None,
+                 root: str = None, chunk_size: int = CHUNK_ROWS) -> tuple:
+    """Per-cluster counts and feature sums of a file, labelling its rows into a cached column on first use."""
+    n_clusters = kmeans.n_clusters
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    sums = np.zeros((len(names), n_clusters))
+    stat = os.stat(file_path)
+    with open_dataset(file_path) as dataset:
+        if 'z' not in dataset.variables:
+            return counts, sums
+        selected = cast_selection(dataset, bounds)
+        filled = []
+
+        def fill(out):
+            out[:] = UNLABELLED
+            for z_row, X in dataset_feature_chunks(dataset, names, selected, chunk_size):
+                labels = kmeans.predict(scaler.transform(X))
+                out[z_row] = labels
+                add_cluster_sums(counts, sums, labels, X)
+            filled.append(True)
+
+        options = {'model': key, 'features': list(names), 'bounds': bounds,
+                   'file': (file_path, stat.st_size, stat.st_mtime_ns)}
+        labels = cached_column(cache_root(file_path, root), 'kmeans', options, dataset.variables['z'].shape[0],
+                               np.int8, fill)
+        if not filled:
+            for z_row, X in dataset_feature_chunks(dataset, names, selected, chunk_size):
+                add_cluster_sums(counts, sums, labels[z_row], X)
+    return counts, sums
+
+
+def water_mass_file(file_path: str, rules=DEFAULT_RULES, bounds: tuple = None, root: str = None,
+                    chunk_size: int = CHUNK_ELEMENTS) -> np.ndarray:
+    """Rows per water-mass category in a file, labelling its rows into a cached column on first use."""
+    counts = np.zeros(len(rules) + 1, dtype=np.int64)
+    stat = os.stat(file_path)
+    with open_dataset(file_path) as dataset:
+        if 'z' not in dataset.variables:
+            return counts
+        options = {'rules': rules, 'file': (file_path, stat.st_size, stat.st_mtime_ns)}
+        codes = cached_column(cache_root(file_path, root), 'water_mass', options, dataset.variables['z'].shape[0],
+                              np.int8, lambda out: label_dataset(dataset, out, rules))
+        selected = cast_selection(dataset, bounds)
+        if selected is None:
+            return category_counts(codes, len(counts))
+        offsets = row_offsets(read_variable(dataset, 'z_row_size', np.int64))
+    # Labels cover every cast, so a region only changes which rows are counted.
+    for start in range(0, len(codes), chunk_size):
+        rows = np.arange(start, min(start + chunk_size, len(codes)), dtype=np.int64)
+        chunk = np.asarray(codes[start:start + len(rows)])
+        counts += category_counts(chunk[selected[np.searchsorted(offsets, rows, side='right') - 1]], len(counts))
+    return counts
+
+
+def _overlaps(value_range: list, low: float, high: float) -> bool:
+    return value_range is not None and value_range[1] >= low and value_range[0] <= high
+
+
+class Catalog:
+    def __init__(self, files: list, max_workers: int = None, cache_dir: str = None, root: str = None):
+        self.files = files
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        # Cache root for the files' decoded tables; None keeps them next to each file.
+        self.root = root
+        self.aggregates = None
+        if cache_dir:
+            # Callers may merge into returned summaries, so each hit is a fresh copy read from disk.
+            self.aggregates = DiskCache(os.path.join(cache_dir, AGGREGATES_DIR), AGGREGATE_BYTES, memory_entries=0)
+
+    @classmethod
+    def scan(cls, path: str, pattern: str = '*.nc', max_workers: int = None, root: str = None) -> 'Catalog':
+        """Catalog a single file or every ``pattern`` match below a directory."""
+        path = os.path.abspath(path)
+        if os.path.isfile(path):
+            return cls([scan_file(path)], max_workers, cache_root(path, root), root)
+
+        paths = source_files(path, pattern)
+        cache_dir = cache_root(os.path.join(path, CATALOG_FILE), root)
+        index_path = os.path.join(cache_dir, CATALOG_FILE)
+        known = {}
+        if os.path.exists(index_path):
+            with open(index_path) as handle:
+                saved = json.load(handle)
+            if saved.get('version') == CATALOG_VERSION:
+                known = saved['files']
+
+        def current(file_path):
+            info = known.get(file_path)
+            stat = os.stat(file_path)
+            return info is not None and info['size'] == stat.st_size and info['mtime_ns'] == stat.st_mtime_ns
+
+        stale = [file_path for file_path in paths if not current(file_path)]
+        catalog = cls([], max_workers, cache_dir, root)
+        for file_path, info in zip(stale, catalog._map(scan_file, [(file_path,) for file_path in stale])):
+            known[file_path] = info
+        catalog.files = [known[file_path] for file_path in paths]
+
+        if stale:
+            try:
+                os.makedirs(os.path.dirname(index_path), exist_ok=True)
+                with open(index_path, 'w') as handle:
+                    json.dump({'version': CATALOG_VERSION, 'files': {info['path']: info for info in catalog.files}}, handle)
+            except OSError:
+                pass
+        return catalog
+
+    def fingerprint(self) -> str:
+        """Identity of the catalogued files as scanned: paths, sizes and modification times."""
+        return state_fingerprint([(info['path'], info['size'], info['mtime_ns']) for info in self.files])
+
+    def _count_scan(self, files: list, variable: str):
+        # Workers run in other processes; credit the rows they stream (as decoded float32) here.
+        rows = sum(info['observations'].get(variable, 0) for info in files)
+        add('rows', rows)
+        add('bytes_read', rows * np.dtype(np.float32).itemsize)
+
+    def _spec(self, operation: str, files: list, arguments: list) -> dict:
+        return {
+            'version': CATALOG_VERSION, 'operation': operation, 'arguments': arguments,
+            'files': [(info['path'], info['size'], info['mtime_ns']) for info in files],
+        }
+
+    def _cached(self, operation: str, files: list, arguments: list, compute):
+        if self.aggregates is None:
+            return compute()
+        return self.aggregates.get_or_compute(self._spec(operation, files, arguments), compute)
+
+    def _map(self, function, arguments: list) -> list:
+        if self.max_workers > 1 and len(arguments) > 1:
+            with ProcessPoolExecutor(min(self.max_workers, len(arguments))) as executor:
+                return list(executor.map(function, *zip(*arguments)))
+        return [function(*args) for args in arguments]
+
+    def select(self, bounds: tuple = None, years: tuple = None) -> list:
+        """Files whose extent and period can intersect the filter."""
+        selected = []
+        for info in self.files:
+            if bounds is not None:
+                lat_min, lat_max, lon_min, lon_max = bounds
+                if not _overlaps(info['lat_range'], lat_min, lat_max):
+                    continue
+                if lon_min <= lon_max:
+                    if not _overlaps(info['lon_range'], lon_min, lon_max):
+                        continue
+                elif not (_overlaps(info['lon_range'], lon_min, 180) or _overlaps(info['lon_range'], -180, lon_max)):
+                    continue
+            if years is not None and not _overlaps(info['year_range'], years[0], years[1]):
+                continue
+            selected.append(info)
+        return selected
+
+    def metadata(self) -> dict:
+        """Aggregate of the per-file metadata in the shape of ``get_basic_metadata``."""
+        def total(name):
+            return sum(info['observations'].get(name, 0) for info in self.files)
+
+        def span(key):
+            ranges = [info[key] for info in self.files if info[key] is not None]
+            if not ranges:
+                return (None, None)
+            return (min(low for low, _ in ranges), max(high for _, high in ranges))
+
+        time_range = span('time_range')
+        return {
+            'total_files': len(self.files),
+            'total_casts': sum(info['casts'] for info in self.files),
+            'total_temperature_obs': total('Temperature'),
+            'total_salinity_obs': total('Salinity'),
+            'total_oxygen_obs': total('Oxygen'),
+            'depth_obs': total('z'),
+            'lat_range': span('lat_range'),
+            'lon_range': span('lon_range'),
+            'time_range': tuple(datetime.fromisoformat(bound) if bound else None for bound in time_range),
+        }
+
+    def summarize(self, variable: str, bounds: tuple = None, years: tuple = None,
+                  filter_name: str = None) -> StreamingSummary:
+        files = self.select(bounds, years)
+
+        def compute():
+            summary = StreamingSummary()
+            self._count_scan(files, variable)
+            arguments = [(info['path'], variable, bounds, years, filter_name) for info in files]
+            for partial in self._map(summarize_file, arguments):
+                summary.merge(partial)
+            return summary
+
+        return self._cached('summarize', files, [variable, bounds, years, filter_name], compute)
+
+    def histogram(self, variable: str, bins: int = 50, edges: tuple = None, bounds: tuple = None,
+                  years: tuple = None, filter_name: str = None, right: bool = False) -> tuple:
+        """Merged counts over every selected file; without ``edges`` the range comes from a min/max pass."""
+        files = self.select(bounds, years)
+        edges = None if edges is None else np.asarray(edges, dtype=np.float64)
+
+        def compute():
+            bin_edges = edges
+            if bin_edges is None:
+                self._count_scan(files, variable)
+                ranges = self._map(range_file, [(info['path'], variable, bounds, years, filter_name) for info in files])
+                ranges = [(low, high) for low, high in ranges if low is not None]
+                if not ranges:
+                    return np.zeros(bins, dtype=np.int64), np.linspace(0, 1, bins + 1)
+                low, high = min(low for low, _ in ranges), max(high for _, high in ranges)
+                if low == high:
+                    low, high = low - 0.5, high + 0.5
+                bin_edges = np.linspace(low, high, bins + 1)
+            counts = np.zeros(len(bin_edges) - 1, dtype=np.int64)
+            self._count_scan(files, variable)
+            arguments = [(info['path'], variable, bin_edges, bounds, years, filter_name, right) for info in files]
+            for partial in self._map(histogram_file, arguments):
+                counts += partial
+            return counts, bin_edges
+
+        query = [variable, bins, None if edges is None else edges.tolist(), bounds, years, filter_name, right]
+        return self._cached('histogram', files, query, compute)
+
+    def depth_profile(self, variable: str, depth_edges: np.ndarray, value_range: tuple = None,
+                      clip_to_range: bool = False, bounds: tuple = None) -> ProfileAccumulator:
+        """Profile of every selected observation, merged from per-file accumulators.
+
+        Without ``value_range`` (and no ``VALUE_RANGES`` entry) the percentile range comes from a min/max pass.
+        """
+        files = self.select(bounds)
+        edges = np.asarray(depth_edges, dtype=np.float64)
+
+        def compute():
+            profile_range = value_range or VALUE_RANGES.get(variable)
+            if profile_range is None:
+                self._count_scan(files, variable)
+                ranges = self._map(range_file, [(info['path'], variable, bounds) for info in files])
+                ranges = [(low, high) for low, high in ranges if low is not None]
+                low, high = (min(low for low, _ in ranges), max(high for _, high in ranges)) if ranges else (0.0, 1.0)
+                profile_range = (low - 0.5, high + 0.5) if low == high else (low, high)
+            profile = ProfileAccumulator(edges, profile_range)
+            for name in ('z', variable):
+                self._count_scan(files, name)
+            arguments = [(info['path'], variable, edges, profile_range, clip_to_range, bounds) for info in files]
+            for partial in self._map(profile_file, arguments):
+                profile.merge(partial)
+            return profile
+
+        query = [variable, edges.tolist(), value_range, clip_to_range, bounds]
+        return self._cached('depth_profile', files, query, compute)
+
+    def climatology_grid(self, resolution: float = 1.0, max_depth: float = None,
+                         variables=OBSERVED_VARIABLES) -> ClimatologyGrid:
+        """Monthly grid over every catalogued file, merged from per-file partials."""
+        for name in ('z',) + tuple(variables):
+            self._count_scan(self.files, name)
+        climatology = ClimatologyGrid(resolution, max_depth, variables)
+        arguments = [(info['path'], resolution, max_depth, tuple(variables)) for info in self.files]
+        for partial in self._map(grid_file, arguments):
+            climatology.merge(partial)
+        climatology.compact()
+        return climatology
+
+    def climatology(self, resolution: float = 1.0, max_depth: float = None, variables=OBSERVED_VARIABLES,
+                    build: bool = True) -> str:
+        """Path of the climatology NetCDF for the catalogued files, gridded and written on first use.
+
+        With ``build`` off, returns None instead of gridding when it is not written yet.
+        """
+        if self.cache_dir is None:
+            raise ValueError("Catalog has no cache directory to write the climatology to.")
+        directory = os.path.join(self.cache_dir, CLIMATOLOGY_DIR)
+        key = spec_key(self._spec('climatology', self.files, [resolution, max_depth, list(variables)]))
+        path = os.path.join(directory, key + '.nc')
+        if os.path.exists(path):
+            return path
+        if not build:
+            return None
+        with file_lock(os.path.join(directory, LOCK_DIR, key + LOCK_SUFFIX)):
+            # Another process may have written it while we waited for the lock.
+            if not os.path.exists(path):
+                cache_miss()
+                climatology = self.climatology_grid(resolution, max_depth, variables)
+                write_climatology(climatology, path, {'source_fingerprint': self.fingerprint()})
+        return path
+
+    def series_partials(self, variables=OBSERVED_VARIABLES) -> SeriesPartials:
+        """Yearly and monthly partials of every catalogued file, merged once and kept with the aggregates."""
+        def compute():
+            partials = SeriesPartials(variables)
+            for name in ('z',) + tuple(variables):
+                self._count_scan(self.files, name)
+            for partial in self._map(series_file, [(info['path'], tuple(variables)) for info in self.files]):
+                partials.merge(partial)
+            partials.compact()
+            return partials
+
+        arguments = [list(variables), SERIES_RESOLUTION, list(DEPTH_ZONE_EDGES), SERIES_VERSION]
+        return self._cached('series_partials', self.files, arguments, compute)
+
+    def fit_kmeans(self, n_clusters: int, names=CLUSTER_FEATURES, bounds: tuple = None, chunk_size: int = CHUNK_ROWS,
+                   epochs: int = 1, seed: int = None) -> tuple:
+        """``(scaler, kmeans)`` fitted over every selected observation, file by file in shuffled order."""
+        files = self.select(bounds)
+
+        def chunks(order):
+            for name in names:
+                self._count_scan(files, name)
+            visits = files if order is None else [files[i] for i in order(len(files))]
+            for info in visits:
+                with open_dataset(info['path']) as dataset:
+                    if 'z' not in dataset.variables:
+                        continue
+                    selected = cast_selection(dataset, bounds)
+                    for _, X in dataset_feature_chunks(dataset, names, selected, chunk_size, order):
+                        yield X
+
+        return fit_chunked_kmeans(chunks, n_clusters, chunk_size, epochs, seed)
+
+    def clusters(self, scaler, kmeans, key: dict, names=CLUSTER_FEATURES, bounds: tuple = None) -> tuple:
+        """Per-cluster counts and feature means over every selected observation; ``key`` identifies the model."""
+        files = self.select(bounds)
+
+        def compute():
+            counts = np.zeros(kmeans.n_clusters, dtype=np.int64)
+            sums = np.zeros((len(names), kmeans.n_clusters))
+            for name in names:
+                self._count_scan(files, name)
+            arguments = [(info['path'], scaler, kmeans, key, names, bounds, self.root) for info in files]
+            for file_counts, file_sums in self._map(cluster_file, arguments):
+                counts += file_counts
+                sums += file_sums
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return counts, sums / counts
+
+        return self._cached('clusters', files, [key, list(names), bounds], compute)
+
+    def water_masses(self, rules=DEFAULT_RULES, bounds: tuple = None) -> np.ndarray:
+        """Observations per ``categories(rules)`` entry over every selected file."""
+        files = self.select(bounds)
+
+        def compute():
+            counts = np.zeros(len(rules) + 1, dtype=np.int64)
+            for name in ('Temperature', 'Salinity'):
+                self._count_scan(files, name)
+            for partial in self._map(water_mass_file, [(info['path'], rules, bounds, self.root) for info in files]):
+                counts += partial
+            return counts
+
+        return self._cached('water_masses', files, [rules, bounds], compute)
+
+    def budgets(self, files: list, max_observations: int = None) -> list:
+        """Per-file sample sizes splitting ``max_observations`` in proportion to depth observations."""
+        total = sum(info['observations'].get('z', 0) for info in files)
+        if max_observations is None or total <= max_observations:
+            return [None] * len(files)
+        return [max(int(max_observations * info['observations'].get('z', 0) / total), 1) for info in files]
+
+    def table(self, variables=OBSERVED_VARIABLES, bounds: tuple = None, years: tuple = None,
+              max_observations: int = None, seed: int = None) -> ObservationTable:
+        """Observation table over the selected files, each loaded through its sidecar cache."""
+        files = self.select(bounds, years)
+        tables = []
+        for info, budget in zip(files, self.budgets(files, max_observations)):
+            table = load_observation_table(info['path'], variables, sample_size=budget, seed=seed, root=self.root,
+                                           max_workers=self.max_workers)
+            if bounds is not None or years is not None:
+                selected = np.ones(table.n_casts, dtype=bool)
+                if bounds is not None:
+                    selected &= region_mask(table.casts['lat'], table.casts['lon'], bounds)
+                if years is not None:
+                    selected &= (table.casts['year'] >= years[0]) & (table.casts['year'] <= years[1])
+                table = table.select_casts(np.flatnonzero(selected))
+            tables.append(table)
+        return concat_tables(tables) if tables else None
@@ -0,0 +1,228 @@
+"""Headless batch runner: the dashboard's analyses for one or many WOD files, written to disk.
+
+Usage::
+
+    python -m ocealyze.cli WOD1.nc archive/ -o results/ --workers 4 --figures
+
+Every input file (directories are searched for ``*.nc``) is processed in its
+own worker process and written to ``<output>/<name>/``, where ``name`` is the
+file's path below the inputs' common directory without its extension, so
+files of the same name in different directories do not collide. Streamlit is
+never imported, and Plotly only with ``--figures``.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from ocealyze.catalog import Catalog
+from ocealyze.clustering import CLUSTER_FEATURES
+from ocealyze.histogram import FILTERS
+from ocealyze.reports import DEPTH_ZONE_EDGES, casts_per_year, depth_zone_frame, histogram_frame, summary_record
+from ocealyze.timeseries import linear_trend, period_means
+from ocealyze.watermass import DEFAULT_RULES, categories
+
+PARAMETERS = {'Temperature': '°C', 'Salinity': 'PSU', 'Oxygen': 'µmol/kg'}
+PREDICTION_FEATURES = ('lat', 'lon', 'z', 'year')
+
+
+def find_files(paths: list, pattern: str = '*.nc') -> list:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '**', pattern), recursive=True)))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(files))
+
+
+def output_names(paths: list, files: list) -> dict:
+    """Output directory name per file: its path relative to the inputs' common directory, without extension."""
+    roots = [os.path.abspath(path) if os.path.isdir(path) else os.path.dirname(os.path.abspath(path)) for path in paths]
+    root = os.path.commonpath(roots)
+    return {path: os.path.splitext(os.path.relpath(os.path.abspath(path), root))[0] for path in files}
+
+
+def _write_json(path: str, payload: dict):
+    with open(path, 'w') as handle:
+        json.dump(payload, handle, indent=2, default=str)
+
+
+def analyze_file(file_path: str, output_dir: str, options: dict) -> dict:
+    """Run every analysis on ``file_path`` and write the results below ``output_dir``; returns a run record."""
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    bounds = options.get('bounds')
+    catalog = Catalog.scan(file_path, max_workers=1, root=options.get('cache_dir'))
+    _write_json(os.path.join(output_dir, 'metadata.json'), catalog.metadata())
+
+    records = []
+    for name, unit in PARAMETERS.items():
+        summary = catalog.summarize(name, bounds).to_dict()
+        if summary['count']:
+            records.append(summary_record(name, unit, summary))
+    pd.DataFrame(records).to_csv(os.path.join(output_dir, 'summary.csv'), index=False)
+
+    depth = catalog.summarize('z', bounds, filter_name='positive').to_dict()
+    _write_json(os.path.join(output_dir, 'depth_summary.json'), depth)
+    zone_counts, _ = catalog.histogram('z', edges=DEPTH_ZONE_EDGES, bounds=bounds, filter_name='positive', right=True)
+    depth_zone_frame(zone_counts).to_csv(os.path.join(output_dir, 'depth_zones.csv'), index=False)
+
+    histograms = {'z': catalog.histogram('z', bins=50, bounds=bounds, filter_name='positive')}
+    for name in PARAMETERS:
+        histograms[name] = catalog.histogram(name, bins=60, bounds=bounds)
+    histogram_dir = os.path.join(output_dir, 'histograms')
+    os.makedirs(histogram_dir, exist_ok=True)
+    for name, (counts, edges) in histograms.items():
+        histogram_frame(counts, edges).to_csv(os.path.join(histogram_dir, f'{name}.csv'), index=False)
+
+    table = catalog.table(tuple(PARAMETERS), bounds=bounds, max_observations=options['max_observations'], seed=42)
+    casts_per_year(table.casts['year']).to_csv(os.path.join(output_dir, 'casts_per_year.csv'), index=False)
+
+    partials = catalog.series_partials(tuple(PARAMETERS))
+    yearly, trends = [], {}
+    for name in PARAMETERS:
+        series = period_means(partials.monthly(name, bounds))
+        dated = series['year_count'] > 0
+        yearly.append(pd.DataFrame({
+            'Parameter': name, 'Year': series['years'][dated], 'Count': series['year_count'][dated],
+            'Mean': series['year_mean'][dated].round(4), 'Std': series['year_std'][dated].round(4),
+        }))
+        trends[name] = linear_trend(series['years'].astype(np.float64), series['year_mean'])
+    pd.concat(yearly).to_csv(os.path.join(output_dir, 'yearly_means.csv'), index=False)
+    _write_json(os.path.join(output_dir, 'trends.json'), trends)
+
+    results = {'file': file_path, 'rows': len(table), 'casts': table.n_casts}
+    if options['clusters'] and len(table.valid_rows(*CLUSTER_FEATURES)) >= options['clusters']:
+        # Fitted and counted over every observation in the file, not the sampled table.
+        scaler, kmeans = catalog.fit_kmeans(options['clusters'], bounds=bounds, seed=42)
+        key = {'clusters': options['clusters'], 'features': list(CLUSTER_FEATURES), 'seed': 42}
+        counts, means = catalog.clusters(scaler, kmeans, key, bounds=bounds)
+        frame = pd.DataFrame({'Cluster': range(options['clusters']), 'Count': counts})
+        for name, values in zip(CLUSTER_FEATURES, means):
+            frame[f'Mean {name}'] = values.round(3)
+        frame.to_csv(os.path.join(output_dir, 'clusters.csv'), index=False)
+        joblib.dump((scaler, kmeans), os.path.join(output_dir, 'kmeans.joblib'), compress=3)
+
+    # Counted over every observation in the file, not the sampled table.
+    counts = catalog.water_masses(DEFAULT_RULES, bounds)
+    pd.DataFrame({'Water Mass Type': categories(DEFAULT_RULES), 'Count': counts}).to_csv(
+        os.path.join(output_dir, 'water_masses.csv'), index=False
+    )
+
+    if options['models']:
+        model_info = {}
+        for name in PARAMETERS:
+            rows = table.sample_rows(options['model_sample'], *PREDICTION_FEATURES, name, seed=42)
+            if len(rows) < 10:
+                continue
+            X = np.column_stack([table[feature][rows] for feature in PREDICTION_FEATURES])
+            model = RandomForestRegressor(n_estimators=100, random_state=42, oob_score=True).fit(X, table[name][rows])
+            joblib.dump(model, os.path.join(output_dir, f'model_{name}.joblib'), compress=3)
+            model_info[name] = {
+                'training_rows': len(rows),
+                'oob_r2': float(model.oob_score_),
+                'feature_importances': dict(zip(PREDICTION_FEATURES, model.feature_importances_.round(4).tolist()))
+            }
+        _write_json(os.path.join(output_dir, 'models.json'), model_info)
+
+    if options['figures']:
+        write_figures(output_dir, histograms, table)
+
+    results['seconds'] = round(time.perf_counter() - started, 3)
+    return results
+
+
+def write_figures(output_dir: str, histograms: dict, table) -> None:
+    """Standalone HTML charts of the histograms and the yearly cast counts."""
+    import plotly.express as px
+
+    figure_dir = os.path.join(output_dir, 'figures')
+    os.makedirs(figure_dir, exist_ok=True)
+    for name, (counts, edges) in histograms.items():
+        fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, labels={'x': name, 'y': 'Observations'},
+                     title=f"{name} distribution ({counts.sum():,} observations)")
+        fig.update_traces(width=np.diff(edges))
+        fig.update_layout(bargap=0)
+        fig.write_html(os.path.join(figure_dir, f'{name}_histogram.html'), include_plotlyjs='cdn')
+
+    years = casts_per_year(table.casts['year'])
+    fig = px.line(years, x='Year', y='Casts', title="Casts per year")
+    fig.write_html(os.path.join(figure_dir, 'casts_per_year.html'), include_plotlyjs='cdn')
+
+
+def parse_bounds(text: str) -> tuple:
+    values = tuple(float(value) for value in text.split(','))
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError('expected lat_min,lat_max,lon_min,lon_max')
+    return values
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m ocealyze.cli', description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='WOD NetCDF files or directories to search for *.nc')
+    parser.add_argument('-o', '--output', default='ocealyze-results', help='output directory')
+    parser.add_argument('-w', '--workers', type=int, default=min(os.cpu_count() or 1, 8),
+                        help='files processed concurrently')
+    parser.add_argument('--region', type=parse_bounds, default=None,
+                        help='lat_min,lat_max,lon_min,lon_max (lon_min > lon_max wraps across 180°)')
+    parser.add_argument('--max-observations', type=int, default=2_000_000,
+                        help='row budget of the aligned table per file')
+    parser.add_argument('--clusters', type=int, default=4, help='K-Means clusters (0 to skip)')
+    parser.add_argument('--model-sample', type=int, default=5000, help='training rows per regression model')
+    parser.add_argument('--no-models', dest='models', action='store_false', help='skip the regression models')
+    parser.add_argument('--figures', action='store_true', help='also write HTML figures (imports Plotly)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='cache shared by every file for decoded tables and aggregates '
+                             '(default: .ocealyze-cache next to each file)')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+    files = find_files(args.paths)
+    if not files:
+        print('No NetCDF files found.', file=sys.stderr)
+        return 2
+
+    options = {
+        'bounds': args.region,
+        'max_observations': args.max_observations,
+        'clusters': args.clusters,
+        'model_sample': args.model_sample,
+        'models': args.models,
+        'figures': args.figures,
+        'cache_dir': args.cache_dir and os.path.abspath(args.cache_dir),
+    }
+    os.makedirs(args.output, exist_ok=True)
+    outputs = {path: os.path.join(args.output, name) for path, name in output_names(args.paths, files).items()}
+
+    runs, failures = [], 0
+    with ProcessPoolExecutor(max(min(args.workers, len(files)), 1)) as executor:
+        futures = {executor.submit(analyze_file, path, outputs[path], options): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                failures += 1
+                runs.append({'file': path, 'error': str(e)})
+                print(f'FAILED {path}: {e}', file=sys.stderr)
+                continue
+            runs.append(record)
+            print(f"done   {path} ({record['rows']:,} rows, {record['seconds']:.1f}s)", file=sys.stderr)
+
+    _write_json(os.path.join(args.output, 'runs.json'), {'options': options, 'runs': runs})
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""K-Means over aligned observations: out-of-core fits and cluster-count sweeps.
+
+A ``StandardScaler`` is fitted with ``partial_fit`` over row chunks, then
+``MiniBatchKMeans`` takes one ``partial_fit`` step per chunk, visiting chunks in
+a shuffled order so that cast order does not bias the centres. Labels are
+assigned in a final chunked pass. Memory is bounded by the chunk size. Chunks
+come from an observation table or, through ``dataset_feature_chunks``, straight
+from a WOD file's ragged arrays.
+
+``sweep_kmeans`` fits every candidate cluster count in worker processes and
+scores each with its inertia and a subsampled silhouette.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import netCDF4 as nc
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+from ocealyze.ragged import ObservationTable, aligned_columns
+
+CLUSTER_FEATURES = ('Temperature', 'Salinity', 'Oxygen')
+CHUNK_ROWS = 1 << 16
+UNLABELLED = -1
+SILHOUETTE_SAMPLE = 2000
+
+
+def feature_chunks(table: ObservationTable, names=CLUSTER_FEATURES, chunk_size: int = CHUNK_ROWS, order=None):
+    """Yield ``(start, valid, X)``: the chunk offset, its rows with every feature finite and their features."""
+    starts = np.arange(0, len(table), chunk_size)
+    if order is not None:
+        starts = starts[order(len(starts))]
+    for start in starts:
+        stop = min(start + chunk_size, len(table))
+        X = np.column_stack([np.asarray(table[name][start:stop], dtype=np.float64) for name in names])
+        valid = np.flatnonzero(np.isfinite(X).all(axis=1))
+        if len(valid):
+            yield start, valid, X[valid]
+
+
+def dataset_feature_chunks(dataset: nc.Dataset, names=CLUSTER_FEATURES, selected_casts: np.ndarray = None,
+                           chunk_size: int = CHUNK_ROWS, order=None):
+    """Yield ``(depth row, X)`` for a file's rows with every feature finite, without building a table."""
+    for _, z_row, X in aligned_columns(dataset, names, selected_casts, chunk_size, order):
+        valid = np.isfinite(X).all(axis=1)
+        if valid.any():
+            yield z_row[valid], X[valid].astype(np.float64)
+
+
+def fit_chunked_kmeans(chunks, n_clusters: int, chunk_size: int = CHUNK_ROWS, epochs: int = 1,
+                       seed: int = None) -> tuple:
+    """Fitted ``(scaler, kmeans)`` from ``chunks(order)``, an iterable of feature blocks.
+
+    ``order`` is None for the scaler pass and a permutation function for each
+    of the ``epochs`` mini-batch passes.
+    """
+    scaler = StandardScaler()
+    for X in chunks(None):
+        scaler.partial_fit(X)
+    if not hasattr(scaler, 'mean_'):
+        raise ValueError('no rows with every clustering feature present')
+
+    rng = np.random.default_rng(seed)
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=chunk_size, n_init=3, random_state=seed)
+    pending = None
+    for _ in range(epochs):
+        for X in chunks(rng.permutation):
+            X = scaler.transform(X)
+            # partial_fit initialises from its first batch, which needs at least n_clusters rows.
+            pending = X if pending is None else np.vstack((pending, X))
+            if len(pending) >= n_clusters:
+                kmeans.partial_fit(pending)
+                pending = None
+    if not hasattr(kmeans, 'cluster_centers_'):
+        raise ValueError(f'fewer than {n_clusters} rows with every clustering feature present')
+    return scaler, kmeans
+
+
+def fit_streaming_kmeans(table: ObservationTable, n_clusters: int, names=CLUSTER_FEATURES,
+                         chunk_size: int = CHUNK_ROWS, epochs: int = 1, seed: int = None) -> tuple:
+    """Fitted ``(scaler, kmeans)`` after one scaler pass and ``epochs`` shuffled mini-batch passes."""
+    def chunks(order):
+        return (X for _, _, X in feature_chunks(table, names, chunk_size, order))
+
+    return fit_chunked_kmeans(chunks, n_clusters, chunk_size, epochs, seed)
+
+
+def assign_labels(table: ObservationTable, scaler: StandardScaler, kmeans: MiniBatchKMeans, out: np.ndarray,
+                  names=CLUSTER_FEATURES, chunk_size: int = CHUNK_ROWS):
+    """Write each row's cluster into ``out`` (``UNLABELLED`` where a feature is missing)."""
+    out[:] = UNLABELLED
+    for start, valid, X in feature_chunks(table, names, chunk_size):
+        out[start + valid] = kmeans.predict(scaler.transform(X))
+
+
+def add_cluster_sums(counts: np.ndarray, sums: np.ndarray, labels: np.ndarray, X: np.ndarray):
+    """Add a chunk's rows to per-cluster ``counts`` and per-feature ``sums`` of shape (n_features, n_clusters)."""
+    labels = np.asarray(labels, dtype=np.int64)
+    counts += np.bincount(labels, minlength=len(counts))
+    for i in range(X.shape[1]):
+        sums[i] += np.bincount(labels, weights=X[:, i], minlength=len(counts))
+
+
+def cluster_means(table: ObservationTable, labels: np.ndarray, n_clusters: int, names=CLUSTER_FEATURES,
+                  chunk_size: int = CHUNK_ROWS) -> tuple:
+    """Per-cluster row counts and feature means, accumulated chunk by chunk."""
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    sums = np.zeros((len(names), n_clusters))
+    for start, valid, X in feature_chunks(table, names, chunk_size):
+        add_cluster_sums(counts, sums, labels[start + valid], X)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return counts, sums / counts
+
+
+def fit_kmeans(X: np.ndarray, n_clusters: int, n_init: int = 10, seed: int = None,
+               silhouette_sample: int = SILHOUETTE_SAMPLE) -> tuple:
+    """Fitted ``KMeans`` with its inertia and silhouette on at most ``silhouette_sample`` rows."""
+    kmeans = KMeans(n_clusters=n_clusters, n_init=n_init, random_state=seed).fit(X)
+    silhouette = np.nan
+    if 1 < len(np.unique(kmeans.labels_)) < len(X):
+        silhouette = float(silhouette_score(X, kmeans.labels_, sample_size=min(silhouette_sample, len(X)),
+                                            random_state=seed))
+    return kmeans, float(kmeans.inertia_), silhouette
+
+
+def sweep_kmeans(X: np.ndarray, cluster_counts, n_init: int = 10, seed: int = None,
+                 silhouette_sample: int = SILHOUETTE_SAMPLE, max_workers: int = None) -> list:
+    """``fit_kmeans`` for every count in ``cluster_counts``, one worker process per fit."""
+    cluster_counts = [k for k in cluster_counts if k <= len(X)]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(cluster_counts)) or 1
+    arguments = [(X, k, n_init, seed, silhouette_sample) for k in cluster_counts]
+    if max_workers == 1:
+        return [fit_kmeans(*args) for args in arguments]
+    with ProcessPoolExecutor(max_workers) as executor:
+        return list(executor.map(fit_kmeans, *zip(*arguments)))
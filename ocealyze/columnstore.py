@@ -0,0 +1,314 @@
+"""Memory-mappable ``.npy`` sidecar cache for converted observation tables.
+
+Each converted table lives in its own directory keyed by a fingerprint of the
+source file and the conversion options. Columns are written once and loaded
+back with ``np.load(mmap_mode='r')`` so later starts skip NetCDF decoding.
+Builds hold a file lock, so processes sharing the cache convert a file once.
+
+Tables and derived columns under one cache root share a byte budget
+(``OCEALYZE_CACHE_BYTES``, default 16 GiB). After each write the least
+recently used ones are evicted until the root fits, and tables converted from
+an earlier version of a file, or from a file that no longer exists, are
+deleted outright.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from ocealyze.diskcache import LOCK_DIR, LOCK_SUFFIX, file_lock, touch
+from ocealyze.handles import open_dataset
+from ocealyze.instrumentation import add, cache_miss
+from ocealyze.ragged import OBSERVED_VARIABLES, ObservationTable, build_observation_table
+
+CACHE_ENV = 'OCEALYZE_CACHE_DIR'
+BYTES_ENV = 'OCEALYZE_CACHE_BYTES'
+CACHE_BYTES = 16 << 30
+COLUMNS_DIR = 'columns'
+EVICTED_PREFIX = '.evicted-'
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 2
+HASH_BLOCK = 1 << 20
+
+
+def fingerprint(file_path: str) -> str:
+    """Cheap content fingerprint: size, mtime and a hash of head/middle/tail blocks."""
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(f'{stat.st_size}:{stat.st_mtime_ns}'.encode(), digest_size=12)
+    with open(file_path, 'rb') as handle:
+        for offset in sorted({0, max(stat.st_size // 2 - HASH_BLOCK // 2, 0), max(stat.st_size - HASH_BLOCK, 0)}):
+            handle.seek(offset)
+            digest.update(handle.read(HASH_BLOCK))
+    return digest.hexdigest()
+
+
+def cache_root(file_path: str, root: str = None) -> str:
+    root = root or os.environ.get(CACHE_ENV)
+    return root or os.path.join(os.path.dirname(os.path.abspath(file_path)), '.ocealyze-cache')
+
+
+def table_dir(file_path: str, options: dict, root: str = None) -> str:
+    key = json.dumps(options, sort_keys=True, default=str)
+    key_hash = hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_root(file_path, root), f'{stem}-{fingerprint(file_path)}-{key_hash}')
+
+
+def cache_budget() -> int:
+    """Byte budget of a cache root's tables and columns: ``$OCEALYZE_CACHE_BYTES`` or ``CACHE_BYTES``."""
+    return int(float(os.environ.get(BYTES_ENV) or CACHE_BYTES))
+
+
+def save_table(table: ObservationTable, directory: str, options: dict = None, source: str = None):
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=parent)
+    try:
+        manifest = {'version': FORMAT_VERSION, 'options': options or {}, 'source': source, 'columns': [], 'casts': []}
+        for group, arrays in (('columns', table.columns), ('casts', table.casts)):
+            for name, values in arrays.items():
+                np.save(os.path.join(staging, f'{group}.{name}.npy'), np.ascontiguousarray(values))
+                manifest[group].append(name)
+        np.save(os.path.join(staging, 'offsets.npy'), table.offsets)
+        np.save(os.path.join(staging, 'sizes.npy'), table.sizes)
+        with open(os.path.join(staging, MANIFEST), 'w') as handle:
+            json.dump(manifest, handle)
+        try:
+            os.rename(staging, directory)
+        except OSError:
+            # Another process finished the same conversion first.
+            shutil.rmtree(staging, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def read_manifest(directory: str) -> dict:
+    try:
+        with open(os.path.join(directory, MANIFEST)) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def load_table(directory: str) -> ObservationTable:
+    manifest = read_manifest(directory)
+    if manifest is None or manifest.get('version') != FORMAT_VERSION:
+        return None
+
+    def column(name):
+        return np.load(os.path.join(directory, name), mmap_mode='r')
+
+    try:
+        columns = {name: column(f'columns.{name}.npy') for name in manifest['columns']}
+        casts = {name: column(f'casts.{name}.npy') for name in manifest['casts']}
+        table = ObservationTable(columns, casts, column('offsets.npy'), column('sizes.npy'))
+    except FileNotFoundError:
+        # Evicted while we were loading it.
+        return None
+    touch(os.path.join(directory, MANIFEST))
+    return table
+
+
+def _lock_path(path: str) -> str:
+    return os.path.join(os.path.dirname(path), LOCK_DIR, os.path.basename(path) + LOCK_SUFFIX)
+
+
+def _remove_entry(path: str):
+    """Delete a cached table directory or column file, and its lock."""
+    if os.path.isdir(path):
+        # Rename first, so a reader sees the whole table or none of it.
+        evicted = os.path.join(os.path.dirname(path), EVICTED_PREFIX + os.path.basename(path))
+        try:
+            os.rename(path, evicted)
+        except OSError:
+            return
+        shutil.rmtree(evicted, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    try:
+        os.remove(_lock_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def _directory_bytes(directory: str) -> int:
+    total = 0
+    for entry in os.scandir(directory):
+        try:
+            total += entry.stat().st_size
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def evict_cache(root: str, max_bytes: int = None, keep: str = None):
+    """Delete stale tables under ``root``, then the least recently used tables and columns beyond ``max_bytes``.
+
+    A table is stale when its source file is gone, or when a newer conversion of
+    the same file exists and the file's fingerprint no longer matches it.
+    """
+    max_bytes = cache_budget() if max_bytes is None else max_bytes
+    with file_lock(os.path.join(root, LOCK_DIR, 'evict' + LOCK_SUFFIX), blocking=False) as acquired:
+        if not acquired:
+            # Another process is already evicting.
+            return
+        entries, tables = [], {}
+        for entry in os.scandir(root):
+            if entry.name.startswith(EVICTED_PREFIX):
+                # Left behind by an eviction that was interrupted.
+                shutil.rmtree(entry.path, ignore_errors=True)
+                continue
+            if entry.name.startswith('.') or entry.name == COLUMNS_DIR or not entry.is_dir():
+                continue
+            manifest = read_manifest(entry.path)
+            if manifest is None:
+                continue
+            source = manifest.get('source')
+            if source is not None and not os.path.exists(source):
+                _remove_entry(entry.path)
+                continue
+            try:
+                last_use = os.stat(os.path.join(entry.path, MANIFEST)).st_mtime_ns
+                size = _directory_bytes(entry.path)
+            except FileNotFoundError:
+                continue
+            entries.append((last_use, size, entry.path))
+            if source is not None:
+                # Directory names end in -<fingerprint>-<options hash>.
+                tables.setdefault(source, []).append((entry.name.rsplit('-', 2)[-2], entries[-1]))
+
+        stale = set()
+        for source, versions in tables.items():
+            if len({version for version, _ in versions}) > 1:
+                current = fingerprint(source)
+                stale.update(item for version, item in versions if version != current)
+        for _, _, path in stale:
+            _remove_entry(path)
+        entries = [item for item in entries if item not in stale]
+
+        columns = os.path.join(root, COLUMNS_DIR)
+        if os.path.isdir(columns):
+            for entry in os.scandir(columns):
+                if entry.name.endswith('.npy') and not entry.name.startswith('.'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            if path == keep:
+                continue
+            _remove_entry(path)
+            total -= size
+
+
+def cached_observation_table(file_path: str, build, options: dict, root: str = None) -> ObservationTable:
+    """Load the table for ``file_path``/``options`` from the sidecar cache, building it with ``build()`` on a miss."""
+    directory = table_dir(file_path, options, root)
+    table = load_table(directory)
+    if table is not None:
+        add('cache_hits')
+        return table
+
+    with file_lock(_lock_path(directory)):
+        # Another process may have built it while we waited for the lock.
+        table = load_table(directory)
+        if table is not None:
+            add('cache_hits')
+            return table
+        cache_miss()
+        table = build()
+        add('rows', len(table))
+        try:
+            shutil.rmtree(directory, ignore_errors=True)
+            save_table(table, directory, options, os.path.abspath(file_path))
+        except OSError:
+            # Read-only or full cache location: serve the freshly built table.
+            return table
+        evict_cache(os.path.dirname(directory), keep=directory)
+    cached = load_table(directory)
+    return cached if cached is not None else table
+
+
+def cached_column(root: str, name: str, options: dict, length: int, dtype, fill) -> np.ndarray:
+    """Derived per-row column memory-mapped from ``<root>/columns``, computed by ``fill(out)`` on a miss.
+
+    ``out`` is a writable ``.npy`` memmap, so the column never has to fit in memory.
+    """
+    key = json.dumps(options, sort_keys=True, default=str)
+    key_hash = hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+    directory = os.path.join(root, COLUMNS_DIR)
+    path = os.path.join(directory, f'{name}-{key_hash}.npy')
+
+    def load():
+        try:
+            column = np.load(path, mmap_mode='r')
+        except FileNotFoundError:
+            return None
+        add('cache_hits')
+        touch(path)
+        return column
+
+    column = load()
+    if column is not None:
+        return column
+
+    with file_lock(_lock_path(path)):
+        column = load()
+        if column is not None:
+            return column
+        cache_miss()
+        add('rows', length)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            handle, staging = tempfile.mkstemp(prefix='.staging-', suffix='.npy', dir=directory)
+            os.close(handle)
+        except OSError:
+            # Read-only or full cache location: compute the column in memory.
+            out = np.empty(length, dtype=dtype)
+            fill(out)
+            return out
+        try:
+            out = np.lib.format.open_memmap(staging, mode='w+', dtype=dtype, shape=(length,))
+            fill(out)
+            out.flush()
+            del out
+            os.chmod(staging, 0o644)
+            os.replace(staging, path)
+        except BaseException:
+            os.remove(staging)
+            raise
+        evict_cache(root, keep=path)
+    return np.load(path, mmap_mode='r')
+
+
+def table_options(variables=OBSERVED_VARIABLES, sample_size: int = None, seed: int = None) -> dict:
+    return {'variables': list(variables), 'sample_size': sample_size, 'seed': seed}
+
+
+def is_table_cached(file_path: str, variables=OBSERVED_VARIABLES, sample_size: int = None,
+                    seed: int = None, root: str = None) -> bool:
+    directory = table_dir(file_path, table_options(variables, sample_size, seed), root)
+    return os.path.exists(os.path.join(directory, MANIFEST))
+
+
+def load_observation_table(file_path: str, variables=OBSERVED_VARIABLES, sample_size: int = None,
+                           seed: int = None, root: str = None, max_workers: int = 1,
+                           progress=None) -> ObservationTable:
+    def build():
+        with open_dataset(file_path) as dataset:
+            return build_observation_table(dataset, variables, sample_size=sample_size, seed=seed,
+                                           max_workers=max_workers, progress=progress)
+
+    return cached_observation_table(file_path, build, table_options(variables, sample_size, seed), root)
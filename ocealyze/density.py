@@ -0,0 +1,28 @@
+"""Fixed-degree binning of cast positions so maps ship cell counts, not raw points."""
+import numpy as np
+
+RAW_POINT_LIMIT = 5000
+
+
+def density_cells(lat: np.ndarray, lon: np.ndarray, resolution: float = 2.0) -> dict:
+    """Centres and counts of the occupied ``resolution``-degree cells.
+
+    The output has at most (180 / resolution) * (360 / resolution) rows however
+    many positions go in.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    valid = np.isfinite(lat) & np.isfinite(lon)
+    n_rows = int(np.ceil(180 / resolution))
+    n_cols = int(np.ceil(360 / resolution))
+    rows = np.clip(((lat[valid] + 90) // resolution).astype(np.int64), 0, n_rows - 1)
+    # 180° is the east edge of the last column, not the west edge of the first.
+    wrapped = np.where(lon[valid] == 180, 360.0, (lon[valid] + 180) % 360)
+    cols = np.clip((wrapped // resolution).astype(np.int64), 0, n_cols - 1)
+    counts = np.bincount(rows * n_cols + cols, minlength=n_rows * n_cols)
+    occupied = np.flatnonzero(counts)
+    return {
+        'lat': (occupied // n_cols + 0.5) * resolution - 90,
+        'lon': (occupied % n_cols + 0.5) * resolution - 180,
+        'count': counts[occupied],
+    }
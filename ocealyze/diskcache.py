@@ -0,0 +1,203 @@
+"""Content-addressed on-disk cache shared by every process on a host.
+
+Values are stored under a hash of the JSON spec that produced them, so any
+worker or app replica pointing at the same directory reuses the results of
+the others. NumPy arrays are written as ``.npy`` and memory-mapped back;
+anything else goes through joblib. Writes are atomic renames. ``get_or_compute``
+holds a per-key file lock while computing, so concurrent processes asking for
+the same value wait for the first one instead of repeating the work. The
+directory is kept under ``max_bytes`` by evicting the least recently used
+entries, and recently used values are also held in memory.
+
+Locks only prevent duplicate work; correctness comes from the atomic writes.
+Without ``fcntl`` (Windows) or on a read-only directory, concurrent misses
+may compute the same value twice.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+
+from ocealyze.instrumentation import add, cache_miss
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+ARRAY_SUFFIX = '.npy'
+OBJECT_SUFFIX = '.joblib'
+LOCK_DIR = '.locks'
+LOCK_SUFFIX = '.lock'
+MAX_BYTES = 1 << 30
+MEMORY_ENTRIES = 16
+
+
+def spec_key(spec: dict) -> str:
+    return hashlib.blake2b(json.dumps(spec, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """Exclusive advisory lock on ``path``; yields False only if ``blocking`` is off and another process holds it.
+
+    Where locking is unavailable the block runs unlocked.
+    """
+    handle = None
+    if fcntl is not None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handle = open(path, 'a')
+        except OSError:
+            pass
+    if handle is None:
+        yield True
+        return
+    with handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def touch(path: str):
+    """Stamp ``path`` as just used; its modification time is the last-use time for eviction.
+
+    Best effort: a read-only cache still serves its entries, it just stops tracking their use.
+    """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+class DiskCache:
+    def __init__(self, root: str, max_bytes: int = MAX_BYTES, memory_entries: int = MEMORY_ENTRIES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+
+    def path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.root, key + suffix)
+
+    def lock_path(self, key: str) -> str:
+        return os.path.join(self.root, LOCK_DIR, key + LOCK_SUFFIX)
+
+    def _remember(self, key: str, value):
+        if not self.memory_entries:
+            return
+        with self.lock:
+            self.memory[key] = value
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+
+    def _load(self, key: str):
+        for suffix in (ARRAY_SUFFIX, OBJECT_SUFFIX):
+            path = self.path(key, suffix)
+            try:
+                value = np.load(path, mmap_mode='r') if suffix == ARRAY_SUFFIX else joblib.load(path)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                # Truncated or written by an incompatible library version: recompute.
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            touch(path)
+            return value
+        return None
+
+    def get(self, key: str):
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+        value = self._load(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value):
+        self._remember(key, value)
+        suffix = ARRAY_SUFFIX if isinstance(value, np.ndarray) and value.dtype != object else OBJECT_SUFFIX
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            handle, staging = tempfile.mkstemp(prefix='.staging-', suffix=suffix, dir=self.root)
+            os.close(handle)
+            try:
+                if suffix == ARRAY_SUFFIX:
+                    np.save(staging, value)
+                else:
+                    joblib.dump(value, staging, compress=3)
+                os.chmod(staging, 0o644)
+                os.replace(staging, self.path(key, suffix))
+            except BaseException:
+                os.remove(staging)
+                raise
+            self.evict(keep=key)
+        except OSError:
+            # Read-only or full cache location: keep the value in memory only.
+            pass
+
+    def get_or_compute(self, spec: dict, compute):
+        """Value stored for ``spec``, calling ``compute()`` and storing its result on a miss."""
+        key = spec_key(spec)
+        value = self.get(key)
+        if value is not None:
+            add('cache_hits')
+            return value
+        with file_lock(self.lock_path(key)):
+            # Another process may have stored it while we waited for the lock.
+            value = self._load(key)
+            if value is not None:
+                add('cache_hits')
+                self._remember(key, value)
+                return value
+            cache_miss()
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def evict(self, keep: str = None):
+        """Drop least recently used entries until the directory fits in ``max_bytes``."""
+        with file_lock(os.path.join(self.root, LOCK_DIR, 'evict' + LOCK_SUFFIX), blocking=False) as acquired:
+            if not acquired:
+                # Another process is already evicting.
+                return
+            entries = []
+            for entry in os.scandir(self.root):
+                if entry.name.endswith((ARRAY_SUFFIX, OBJECT_SUFFIX)) and not entry.name.startswith('.'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if keep is not None and os.path.basename(path).startswith(keep):
+                    continue
+                key = os.path.splitext(os.path.basename(path))[0]
+                for stale in (path, self.lock_path(key)):
+                    try:
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        pass
+                total -= size
@@ -0,0 +1,18 @@
+"""Vectorized planar geometry helpers shared by the region and water-mass filters."""
+import numpy as np
+
+
+def points_in_polygon(x: np.ndarray, y: np.ndarray, vertices) -> np.ndarray:
+    """Even-odd rule test of points against a closed polygon given as (x, y) vertex pairs."""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    inside = np.zeros(x.shape, dtype=bool)
+    # One vectorized pass per edge; polygons have few edges, inputs many points.
+    for (x0, y0), (x1, y1) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        if y0 == y1:
+            continue
+        crosses = (y0 > y) != (y1 > y)
+        x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        inside ^= crosses & (x < x_cross)
+    return inside
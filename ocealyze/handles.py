@@ -0,0 +1,125 @@
+"""Bounded pool of read-only NetCDF handles.
+
+``open_dataset(path)`` lends a handle for a ``with`` block and takes it back
+afterwards, so repeated queries on the same file skip reopening it. A lent
+handle is never shared: concurrent borrowers of one file each get their own,
+because common HDF5 builds are not thread-safe. Returned handles stay open up
+to ``max_open``. The least recently returned ones are closed beyond that, and
+any handle idle for ``idle_seconds`` is closed too. Handles are keyed by
+path, size and modification time, so a rewritten file is reopened rather
+than read through a stale handle.
+
+An open handle holds HDF5's file lock, so tools that rewrite a file in place
+with HDF5 can fail while it is pooled. Replace files atomically (write
+elsewhere, then rename) or call ``POOL.close_all()`` first.
+
+Forked workers drop the handles inherited from their parent, and everything
+is closed at interpreter exit.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import netCDF4 as nc
+
+MAX_OPEN = 16
+IDLE_SECONDS = 30.0
+
+
+def file_identity(path: str) -> tuple:
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+def _close(dataset: nc.Dataset):
+    try:
+        dataset.close()
+    except (OSError, RuntimeError):
+        # Already closed, or the file vanished underneath it.
+        pass
+
+
+class DatasetPool:
+    def __init__(self, max_open: int = MAX_OPEN, idle_seconds: float = IDLE_SECONDS):
+        self.max_open = max_open
+        self.idle_seconds = idle_seconds
+        # id(dataset) -> (identity, dataset, returned at), least recently returned first
+        self.idle = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _expired(self, now: float) -> list:
+        stale = []
+        for handle_id, (_, dataset, returned) in list(self.idle.items()):
+            if now - returned <= self.idle_seconds and len(self.idle) <= self.max_open:
+                break
+            stale.append(dataset)
+            del self.idle[handle_id]
+        return stale
+
+    def _take(self, identity: tuple) -> nc.Dataset:
+        with self.lock:
+            stale = self._expired(time.monotonic())
+            dataset = None
+            same_path = [handle_id for handle_id, (held, _, _) in self.idle.items() if held[0] == identity[0]]
+            for handle_id in reversed(same_path):
+                held, candidate, _ = self.idle[handle_id]
+                if held != identity:
+                    # The file was rewritten since this handle was opened.
+                    stale.append(candidate)
+                    del self.idle[handle_id]
+                elif dataset is None:
+                    dataset = candidate
+                    del self.idle[handle_id]
+        for old in stale:
+            _close(old)
+        return dataset
+
+    def _give(self, identity: tuple, dataset: nc.Dataset):
+        with self.lock:
+            self.idle[id(dataset)] = (identity, dataset, time.monotonic())
+            stale = self._expired(time.monotonic())
+        for old in stale:
+            _close(old)
+
+    @contextmanager
+    def dataset(self, path: str):
+        identity = file_identity(path)
+        dataset = self._take(identity)
+        if dataset is None:
+            dataset = nc.Dataset(path, 'r')
+        try:
+            yield dataset
+        except BaseException:
+            # A failed read can leave the handle in an unknown state.
+            _close(dataset)
+            raise
+        self._give(identity, dataset)
+
+    def open_count(self) -> int:
+        return len(self.idle)
+
+    def close_all(self):
+        with self.lock:
+            datasets = [dataset for _, dataset, _ in self.idle.values()]
+            self.idle.clear()
+        for dataset in datasets:
+            _close(dataset)
+
+    def _forget(self):
+        # In a forked child the inherited handles belong to the parent's HDF5 state.
+        self.lock = threading.Lock()
+        self.idle = OrderedDict()
+
+
+POOL = DatasetPool()
+atexit.register(POOL.close_all)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=POOL._forget)
+
+
+def open_dataset(path: str):
+    """Borrow a pooled read-only handle on ``path`` for a ``with`` block."""
+    return POOL.dataset(path)
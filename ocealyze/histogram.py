@@ -0,0 +1,57 @@
+"""Exact histograms accumulated chunk by chunk, so memory is bounded by the chunk size."""
+import numpy as np
+
+FILTERS = {
+    None: None,
+    'positive': lambda values: values > 0,
+}
+
+
+def select_values(chunk: np.ndarray, keep) -> np.ndarray:
+    mask = np.isfinite(chunk)
+    if keep is not None:
+        mask &= keep(chunk)
+    return chunk[mask]
+
+
+def value_range(source, keep=None) -> tuple:
+    """Streaming (min, max) of the finite, kept values of ``source()``."""
+    lo, hi = np.inf, -np.inf
+    for chunk in source():
+        chunk = select_values(chunk, keep)
+        if len(chunk):
+            lo, hi = min(lo, float(chunk.min())), max(hi, float(chunk.max()))
+    return (lo, hi) if lo <= hi else (None, None)
+
+
+def stream_histogram(source, bins=50, edges=None, keep=None, right: bool = False) -> tuple:
+    """Counts and edges over every finite value yielded by ``source()``.
+
+    ``source`` is a zero-argument callable returning an iterator of 1-D chunks.
+    With ``edges`` omitted, ``bins`` uniform bins span the data range (one
+    extra pass to find it). Bins are right-open except the last, like
+    ``np.histogram``, or left-open except the first with ``right=True``.
+    Explicit ``edges`` may be non-uniform.
+    """
+    if edges is None:
+        lo, hi = value_range(source, keep)
+        if lo is None:
+            return np.zeros(bins, dtype=np.int64), np.linspace(0, 1, bins + 1)
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+        edges = np.linspace(lo, hi, bins + 1)
+    else:
+        edges = np.asarray(edges, dtype=np.float64)
+    uniform = not right and np.allclose(np.diff(edges), edges[1] - edges[0])
+
+    n_bins = len(edges) - 1
+    counts = np.zeros(n_bins, dtype=np.int64)
+    for chunk in source():
+        chunk = select_values(chunk, keep).astype(np.float64)
+        chunk = chunk[(chunk >= edges[0]) & (chunk <= edges[-1])]
+        if uniform:
+            index = ((chunk - edges[0]) * (n_bins / (edges[-1] - edges[0]))).astype(np.int64)
+        else:
+            index = np.searchsorted(edges, chunk, side='left' if right else 'right') - 1
+        counts += np.bincount(np.clip(index, 0, n_bins - 1), minlength=n_bins)
+    return counts, edges
@@ -0,0 +1,134 @@
+"""Hot-path instrumentation: timed sections with row, byte and cache counters.
+
+``section(name)`` times a block. ``add(counter, value)`` credits every open
+section, so a tab's section also includes the I/O, cache lookups and model
+fits below it. Standard counters are ``rows``, ``bytes_read`` (decoded array
+bytes taken from NetCDF), ``cache_hits`` and ``cache_misses``. A section
+wrapping a cache lookup also reports its own outcome as ``cache``.
+
+Each finished section is logged as one JSON object on the ``ocealyze.perf``
+logger. ``configure_log`` (or the ``OCEALYZE_PERF_LOG`` environment variable)
+writes those lines to a file for scraping. ``collect()`` gathers the records
+of a block, e.g. one dashboard run, for display.
+
+Sections live in a context variable, so concurrent Streamlit sessions do not
+mix. Work in pool threads and worker processes is timed by the section that
+waits for it but does not add to its counters.
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+
+LOGGER = logging.getLogger('ocealyze.perf')
+LOG_ENV = 'OCEALYZE_PERF_LOG'
+COUNTERS = ('rows', 'bytes_read', 'cache_hits', 'cache_misses')
+
+_open_sections = ContextVar('ocealyze_open_sections', default=())
+_collector = ContextVar('ocealyze_collector', default=None)
+
+
+class Section:
+    def __init__(self, name: str, parent: 'Section' = None, fields: dict = None):
+        self.name = name
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.fields = fields or {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.cache = None
+        self.seconds = None
+
+    def to_dict(self) -> dict:
+        return {
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'section': self.name,
+            'parent': self.parent.name if self.parent is not None else None,
+            'depth': self.depth,
+            'seconds': round(self.seconds, 6),
+            'cache': self.cache,
+            **self.counters,
+            **self.fields,
+        }
+
+
+def add(counter: str, value: int = 1):
+    """Credit ``value`` to ``counter`` of every open section."""
+    for record in _open_sections.get():
+        record.counters[counter] = record.counters.get(counter, 0) + int(value)
+
+
+def cache_miss():
+    """Mark the innermost cached section as computed rather than served from its cache."""
+    add('cache_misses')
+
+
+@contextmanager
+def section(name: str, cached: bool = False, **fields):
+    """Time the block; with ``cached``, count a hit unless ``cache_miss()`` was called inside it."""
+    stack = _open_sections.get()
+    record = Section(name, stack[-1] if stack else None, fields)
+    token = _open_sections.set(stack + (record,))
+    started = time.perf_counter()
+    # Reserve the slot now so collected records are listed in the order their sections started.
+    collected = _collector.get()
+    position = None
+    if collected is not None:
+        position = len(collected)
+        collected.append(None)
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - started
+        _open_sections.reset(token)
+        if cached:
+            record.cache = 'miss' if record.counters['cache_misses'] else 'hit'
+            if record.cache == 'hit':
+                record.counters['cache_hits'] += 1
+                add('cache_hits')
+        payload = record.to_dict()
+        if position is not None:
+            collected[position] = payload
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info(json.dumps(payload, default=str))
+
+
+def timed(name: str = None, cached: bool = False):
+    """Decorator form of ``section``; place it above a Streamlit cache decorator to see hits."""
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with section(name or function.__name__, cached=cached):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def collect():
+    """List that receives the record of every section run inside the block, in start order."""
+    records = []
+    token = _collector.set(records)
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+
+
+def configure_log(path: str = None) -> bool:
+    """Append section records as JSON lines to ``path`` (default: ``$OCEALYZE_PERF_LOG``); idempotent."""
+    path = path or os.environ.get(LOG_ENV)
+    if not path:
+        return False
+    path = os.path.abspath(path)
+    if any(getattr(handler, 'baseFilename', None) == path for handler in LOGGER.handlers):
+        return True
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    LOGGER.addHandler(handler)
+    LOGGER.setLevel(logging.INFO)
+    LOGGER.propagate = False
+    return True
@@ -0,0 +1,37 @@
+"""Registry of fitted models persisted with joblib.
+
+Models are keyed by a hash of everything that determines the fit: dataset
+fingerprint, feature set, training sample and estimator hyperparameters. The
+registry is a ``DiskCache``, so models are written atomically under the cache
+directory and every session, worker process and app replica sharing it reuses
+them. A fit in progress holds the key's lock, so concurrent requests for the
+same model wait for it rather than fitting again. Recently used models are also
+held in memory, and the least recently used files are evicted once the
+registry exceeds its size budget.
+"""
+from ocealyze.diskcache import DiskCache, spec_key
+from ocealyze.instrumentation import section
+
+MAX_BYTES = 512 << 20
+MEMORY_ENTRIES = 16
+
+
+def model_key(spec: dict) -> str:
+    return spec_key(spec)
+
+
+def estimator_spec(estimator) -> dict:
+    return {'class': type(estimator).__name__, 'params': estimator.get_params()}
+
+
+class ModelRegistry(DiskCache):
+    def __init__(self, root: str, max_bytes: int = MAX_BYTES, memory_entries: int = MEMORY_ENTRIES):
+        super().__init__(root, max_bytes, memory_entries)
+
+    def get_or_fit(self, spec: dict, fit):
+        """Model stored for ``spec``, calling ``fit()`` and storing its result on a miss."""
+        def timed_fit():
+            with section('model_fit', model=spec.get('model', {}).get('class')):
+                return fit()
+
+        return self.get_or_compute(spec, timed_fit)
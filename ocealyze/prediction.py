@@ -0,0 +1,74 @@
+"""Batch random-forest prediction with the spread across trees.
+
+Each tree maps a chunk of query points to leaf ids with ``apply``, and the
+leaf values are gathered with one fancy-index per tree. Sums and squared sums
+accumulate across trees, so memory stays at a few arrays per chunk whatever
+the forest size. Chunks run on a thread pool: sklearn's tree traversal
+releases the GIL.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+CHUNK_ROWS = 1 << 16
+
+
+def _chunk_mean_std(estimators: list, leaf_values: list, X: np.ndarray) -> tuple:
+    total = np.zeros(len(X), dtype=np.float64)
+    squares = np.zeros(len(X), dtype=np.float64)
+    for tree, values in zip(estimators, leaf_values):
+        predicted = values[tree.apply(X, check_input=False)]
+        total += predicted
+        squares += predicted * predicted
+    mean = total / len(estimators)
+    return mean, np.sqrt(np.maximum(squares / len(estimators) - mean * mean, 0.0))
+
+
+def predict_with_spread(model, X, chunk_size: int = CHUNK_ROWS, max_workers: int = None) -> tuple:
+    """Mean and standard deviation of the per-tree predictions of a fitted ``RandomForestRegressor``."""
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32).reshape(len(X), -1))
+    estimators = model.estimators_
+    leaf_values = [tree.tree_.value[:, 0, 0].astype(np.float64) for tree in estimators]
+    mean = np.empty(len(X), dtype=np.float64)
+    std = np.empty(len(X), dtype=np.float64)
+    starts = range(0, len(X), chunk_size)
+
+    def run(start):
+        stop = min(start + chunk_size, len(X))
+        mean[start:stop], std[start:stop] = _chunk_mean_std(estimators, leaf_values, X[start:stop])
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(starts)) or 1
+    if max_workers == 1:
+        for start in starts:
+            run(start)
+    else:
+        with ThreadPoolExecutor(max_workers) as executor:
+            list(executor.map(run, starts))
+    return mean, std
+
+
+def grid_centers(resolution: float) -> tuple:
+    lat = np.arange(-90 + resolution / 2, 90, resolution)
+    lon = np.arange(-180 + resolution / 2, 180, resolution)
+    return lat, lon
+
+
+def predict_grid(model, resolution: float, depth: float, year: float, chunk_size: int = CHUNK_ROWS,
+                 max_workers: int = None) -> dict:
+    """Mean and spread of the forest over a global ``resolution``-degree grid at one depth and year."""
+    lat, lon = grid_centers(resolution)
+    grid_lat, grid_lon = np.meshgrid(lat, lon, indexing='ij')
+    X = np.empty((grid_lat.size, 4), dtype=np.float32)
+    X[:, 0] = grid_lat.ravel()
+    X[:, 1] = grid_lon.ravel()
+    X[:, 2] = depth
+    X[:, 3] = year
+    mean, std = predict_with_spread(model, X, chunk_size, max_workers)
+    shape = (len(lat), len(lon))
+    return {
+        'lat': lat,
+        'lon': lon,
+        'mean': mean.astype(np.float32).reshape(shape),
+        'std': std.astype(np.float32).reshape(shape),
+    }
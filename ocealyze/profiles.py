@@ -0,0 +1,151 @@
+"""Depth-binned vertical profiles over every observation.
+
+Observations are binned by depth onto the World Ocean Atlas standard levels
+(or uniform bins) and accumulated chunk by chunk. Exact counts, means and
+standard deviations come from ``np.bincount`` sums. Percentiles come from a
+per-depth histogram of values over a fixed range, filled by one ``bincount``
+on flattened (depth bin, value bin) indices and interpolated within a value
+bin. Accumulators merge, and the result size depends only on the number of
+bins. ``profile_file`` accumulates a whole WOD file straight from its ragged
+arrays, so catalogs can merge per-file profiles without an observation table.
+"""
+import numpy as np
+
+from ocealyze.handles import open_dataset
+from ocealyze.ragged import ObservationTable, aligned_columns
+from ocealyze.sampling import read_column
+from ocealyze.spatial import region_mask
+
+# WOA18 standard depth levels (m): 5 m to 100, 25 m to 500, 50 m to 2000, 100 m to 5500.
+STANDARD_DEPTHS = np.concatenate([
+    np.arange(0, 100, 5), np.arange(100, 500, 25), np.arange(500, 2000, 50), np.arange(2000, 5501, 100)
+]).astype(np.float64)
+# Plausible ranges of the percentile histograms; values outside are counted in the edge bins.
+VALUE_RANGES = {'Temperature': (-3.0, 40.0), 'Salinity': (0.0, 45.0), 'Oxygen': (0.0, 600.0)}
+VALUE_BINS = 2048
+PROFILE_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+CHUNK_ROWS = 1 << 20
+
+
+def standard_depth_edges(max_depth: float = None) -> np.ndarray:
+    """Bin edges centred on the standard levels down to ``max_depth``."""
+    levels = STANDARD_DEPTHS if max_depth is None else STANDARD_DEPTHS[STANDARD_DEPTHS <= max_depth]
+    middles = (levels[:-1] + levels[1:]) / 2
+    last = levels[-1] + (levels[-1] - levels[-2]) / 2 if len(levels) > 1 else levels[-1] + 2.5
+    return np.concatenate([[0.0], middles, [last]])
+
+
+def uniform_depth_edges(max_depth: float, bin_size: float) -> np.ndarray:
+    return np.arange(0.0, max_depth + bin_size, bin_size)
+
+
+class ProfileAccumulator:
+    def __init__(self, depth_edges: np.ndarray, value_range: tuple, value_bins: int = VALUE_BINS):
+        self.depth_edges = np.asarray(depth_edges, dtype=np.float64)
+        self.value_range = (float(value_range[0]), float(value_range[1]))
+        self.value_bins = value_bins
+        n_depths = len(self.depth_edges) - 1
+        self.counts = np.zeros(n_depths, dtype=np.int64)
+        self.sums = np.zeros(n_depths)
+        self.squares = np.zeros(n_depths)
+        self.histogram = np.zeros((n_depths, value_bins), dtype=np.int64)
+
+    def update(self, depth: np.ndarray, values: np.ndarray):
+        n_depths = len(self.counts)
+        keep = np.isfinite(depth) & np.isfinite(values)
+        depth_bin = np.searchsorted(self.depth_edges, depth[keep], side='right') - 1
+        values = values[keep].astype(np.float64)
+        inside = (depth_bin >= 0) & (depth_bin < n_depths)
+        depth_bin, values = depth_bin[inside], values[inside]
+        if not len(values):
+            return
+
+        self.counts += np.bincount(depth_bin, minlength=n_depths)
+        self.sums += np.bincount(depth_bin, weights=values, minlength=n_depths)
+        self.squares += np.bincount(depth_bin, weights=values * values, minlength=n_depths)
+        low, high = self.value_range
+        value_bin = ((values - low) * (self.value_bins / (high - low))).astype(np.int64)
+        np.clip(value_bin, 0, self.value_bins - 1, out=value_bin)
+        self.histogram += np.bincount(
+            depth_bin * self.value_bins + value_bin, minlength=n_depths * self.value_bins
+        ).reshape(n_depths, self.value_bins)
+
+    def merge(self, other: 'ProfileAccumulator'):
+        self.counts += other.counts
+        self.sums += other.sums
+        self.squares += other.squares
+        self.histogram += other.histogram
+
+    def quantiles(self, qs=PROFILE_QUANTILES) -> np.ndarray:
+        """``(len(qs), n_depths)`` percentiles, NaN for empty bins."""
+        low, high = self.value_range
+        width = (high - low) / self.value_bins
+        cumulative = np.cumsum(self.histogram, axis=1)
+        result = np.full((len(qs), len(self.counts)), np.nan)
+        rows = np.flatnonzero(self.counts)
+        for position, q in enumerate(qs):
+            target = q * self.counts[rows]
+            index = np.minimum((cumulative[rows] < target[:, None]).sum(axis=1), self.value_bins - 1)
+            before = np.where(index > 0, cumulative[rows, np.maximum(index - 1, 0)], 0)
+            inside = self.histogram[rows, index]
+            fraction = np.where(inside > 0, (target - before) / np.maximum(inside, 1), 0.5)
+            result[position, rows] = low + (index + fraction) * width
+        return result
+
+    def to_dict(self, qs=PROFILE_QUANTILES) -> dict:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.sums / self.counts
+            std = np.sqrt(np.maximum(self.squares / self.counts - mean * mean, 0.0))
+        centers = (self.depth_edges[:-1] + self.depth_edges[1:]) / 2
+        profile = {'depth': centers, 'count': self.counts, 'mean': mean, 'std': std}
+        for q, values in zip(qs, self.quantiles(qs)):
+            profile[f'p{round(q * 100):02d}'] = values
+        return profile
+
+
+def depth_profile(table: ObservationTable, variable: str, depth_edges: np.ndarray, value_range: tuple = None,
+                  clip_to_range: bool = False, chunk_size: int = CHUNK_ROWS) -> ProfileAccumulator:
+    """Accumulate ``variable`` against depth over every row of ``table``.
+
+    With ``clip_to_range``, values outside ``value_range`` are dropped instead
+    of being counted at the edges of the percentile histogram.
+    """
+    value_range = value_range or VALUE_RANGES.get(variable)
+    if value_range is None:
+        values = table[variable]
+        value_range = (float(np.nanmin(values)), float(np.nanmax(values))) if len(values) else (0.0, 1.0)
+        if value_range[0] == value_range[1]:
+            value_range = (value_range[0] - 0.5, value_range[1] + 0.5)
+    accumulator = ProfileAccumulator(depth_edges, value_range)
+    for start in range(0, len(table), chunk_size):
+        depth = table['z'][start:start + chunk_size]
+        values = table[variable][start:start + chunk_size]
+        if clip_to_range:
+            values = _within(values, value_range)
+        accumulator.update(depth, values)
+    return accumulator
+
+
+def profile_file(file_path: str, variable: str, depth_edges: np.ndarray, value_range: tuple,
+                 clip_to_range: bool = False, bounds: tuple = None, chunk_size: int = CHUNK_ROWS) -> ProfileAccumulator:
+    """``depth_profile`` of every observation in a file, optionally of casts inside ``bounds`` only.
+
+    ``value_range`` is required so that the profiles of several files merge.
+    """
+    accumulator = ProfileAccumulator(depth_edges, value_range)
+    with open_dataset(file_path) as dataset:
+        if 'z' not in dataset.variables or variable not in dataset.variables:
+            return accumulator
+        selected = None
+        if bounds is not None:
+            selected = region_mask(read_column(dataset.variables['lat']), read_column(dataset.variables['lon']), bounds)
+        for _, _, columns in aligned_columns(dataset, (variable, 'z'), selected, chunk_size):
+            values = columns[:, 0]
+            if clip_to_range:
+                values = _within(values, value_range)
+            accumulator.update(columns[:, 1], values)
+    return accumulator
+
+
+def _within(values: np.ndarray, value_range: tuple) -> np.ndarray:
+    return np.where((values >= value_range[0]) & (values <= value_range[1]), values, np.nan)
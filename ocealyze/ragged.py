@@ -0,0 +1,328 @@
+"""Expansion of WOD contiguous ragged arrays into one aligned per-observation table."""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import netCDF4 as nc
+
+from ocealyze.handles import open_dataset
+from ocealyze.instrumentation import add
+from ocealyze.sampling import CHUNK_ELEMENTS, chunk_length, netcdf_chunks, read_column, read_indices, sample_indices
+from ocealyze.timecodec import DEFAULT_UNITS, decode_times, time_parts
+
+CAST_VARIABLES = ('lat', 'lon', 'time')
+TIME_PARTS = ('year', 'month', 'decade', 'day_of_year')
+OBSERVED_VARIABLES = ('Temperature', 'Salinity', 'Oxygen')
+
+
+def row_offsets(sizes: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(sizes), dtype=np.int64)
+    np.cumsum(sizes[:-1], out=offsets[1:])
+    return offsets
+
+
+def expand_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenate ``arange(start, start + length)`` for every pair without a Python loop."""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    keep = lengths > 0
+    starts, lengths = np.asarray(starts, dtype=np.int64)[keep], lengths[keep]
+    steps = np.ones(total, dtype=np.int64)
+    steps[0] = starts[0]
+    boundaries = np.cumsum(lengths)[:-1]
+    steps[boundaries] = starts[1:] - (starts[:-1] + lengths[:-1] - 1)
+    return np.cumsum(steps)
+
+
+class ObservationTable:
+    """Per-observation columns aligned on the depth levels of each cast.
+
+    ``columns`` hold one value per ``z_obs`` row, ``casts`` hold the per-cast
+    variables and ``offsets``/``sizes`` locate each cast's rows.
+    """
+
+    def __init__(self, columns: dict, casts: dict, offsets: np.ndarray, sizes: np.ndarray):
+        self.columns = columns
+        self.casts = casts
+        self.offsets = offsets
+        self.sizes = sizes
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __len__(self) -> int:
+        return len(self.columns['cast'])
+
+    @property
+    def n_casts(self) -> int:
+        return len(self.sizes)
+
+    def valid_rows(self, *names: str) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        for name in names:
+            mask &= np.isfinite(self.columns[name])
+        return np.flatnonzero(mask)
+
+    def sample_rows(self, size: int, *names: str, seed: int = None) -> np.ndarray:
+        rows = self.valid_rows(*names)
+        if len(rows) > size:
+            rng = np.random.default_rng(seed)
+            rows = np.sort(rng.choice(rows, size, replace=False))
+        return rows
+
+    def cast_rows(self, casts: np.ndarray) -> np.ndarray:
+        return expand_ranges(self.offsets[casts], self.sizes[casts])
+
+    def select_casts(self, casts: np.ndarray) -> 'ObservationTable':
+        """Sub-table holding only ``casts`` (sorted cast indices), renumbered from zero."""
+        casts = np.asarray(casts, dtype=np.int64)
+        rows = self.cast_rows(casts)
+        sizes = np.asarray(self.sizes[casts], dtype=np.int64)
+        columns = {name: values[rows] for name, values in self.columns.items() if name != 'cast'}
+        columns['cast'] = np.repeat(np.arange(len(casts), dtype=np.int64), sizes)
+        cast_columns = {name: values[casts] for name, values in self.casts.items()}
+        return ObservationTable(columns, cast_columns, row_offsets(sizes), sizes)
+
+
+def read_variable(dataset: nc.Dataset, name: str, dtype=np.float32, indices: np.ndarray = None) -> np.ndarray:
+    variable = dataset.variables[name]
+    if np.issubdtype(dtype, np.integer):
+        # Row-size variables: missing counts mean no observations.
+        return np.ma.filled(np.ma.asarray(variable[:]), 0).astype(dtype)
+    if indices is None:
+        return read_column(variable, dtype)
+    return read_indices(variable, indices, dtype)
+
+
+def read_variable_from(file_path: str, name: str, dtype=np.float32, indices: np.ndarray = None) -> np.ndarray:
+    with open_dataset(file_path) as dataset:
+        return read_variable(dataset, name, dtype, indices)
+
+
+class ColumnReader:
+    """Reads batches of variables, concurrently in worker processes when ``max_workers > 1``.
+
+    Common HDF5 builds are not thread-safe (and hold the GIL), so concurrency
+    comes from processes that each open their own handle on the file.
+    ``progress(done, total, name)`` is called after every finished variable.
+    """
+
+    def __init__(self, dataset: nc.Dataset, max_workers: int = 1, progress=None, total: int = 0):
+        self.dataset = dataset
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.progress = progress
+        self.total = total
+        self.done = 0
+        self.executor = None
+
+    def __enter__(self):
+        if self.max_workers > 1:
+            self.executor = ProcessPoolExecutor(self.max_workers)
+        return self
+
+    def __exit__(self, *exc):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def _advance(self, name: str, values: np.ndarray):
+        add('bytes_read', values.nbytes)
+        self.done += 1
+        if self.progress is not None:
+            self.progress(self.done, max(self.total, self.done), name)
+
+    def read(self, requests: dict) -> dict:
+        """``requests`` maps a result key to ``(variable name, dtype, indices)``."""
+        results = {}
+        if self.executor is None or len(requests) == 1:
+            for key, request in requests.items():
+                results[key] = read_variable(self.dataset, *request)
+                self._advance(key, results[key])
+            return results
+
+        file_path = self.dataset.filepath()
+        futures = {self.executor.submit(read_variable_from, file_path, *request): key for key, request in requests.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            results[key] = future.result()
+            self._advance(key, results[key])
+        return results
+
+
+def build_observation_table(dataset: nc.Dataset, variables=OBSERVED_VARIABLES, sample_size: int = None,
+                            seed: int = None, max_workers: int = 1, progress=None) -> ObservationTable:
+    if 'z' not in dataset.variables or 'z_row_size' not in dataset.variables:
+        raise ValueError("Dataset has no 'z'/'z_row_size' variables; it is not a WOD ragged-array file.")
+
+    present = [name for name in variables if name in dataset.variables and f'{name}_row_size' in dataset.variables]
+    sampled = sample_size is not None and sample_size < dataset.variables['z'].shape[0]
+    requests = {f'{name}_row_size': (f'{name}_row_size', np.int64, None) for name in ['z'] + present}
+    for name in CAST_VARIABLES:
+        if name in dataset.variables:
+            requests[name] = (name, np.float64 if name == 'time' else np.float32, None)
+    if not sampled:
+        requests.update({name: (name, np.float32, None) for name in ['z'] + present})
+
+    with ColumnReader(dataset, max_workers, progress, len(requests) + (1 + len(present)) * sampled) as reader:
+        raw = reader.read(requests)
+        z_sizes = raw['z_row_size']
+        z_offsets = row_offsets(z_sizes)
+        n_obs = int(z_sizes.sum())
+        if sampled:
+            rows = sample_indices(n_obs, sample_size, seed, block=chunk_length(dataset.variables['z']))
+            cast = np.searchsorted(z_offsets, rows, side='right') - 1
+            level = rows - z_offsets[cast]
+        else:
+            cast = np.repeat(np.arange(len(z_sizes), dtype=np.int64), z_sizes)
+            level = np.arange(n_obs, dtype=np.int64) - z_offsets[cast]
+
+        # A cast's profile for a variable starts at its own offset and follows
+        # the cast's depth levels; levels beyond the variable's row size stay
+        # NaN. Source indices are increasing, so sampled reads stay chunked.
+        sources = {}
+        for name in present:
+            sizes = raw[f'{name}_row_size']
+            have = level < sizes[cast]
+            sources[name] = (have, row_offsets(sizes)[cast[have]] + level[have])
+        if sampled:
+            samples = {'z': ('z', np.float32, rows)}
+            samples.update({name: (name, np.float32, sources[name][1]) for name in present})
+            raw.update(reader.read(samples))
+
+    casts = {}
+    for name in CAST_VARIABLES:
+        dtype = np.float64 if name == 'time' else np.float32
+        casts[name] = raw[name] if name in raw else np.full(len(z_sizes), np.nan, dtype)
+    casts.update(decode_time_parts(dataset, casts['time']))
+
+    columns = {'cast': cast, 'z': raw['z']}
+    for name in CAST_VARIABLES + TIME_PARTS:
+        columns[name] = casts[name][cast]
+    for name in variables:
+        column = np.full(len(cast), np.nan, dtype=np.float32)
+        if name in sources:
+            have, source = sources[name]
+            column[have] = raw[name] if sampled else raw[name][source]
+        columns[name] = column
+
+    if sampled:
+        z_sizes = np.bincount(cast, minlength=len(z_sizes))
+        z_offsets = row_offsets(z_sizes)
+    return ObservationTable(columns, casts, z_offsets, z_sizes)
+
+
+def decode_time_parts(dataset: nc.Dataset, values: np.ndarray) -> dict:
+    time_variable = dataset.variables.get('time', None)
+    units = getattr(time_variable, 'units', DEFAULT_UNITS)
+    calendar = getattr(time_variable, 'calendar', 'standard')
+    return time_parts(decode_times(values, units, calendar))
+
+
+def concat_tables(tables: list) -> ObservationTable:
+    """Stack tables from several files into one, renumbering casts consecutively."""
+    if len(tables) == 1:
+        return tables[0]
+    sizes = np.concatenate([table.sizes for table in tables]).astype(np.int64)
+    first_cast = np.cumsum([0] + [table.n_casts for table in tables[:-1]])
+    columns = {
+        name: np.concatenate([table.columns[name] for table in tables])
+        for name in tables[0].columns if name != 'cast'
+    }
+    columns['cast'] = np.concatenate([table.columns['cast'] + first for table, first in zip(tables, first_cast)])
+    casts = {name: np.concatenate([table.casts[name] for table in tables]) for name in tables[0].casts}
+    return ObservationTable(columns, casts, row_offsets(sizes), sizes)
+
+
+def variable_chunks(dataset: nc.Dataset, name: str, selected_casts: np.ndarray = None,
+                    chunk_size: int = CHUNK_ELEMENTS):
+    """Stream a variable chunk by chunk, keeping only values of casts where ``selected_casts`` is True.
+
+    Per-observation variables are mapped to their casts through the row-size
+    offsets, so region or period filters need no observation table.
+    """
+    variable = dataset.variables[name]
+    if selected_casts is None:
+        yield from netcdf_chunks(variable, chunk_size)
+        return
+    per_cast = variable.dimensions == ('casts',)
+    offsets = None if per_cast else row_offsets(read_variable(dataset, f'{name}_row_size', np.int64))
+    start = 0
+    for chunk in netcdf_chunks(variable, chunk_size):
+        if per_cast:
+            yield chunk[selected_casts[start:start + len(chunk)]]
+        else:
+            rows = np.arange(start, start + len(chunk), dtype=np.int64)
+            yield chunk[selected_casts[np.searchsorted(offsets, rows, side='right') - 1]]
+        start += len(chunk)
+
+
+def aligned_chunks(dataset: nc.Dataset, name: str, chunk_size: int = CHUNK_ELEMENTS):
+    """Stream a per-observation variable as ``(cast, depth row, values)`` chunks.
+
+    Values are matched to their cast's depth levels through both row-size
+    offsets; values beyond a cast's depth levels are dropped.
+    """
+    z_sizes = read_variable(dataset, 'z_row_size', np.int64)
+    z_offsets = row_offsets(z_sizes)
+    offsets = row_offsets(read_variable(dataset, f'{name}_row_size', np.int64))
+    start = 0
+    for values in netcdf_chunks(dataset.variables[name], chunk_size):
+        rows = np.arange(start, start + len(values), dtype=np.int64)
+        cast = np.searchsorted(offsets, rows, side='right') - 1
+        level = rows - offsets[cast]
+        have = level < z_sizes[cast]
+        yield cast[have], z_offsets[cast[have]] + level[have], values[have]
+        start += len(values)
+
+
+def aligned_columns(dataset: nc.Dataset, names, selected_casts: np.ndarray = None,
+                    chunk_size: int = CHUNK_ELEMENTS, order=None):
+    """Stream several per-observation variables matched on depth rows as ``(cast, depth row, values)`` chunks.
+
+    ``values`` holds one float32 column per name. Chunks follow the first
+    variable's storage chunks, visited in ``order(n_chunks)`` when given; the
+    other variables are read over the slice of their own rows each chunk
+    covers and are NaN where a cast has fewer of them. Rows of casts where
+    ``selected_casts`` is False are dropped.
+    """
+    z_sizes = read_variable(dataset, 'z_row_size', np.int64)
+    z_offsets = row_offsets(z_sizes)
+    sources = []
+    for name in names:
+        if name in dataset.variables and f'{name}_row_size' in dataset.variables:
+            sizes = read_variable(dataset, f'{name}_row_size', np.int64)
+            sources.append((dataset.variables[name], sizes, row_offsets(sizes)))
+        else:
+            sources.append((None, np.zeros(len(z_sizes), dtype=np.int64), None))
+    first, sizes, offsets = sources[0]
+    if first is None:
+        return
+
+    block = chunk_length(first)
+    step = max(chunk_size // block, 1) * block
+    starts = np.arange(0, first.shape[0], step)
+    if order is not None:
+        starts = starts[order(len(starts))]
+    for start in starts:
+        values = read_column(first, np.float32, slice(start, start + step))
+        rows = np.arange(start, start + len(values), dtype=np.int64)
+        cast = np.searchsorted(offsets, rows, side='right') - 1
+        level = rows - offsets[cast]
+        keep = level < z_sizes[cast]
+        if selected_casts is not None:
+            keep &= selected_casts[cast]
+        cast, level = cast[keep], level[keep]
+        columns = np.full((len(cast), len(sources)), np.nan, dtype=np.float32)
+        columns[:, 0] = values[keep]
+        for i, (variable, sizes, variable_offsets) in enumerate(sources[1:], start=1):
+            have = level < sizes[cast]
+            if not have.any():
+                continue
+            # Casts and levels increase through the chunk, so the source rows form one short slice.
+            source = variable_offsets[cast[have]] + level[have]
+            columns[have, i] = read_column(variable, np.float32, slice(source[0], source[-1] + 1))[source - source[0]]
+        yield cast, z_offsets[cast] + level, columns
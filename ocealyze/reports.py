@@ -0,0 +1,59 @@
+"""Tabular results shared by the dashboard and the headless runner (no Streamlit or Plotly here)."""
+import numpy as np
+import pandas as pd
+
+from ocealyze.timecodec import MISSING
+
+DEPTH_ZONE_EDGES = (0, 50, 200, 1000, 4000, np.inf)
+DEPTH_ZONES = (
+    "🏖️ Surface (0-50m)", "🐠 Shallow (50-200m)", "🐙 Mid-depth (200-1000m)", "🦑 Deep (1000-4000m)", "🕳️ Abyssal (>4000m)"
+)
+
+
+def depth_zone_index(depth: np.ndarray, edges=DEPTH_ZONE_EDGES) -> np.ndarray:
+    """Zone per depth, -1 outside the zones (NaN depths included).
+
+    Zones are closed at the bottom, ``(a, b]``, as in the depth tab's zone
+    counts (``right=True`` histograms of positive depths), so a depth of
+    exactly 0 belongs to no zone and one of 50 m is still surface water.
+    """
+    depth = np.asarray(depth)
+    zone = np.searchsorted(edges, depth, side='left') - 1
+    zone[(zone >= len(edges) - 1) | ~np.isfinite(depth)] = -1
+    return zone.astype(np.int8)
+
+
+def summary_record(label: str, unit: str, summary: dict) -> dict:
+    """One row of the export report from a ``StreamingSummary.to_dict()``."""
+    return {
+        'Parameter': label,
+        'Unit': unit,
+        'Total_Measurements': summary['count'],
+        'Mean': round(summary['mean'], 4),
+        'Standard_Deviation': round(summary['std'], 4),
+        'Minimum': round(summary['min'], 4),
+        'Maximum': round(summary['max'], 4),
+        'Median': round(summary['median'], 4),
+        'P25': round(summary['p25'], 4),
+        'P75': round(summary['p75'], 4)
+    }
+
+
+def depth_zone_frame(zone_counts: np.ndarray) -> pd.DataFrame:
+    frame = pd.DataFrame({'Depth Zone': DEPTH_ZONES, 'Count': zone_counts})
+    frame['Percentage'] = (frame['Count'] / max(zone_counts.sum(), 1) * 100).round(2)
+    return frame
+
+
+def histogram_frame(counts: np.ndarray, edges: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({'bin_left': edges[:-1], 'bin_right': edges[1:], 'count': counts})
+
+
+def casts_per_year(years: np.ndarray) -> pd.DataFrame:
+    years = np.asarray(years)
+    years = years[years != MISSING].astype(np.int64)
+    if len(years) == 0:
+        return pd.DataFrame({'Year': [], 'Casts': []})
+    counts = np.bincount(years - years.min())
+    present = np.flatnonzero(counts)
+    return pd.DataFrame({'Year': present + years.min(), 'Casts': counts[present]})
@@ -0,0 +1,90 @@
+"""Chunk-aware streaming and sampled reads from netCDF4 variables.
+
+Random fancy indexing makes HDF5 decompress the same chunk once per index.
+Here the sample is drawn up front (optionally restricted to whole chunks),
+sorted, and every touched chunk or run of adjacent chunks is read with a single
+slice before the sampled values are picked in memory.
+"""
+import numpy as np
+import netCDF4 as nc
+
+CONTIGUOUS_BLOCK = 1 << 16
+MAX_RUN_ELEMENTS = 1 << 22
+CHUNK_ELEMENTS = 1 << 20
+
+
+def read_column(variable: nc.Variable, dtype=np.float32, index=slice(None)) -> np.ndarray:
+    values = variable[index]
+    return np.ma.filled(np.ma.asarray(values).astype(dtype), np.nan)
+
+
+def chunk_length(variable: nc.Variable) -> int:
+    chunking = variable.chunking()
+    if chunking == 'contiguous' or not chunking:
+        return CONTIGUOUS_BLOCK
+    return max(int(chunking[0]), 1)
+
+
+def netcdf_chunks(variable: nc.Variable, chunk_size: int = CHUNK_ELEMENTS):
+    """Yield a 1-D variable as float32 slices aligned to its storage chunks."""
+    block = chunk_length(variable)
+    step = max(chunk_size // block, 1) * block
+    for start in range(0, variable.shape[0], step):
+        yield read_column(variable, np.float32, slice(start, start + step))
+
+
+def array_chunks(values: np.ndarray, chunk_size: int = CHUNK_ELEMENTS):
+    for start in range(0, len(values), chunk_size):
+        yield np.asarray(values[start:start + chunk_size])
+
+
+def sample_indices(population: int, size: int, seed: int = None, block: int = None,
+                   min_blocks: int = 128) -> np.ndarray:
+    """Sorted sample of ``size`` distinct indices out of ``range(population)``.
+
+    Without ``block`` this is a plain uniform sample. With ``block`` it is a
+    two-stage sample: random whole blocks first, then a uniform subsample of
+    their elements, so every index keeps the same inclusion probability while
+    only ``min_blocks`` (or enough blocks to hold ``4 * size``) are read.
+    """
+    if size is None or size >= population:
+        return np.arange(population, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    if block:
+        n_blocks = -(-population // block)
+        n_chosen = max(min_blocks, -(-4 * size // block))
+        if n_chosen < n_blocks:
+            chosen = np.sort(rng.choice(n_blocks, n_chosen, replace=False))
+            candidates = (chosen[:, None] * block + np.arange(block)).ravel()
+            candidates = candidates[candidates < population]
+            if len(candidates) > size:
+                return np.sort(rng.choice(candidates, size, replace=False)).astype(np.int64)
+    return np.sort(rng.choice(population, size, replace=False)).astype(np.int64)
+
+
+def read_indices(variable: nc.Variable, indices: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """Return ``variable[indices]`` (masked values as NaN) for sorted ``indices``."""
+    out = np.empty(len(indices), dtype=dtype)
+    if len(indices) == 0:
+        return out
+
+    block = chunk_length(variable)
+    blocks = indices // block
+    # Adjacent touched blocks are merged into one slice, capped so a dense
+    # sample never pulls more than MAX_RUN_ELEMENTS into memory at once.
+    max_blocks = max(MAX_RUN_ELEMENTS // block, 1)
+    breaks = np.flatnonzero(np.diff(blocks) > 1) + 1
+    run_starts = np.concatenate(([0], breaks))
+    run_ends = np.concatenate((breaks, [len(indices)]))
+
+    size = variable.shape[0]
+    for start, end in zip(run_starts, run_ends):
+        while start < end:
+            first = blocks[start]
+            stop = start + np.searchsorted(blocks[start:end], first + max_blocks)
+            lo = int(first * block)
+            hi = int(min((blocks[stop - 1] + 1) * block, size))
+            values = read_column(variable, dtype, slice(lo, hi))
+            out[start:stop] = values[indices[start:stop] - lo]
+            start = stop
+    return out
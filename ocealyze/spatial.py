@@ -0,0 +1,69 @@
+"""Fixed lat/lon bin index over cast positions for bounding-box and polygon queries."""
+import numpy as np
+
+from ocealyze.geometry import points_in_polygon
+from ocealyze.ragged import expand_ranges
+
+
+def region_mask(lat: np.ndarray, lon: np.ndarray, bounds: tuple) -> np.ndarray:
+    """Positions inside ``(lat_min, lat_max, lon_min, lon_max)``; ``lon_min > lon_max`` wraps across 180°."""
+    lat_min, lat_max, lon_min, lon_max = bounds
+    inside = (lat >= lat_min) & (lat <= lat_max)
+    if lon_min <= lon_max:
+        return inside & (lon >= lon_min) & (lon <= lon_max)
+    return inside & ((lon >= lon_min) | (lon <= lon_max))
+
+
+class GridIndex:
+    """Casts bucketed into ``resolution``-degree cells, stored as sorted cast ids plus cell offsets."""
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, resolution: float = 1.0):
+        self.lat = np.asarray(lat)
+        self.lon = np.asarray(lon)
+        self.resolution = resolution
+        self.n_rows = int(np.ceil(180 / resolution))
+        self.n_cols = int(np.ceil(360 / resolution))
+
+        valid = np.flatnonzero(np.isfinite(self.lat) & np.isfinite(self.lon))
+        cells = self._cell(self._row(self.lat[valid]), self._col(self.lon[valid]))
+        order = np.argsort(cells, kind='stable')
+        self.casts = valid[order]
+        counts = np.bincount(cells, minlength=self.n_rows * self.n_cols)
+        self.starts = np.concatenate(([0], np.cumsum(counts)))
+
+    def _row(self, lat) -> np.ndarray:
+        return np.clip(((np.asarray(lat) + 90) // self.resolution).astype(np.int64), 0, self.n_rows - 1)
+
+    def _col(self, lon) -> np.ndarray:
+        lon = np.asarray(lon, dtype=np.float64)
+        # 180° is the east edge of the last column, not the west edge of the first.
+        wrapped = np.where(lon == 180, 360.0, (lon + 180) % 360)
+        return np.clip((wrapped // self.resolution).astype(np.int64), 0, self.n_cols - 1)
+
+    def _cell(self, row, col) -> np.ndarray:
+        return row * self.n_cols + col
+
+    def _candidates(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        cells = self._cell(rows[:, None], cols[None, :]).ravel()
+        return self.casts[expand_ranges(self.starts[cells], self.starts[cells + 1] - self.starts[cells])]
+
+    def query_bbox(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> np.ndarray:
+        """Sorted cast ids inside the box; ``lon_min > lon_max`` selects across the antimeridian."""
+        rows = np.arange(self._row(lat_min), self._row(lat_max) + 1)
+        first, last = int(self._col(lon_min)), int(self._col(lon_max))
+        if lon_max - lon_min >= 360:
+            cols = np.arange(self.n_cols)
+        elif lon_min <= lon_max:
+            cols = np.arange(first, last + 1)
+        else:
+            cols = np.concatenate((np.arange(first, self.n_cols), np.arange(0, last + 1)))
+
+        casts = self._candidates(rows, cols)
+        inside = region_mask(self.lat[casts], self.lon[casts], (lat_min, lat_max, lon_min, lon_max))
+        return np.sort(casts[inside])
+
+    def query_polygon(self, vertices) -> np.ndarray:
+        """Sorted cast ids inside a polygon of (lon, lat) vertices (no antimeridian crossing)."""
+        vertices = np.asarray(vertices, dtype=np.float64)
+        casts = self.query_bbox(vertices[:, 1].min(), vertices[:, 1].max(), vertices[:, 0].min(), vertices[:, 0].max())
+        return casts[points_in_polygon(self.lon[casts], self.lat[casts], vertices)]
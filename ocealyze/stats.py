@@ -0,0 +1,147 @@
+"""One-pass, mergeable summary statistics over chunked data.
+
+``RunningMoments`` merges per-chunk counts, means and squared deviations with
+Chan et al.'s parallel form of Welford's update. ``QuantileSketch`` is a KLL
+sketch: a stack of compactors whose level-h items each stand for 2**h inputs.
+Both keep constant memory and merge across chunks, files and processes.
+"""
+import numpy as np
+
+from ocealyze.histogram import select_values
+
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+
+class RunningMoments:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        other = RunningMoments()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other: 'RunningMoments'):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+
+class QuantileSketch:
+    """KLL quantile sketch; rank error shrinks roughly as 1/k."""
+
+    def __init__(self, k: int = 2048, seed: int = None):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels)
+        return max(int(np.ceil(self.k * (2 / 3) ** (depth - 1 - level))), 2)
+
+    def _compress(self):
+        while sum(len(items) for items in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            level = next(h for h, items in enumerate(self.levels) if len(items) > self._capacity(h))
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            # Keep one item back on odd sizes, promote every other item of the
+            # rest (random parity) with doubled weight.
+            spare = len(items) % 2
+            self.levels[level] = items[:spare]
+            promoted = items[spare + self.rng.integers(2)::2]
+            self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+
+    def merge(self, other: 'QuantileSketch'):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self._compress()
+
+    def quantiles(self, qs) -> np.ndarray:
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return np.full(len(qs), np.nan)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        ranks = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)
+        return items[order][positions]
+
+
+class StreamingSummary:
+    """Exact count/mean/std/min/max plus sketched quantiles; mergeable."""
+
+    def __init__(self, k: int = 2048, seed: int = 0):
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(k, seed)
+
+    def update(self, values: np.ndarray):
+        self.moments.update(values)
+        self.sketch.update(values)
+
+    def merge(self, other: 'StreamingSummary'):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+
+    def quantiles(self, qs=DEFAULT_QUANTILES) -> np.ndarray:
+        values = self.sketch.quantiles(qs)
+        qs = np.asarray(qs)
+        values[qs <= 0] = self.moments.min
+        values[qs >= 1] = self.moments.max
+        return np.clip(values, self.moments.min, self.moments.max)
+
+    def to_dict(self, qs=DEFAULT_QUANTILES) -> dict:
+        summary = {
+            'count': self.moments.count,
+            'mean': self.moments.mean if self.moments.count else np.nan,
+            'std': self.moments.std,
+            'min': self.moments.min if self.moments.count else np.nan,
+            'max': self.moments.max if self.moments.count else np.nan,
+        }
+        for q, value in zip(qs, self.quantiles(qs)):
+            summary['median' if q == 0.5 else f'p{q * 100:g}'] = float(value)
+        return summary
+
+
+def summarize(source, keep=None, k: int = 2048) -> StreamingSummary:
+    """Stream every finite (and kept) value of ``source()`` into a StreamingSummary."""
+    summary = StreamingSummary(k)
+    for chunk in source():
+        summary.update(select_values(chunk, keep))
+    return summary
@@ -0,0 +1,147 @@
+"""Synthetic World Ocean Database files for benchmarks and demos.
+
+Files follow the WOD contiguous ragged-array layout read by ``ocealyze.ragged``:
+a ``casts`` dimension with lat/lon/time, one ``<name>_obs`` dimension per
+observed variable, ``<name>_row_size`` counts per cast, and ``_FillValue``
+gaps. Profiles are loosely realistic (a warm, well-mixed surface layer over a
+thermocline, a salinity tied to temperature and an oxygen minimum zone) so
+histograms, clusters and models have structure to find.
+
+Observations are generated and written in cast blocks, so files of 10^8
+observations need no more memory than one block::
+
+    python -m ocealyze.synthetic WOD_synthetic.nc --observations 1e6
+"""
+import argparse
+
+import netCDF4 as nc
+import numpy as np
+
+from ocealyze.ragged import row_offsets
+from ocealyze.timecodec import DEFAULT_UNITS
+
+MEAN_LEVELS = 30
+BLOCK_OBSERVATIONS = 1 << 22
+FILL_VALUE = nc.default_fillvals['f4']
+PRESENCE = {'Temperature': 0.92, 'Salinity': 0.75, 'Oxygen': 0.4}
+
+
+def cast_row_sizes(n_observations: int, rng: np.random.Generator, mean_levels: int = MEAN_LEVELS) -> dict:
+    """Row sizes per variable; ``z`` sizes sum exactly to ``n_observations``."""
+    count = n_observations // mean_levels + 1
+    while True:
+        levels = np.maximum(rng.lognormal(np.log(mean_levels), 0.6, count).astype(np.int64), 1)
+        ends = np.cumsum(levels)
+        if ends[-1] >= n_observations:
+            break
+        count *= 2
+    n_casts = int(np.searchsorted(ends, n_observations)) + 1
+    levels = levels[:n_casts]
+    levels[-1] -= ends[n_casts - 1] - n_observations
+    sizes = {'z': levels}
+    for name, fraction in PRESENCE.items():
+        present = rng.random(n_casts) < fraction
+        if name == 'Oxygen':
+            # Bottle casts often stop short of the deepest CTD levels.
+            sizes[name] = np.where(present, np.maximum(levels - rng.integers(0, 4, n_casts), 0), 0)
+        else:
+            sizes[name] = np.where(present, levels, 0)
+    return sizes
+
+
+def profiles(lat: np.ndarray, sizes: np.ndarray, rng: np.random.Generator) -> dict:
+    """Depth, temperature, salinity and oxygen for every level of the given casts."""
+    cast = np.repeat(np.arange(len(sizes)), sizes)
+    level = np.arange(len(cast)) - row_offsets(sizes)[cast]
+    max_depth = rng.uniform(200, 5500, len(sizes))[cast]
+    depth = (max_depth * ((level + rng.random(len(cast)) * 0.5) / np.maximum(sizes[cast], 1)) ** 1.7)
+
+    surface = 28.0 - 0.32 * np.abs(lat[cast]) + rng.normal(0, 1.5, len(sizes))[cast]
+    deep = 2.0 + rng.normal(0, 0.5, len(cast))
+    temperature = deep + (surface - deep) * np.exp(-depth / rng.uniform(300, 900, len(sizes))[cast])
+    temperature += rng.normal(0, 0.3, len(cast))
+    salinity = 34.2 + 0.06 * (temperature - 4.0) + rng.normal(0, 0.25, len(cast))
+    oxygen = 300.0 - 4.0 * temperature - 120.0 * np.exp(-((depth - 800.0) / 450.0) ** 2)
+    oxygen += rng.normal(0, 15, len(cast))
+    return {
+        'z': depth.astype(np.float32),
+        'Temperature': temperature.astype(np.float32),
+        'Salinity': salinity.astype(np.float32),
+        'Oxygen': np.maximum(oxygen, 0).astype(np.float32),
+    }
+
+
+def write_synthetic_wod(path: str, n_observations: int, seed: int = 0, chunk_size: int = None,
+                        fill_fraction: float = 0.01, block_observations: int = BLOCK_OBSERVATIONS) -> dict:
+    """Write a WOD-layout file with ``n_observations`` depth levels; returns its dimension sizes."""
+    rng = np.random.default_rng(seed)
+    sizes = cast_row_sizes(int(n_observations), rng)
+    n_casts = len(sizes['z'])
+
+    # More casts in the northern hemisphere and in recent decades, as in the real archive.
+    lat = np.degrees(np.arcsin(rng.uniform(-0.97, 1.0, n_casts))).astype(np.float32)
+    lon = rng.uniform(-180, 180, n_casts).astype(np.float32)
+    years = 2024 - rng.exponential(25, n_casts).clip(0, 250)
+    epoch_year = int(DEFAULT_UNITS.split()[2][:4])
+    time = (years - epoch_year) * 365.2425
+    time[rng.random(n_casts) < fill_fraction] = np.nan
+
+    with nc.Dataset(path, 'w', format='NETCDF4') as dataset:
+        dataset.title = 'Synthetic World Ocean Database casts'
+        dataset.createDimension('casts', n_casts)
+        for name, counts in sizes.items():
+            dataset.createDimension(f'{name}_obs', int(counts.sum()))
+
+        def variable(name, dtype, dimension, fill, **attributes):
+            length = len(dataset.dimensions[dimension])
+            chunking = {'chunksizes': (min(chunk_size, length),)} if chunk_size and length else {}
+            created = dataset.createVariable(name, dtype, (dimension,), zlib=True, fill_value=fill, **chunking)
+            for key, value in attributes.items():
+                setattr(created, key, value)
+            return created
+
+        variable('lat', 'f4', 'casts', FILL_VALUE, units='degrees_north')[:] = lat
+        variable('lon', 'f4', 'casts', FILL_VALUE, units='degrees_east')[:] = lon
+        variable('time', 'f8', 'casts', nc.default_fillvals['f8'], units=DEFAULT_UNITS,
+                 calendar='gregorian')[:] = np.ma.masked_invalid(time)
+        for name, counts in sizes.items():
+            variable(f'{name}_row_size', 'i4', 'casts', nc.default_fillvals['i4'])[:] = counts
+
+        units = {'z': 'm', 'Temperature': 'degree_C', 'Salinity': '1e-3', 'Oxygen': 'umol/kg'}
+        observed = {name: variable(name, 'f4', f'{name}_obs', FILL_VALUE, units=units[name]) for name in sizes}
+        offsets = {name: row_offsets(counts) for name, counts in sizes.items()}
+
+        z_ends = np.cumsum(sizes['z'])
+        start = 0
+        while start < n_casts:
+            stop = int(np.searchsorted(z_ends, z_ends[start] - sizes['z'][start] + block_observations, 'right'))
+            stop = max(stop, start + 1)
+            values = profiles(lat[start:stop], sizes['z'][start:stop], rng)
+            level_offsets = row_offsets(sizes['z'][start:stop])
+            for name, counts in sizes.items():
+                block_counts = counts[start:stop]
+                # Each variable keeps the first row_size levels of the cast's profile.
+                keep = (np.arange(len(values[name])) - np.repeat(level_offsets, sizes['z'][start:stop])
+                        < np.repeat(block_counts, sizes['z'][start:stop]))
+                data = values[name][keep]
+                if name != 'z' and fill_fraction:
+                    data[rng.random(len(data)) < fill_fraction] = np.nan
+                first = int(offsets[name][start])
+                observed[name][first:first + len(data)] = np.ma.masked_invalid(data)
+            start = stop
+    return {'casts': n_casts, **{f'{name}_obs': int(counts.sum()) for name, counts in sizes.items()}}
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Write a synthetic WOD ragged-array NetCDF file.')
+    parser.add_argument('path')
+    parser.add_argument('-n', '--observations', type=float, default=1e6, help='depth levels to generate')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk', type=int, default=None, help='HDF5 chunk length (library default if omitted)')
+    parser.add_argument('--fill-fraction', type=float, default=0.01, help='share of values written as _FillValue')
+    args = parser.parse_args(argv)
+    print(write_synthetic_wod(args.path, int(args.observations), args.seed, args.chunk, args.fill_fraction))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,633 @@
+"""Static page styling and the Plotly theme, built once per process rather than on every rerun.
+
+Streamlit re-executes the app script on every interaction; keeping these here
+means the stylesheet string and the Plotly template are created when the module
+is first imported, and Plotly itself is only imported by the first chart.
+"""
+from functools import lru_cache
+
+TEMPLATE_NAME = 'tidetrace'
+
+# Enhanced CSS with beautiful ocean-themed styling
+APP_STYLE = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Poppins:wght@300;400;500;600;700&family=Dancing+Script:wght@400;500;600;700&display=swap');
+
+/* Enhanced Ocean Color Palette */
+:root {
+    /* Primary Ocean Colors */
+    --deep-ocean: #0B1426;
+    --midnight-blue: #1B2951;
+    --ocean-blue: #2E4F99;
+    --wave-blue: #4A90E2;
+    --aqua-blue: #00C4FF;
+    --sea-foam: #7FDBDA;
+    --coral: #FF6B6B;
+    --pearl: #F8FFFE;
+    
+    /* Gradient Colors */
+    --ocean-gradient: linear-gradient(135deg, #0B1426 0%, #1B2951 25%, #2E4F99 50%, #4A90E2 75%, #00C4FF 100%);
+    --wave-gradient: linear-gradient(45deg, #4A90E2, #00C4FF, #7FDBDA);
+    --sunset-gradient: linear-gradient(135deg, #FF6B6B, #4A90E2, #00C4FF);
+    
+    /* Glass Effects */
+    --glass-bg: rgba(255, 255, 255, 0.08);
+    --glass-border: rgba(255, 255, 255, 0.15);
+    --glass-shadow: rgba(0, 0, 0, 0.2);
+    --glass-hover: rgba(255, 255, 255, 0.12);
+    
+    /* Text Colors */
+    --text-primary: #F8FFFE;
+    --text-secondary: #B8D4F0;
+    --text-accent: #00C4FF;
+    --text-muted: #7A9CC6;
+}
+
+/* Animated Ocean Background */
+.stApp {
+    background: var(--ocean-gradient);
+    font-family: 'Poppins', sans-serif;
+    position: relative;
+    overflow-x: hidden;
+}
+
+.stApp::before {
+    content: '';
+    position: fixed;
+    top: 0;
+    left: 0;
+    width: 100%;
+    height: 100%;
+    background: 
+        radial-gradient(circle at 20% 80%, rgba(0, 196, 255, 0.1) 0%, transparent 50%),
+        radial-gradient(circle at 80% 20%, rgba(127, 219, 218, 0.1) 0%, transparent 50%),
+        radial-gradient(circle at 40% 40%, rgba(74, 144, 226, 0.05) 0%, transparent 50%);
+    animation: oceanWaves 20s ease-in-out infinite;
+    pointer-events: none;
+    z-index: -1;
+}
+
+@keyframes oceanWaves {
+    0%, 100% { 
+        transform: translateY(0px) rotate(0deg);
+        opacity: 0.7;
+    }
+    33% { 
+        transform: translateY(-10px) rotate(1deg);
+        opacity: 0.9;
+    }
+    66% { 
+        transform: translateY(5px) rotate(-1deg);
+        opacity: 0.8;
+    }
+}
+
+/* Enhanced Main Container */
+.main .block-container {
+    padding-top: 6rem !important;
+    margin-top: 0 !important;
+    padding-bottom: 2rem;
+    max-width: 1400px;
+    backdrop-filter: blur(10px);
+}
+
+/* Hide Streamlit Elements */
+.stApp > header { display: none !important; }
+#MainMenu { visibility: hidden; }
+footer { visibility: hidden; }
+.stDeployButton { display: none; }
+.stDecoration { display: none; }
+
+/* Enhanced TideTrace Navigation */
+.tidetrace-navbar {
+    background: rgba(11, 20, 38, 0.9);
+    backdrop-filter: blur(20px);
+    -webkit-backdrop-filter: blur(20px);
+    padding: 1rem 2rem;
+    border-bottom: 1px solid var(--glass-border);
+    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
+    position: fixed;
+    top: 0;
+    left: 0;
+    right: 0;
+    z-index: 1000;
+    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
+}
+
+.tidetrace-navbar.hidden {
+    transform: translateY(-100%);
+}
+
+.tidetrace-title {
+    font-family: 'Dancing Script', cursive;
+    font-size: 4rem;
+    font-weight: 700;
+    background: linear-gradient(45deg, #00C4FF, #7FDBDA, #4A90E2);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+    text-align: center;
+    margin: 0;
+    letter-spacing: 3px;
+    text-shadow: 0 0 30px rgba(0, 196, 255, 0.5);
+    animation: titleGlow 3s ease-in-out infinite alternate;
+    position: relative;
+}
+
+.tidetrace-title::after {
+    content: '';
+    position: absolute;
+    bottom: -10px;
+    left: 50%;
+    transform: translateX(-50%);
+    width: 100px;
+    height: 3px;
+    background: var(--wave-gradient);
+    border-radius: 2px;
+    animation: waveFlow 2s ease-in-out infinite;
+}
+
+@keyframes titleGlow {
+    from {
+        filter: drop-shadow(0 0 20px rgba(0, 196, 255, 0.7));
+    }
+    to {
+        filter: drop-shadow(0 0 40px rgba(127, 219, 218, 0.9));
+    }
+}
+
+@keyframes waveFlow {
+    0%, 100% { width: 100px; }
+    50% { width: 150px; }
+}
+
+.main {
+    padding-top: 120px !important;
+}
+
+/* Enhanced Section Headers */
+.sub-header {
+    font-size: 2rem;
+    font-weight: 600;
+    color: var(--text-primary);
+    margin: 2rem 0 1.5rem;
+    padding: 1.5rem 2rem;
+    background: var(--glass-bg);
+    backdrop-filter: blur(15px);
+    -webkit-backdrop-filter: blur(15px);
+    border-radius: 20px;
+    border: 1px solid var(--glass-border);
+    box-shadow: 0 8px 32px var(--glass-shadow);
+    position: relative;
+    overflow: hidden;
+    animation: slideInUp 0.8s cubic-bezier(0.4, 0, 0.2, 1);
+}
+
+.sub-header::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 4px;
+    background: var(--wave-gradient);
+    animation: shimmer 2s ease-in-out infinite;
+}
+
+@keyframes shimmer {
+    0% { transform: translateX(-100%); }
+    100% { transform: translateX(100%); }
+}
+
+@keyframes slideInUp {
+    from {
+        opacity: 0;
+        transform: translateY(30px);
+    }
+    to {
+        opacity: 1;
+        transform: translateY(0);
+    }
+}
+
+/* Enhanced Card Containers */
+.card-container {
+    background: var(--glass-bg);
+    backdrop-filter: blur(20px);
+    -webkit-backdrop-filter: blur(20px);
+    border-radius: 24px;
+    border: 1px solid var(--glass-border);
+    box-shadow: 
+        0 8px 32px rgba(0, 0, 0, 0.2),
+        inset 0 1px 0 rgba(255, 255, 255, 0.1);
+    padding: 2rem;
+    margin-bottom: 2rem;
+    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
+    position: relative;
+    overflow: hidden;
+    animation: fadeInScale 0.6s cubic-bezier(0.4, 0, 0.2, 1);
+}
+
+.card-container::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 1px;
+    background: var(--wave-gradient);
+}
+
+.card-container:hover {
+    transform: translateY(-8px) scale(1.02);
+    box-shadow: 
+        0 20px 60px rgba(0, 0, 0, 0.3),
+        0 0 40px rgba(0, 196, 255, 0.1),
+        inset 0 1px 0 rgba(255, 255, 255, 0.2);
+    background: var(--glass-hover);
+}
+
+@keyframes fadeInScale {
+    from {
+        opacity: 0;
+        transform: scale(0.9);
+    }
+    to {
+        opacity: 1;
+        transform: scale(1);
+    }
+}
+
+/* Enhanced Metrics */
+.stMetric {
+    background: var(--glass-bg);
+    backdrop-filter: blur(15px);
+    -webkit-backdrop-filter: blur(15px);
+    border-radius: 16px;
+    padding: 1.5rem;
+    border: 1px solid var(--glass-border);
+    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+    box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);
+    position: relative;
+    overflow: hidden;
+}
+
+.stMetric::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    width: 100%;
+    height: 2px;
+    background: var(--wave-gradient);
+    transform: translateX(-100%);
+    animation: loadingBar 2s ease-in-out infinite;
+}
+
+.stMetric:hover {
+    transform: translateY(-4px);
+    box-shadow: 0 12px 40px rgba(0, 196, 255, 0.2);
+    background: var(--glass-hover);
+}
+
+@keyframes loadingBar {
+    0% { transform: translateX(-100%); }
+    50% { transform: translateX(0%); }
+    100% { transform: translateX(100%); }
+}
+
+/* Enhanced Sidebar */
+[data-testid="stSidebar"] {
+    background: rgba(11, 20, 38, 0.95);
+    backdrop-filter: blur(20px);
+    -webkit-backdrop-filter: blur(20px);
+    border-right: 1px solid var(--glass-border);
+    box-shadow: 4px 0 20px rgba(0, 0, 0, 0.3);
+}
+
+.sidebar-header {
+    background: var(--glass-bg);
+    backdrop-filter: blur(15px);
+    -webkit-backdrop-filter: blur(15px);
+    padding: 1rem;
+    border-radius: 16px;
+    margin: 1rem 0;
+    text-align: center;
+    box-shadow: 0 4px 20px rgba(0, 0, 0, 0.2);
+    border: 1px solid var(--glass-border);
+    position: relative;
+    overflow: hidden;
+}
+
+.sidebar-header::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 2px;
+    background: var(--wave-gradient);
+}
+
+.sidebar-header h2 {
+    color: var(--text-primary);
+    margin: 0;
+    font-size: 1.5rem;
+    font-weight: 600;
+}
+
+/* Enhanced Buttons */
+[data-testid="stSidebar"] .stButton > button,
+.stButton > button {
+    background: var(--glass-bg);
+    color: var(--text-primary);
+    border: 1px solid var(--glass-border);
+    border-radius: 12px;
+    padding: 0.8rem 1.2rem;
+    font-weight: 500;
+    font-size: 0.95rem;
+    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+    box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
+    width: 100%;
+    margin-bottom: 0.5rem;
+    position: relative;
+    overflow: hidden;
+    backdrop-filter: blur(10px);
+    -webkit-backdrop-filter: blur(10px);
+}
+
+[data-testid="stSidebar"] .stButton > button::before,
+.stButton > button::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: -100%;
+    width: 100%;
+    height: 100%;
+    background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.1), transparent);
+    transition: left 0.5s;
+}
+
+[data-testid="stSidebar"] .stButton > button:hover,
+.stButton > button:hover {
+    background: var(--glass-hover);
+    color: var(--text-accent);
+    transform: translateY(-2px);
+    box-shadow: 0 8px 25px rgba(0, 196, 255, 0.2);
+    border-color: var(--text-accent);
+}
+
+[data-testid="stSidebar"] .stButton > button:hover::before,
+.stButton > button:hover::before {
+    left: 100%;
+}
+
+[data-testid="stSidebar"] .stButton > button:active,
+.stButton > button:active {
+    transform: translateY(0px);
+    box-shadow: 0 4px 15px rgba(0, 196, 255, 0.3);
+}
+
+/* Enhanced Chart Containers */
+.plotly-chart-container {
+    background: var(--glass-bg);
+    backdrop-filter: blur(20px);
+    -webkit-backdrop-filter: blur(20px);
+    border-radius: 20px;
+    overflow: hidden;
+    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
+    padding: 1.5rem;
+    margin: 1.5rem 0;
+    border: 1px solid var(--glass-border);
+    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
+    position: relative;
+}
+
+.plotly-chart-container::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 2px;
+    background: var(--wave-gradient);
+}
+
+.plotly-chart-container:hover {
+    box-shadow: 0 16px 50px rgba(0, 0, 0, 0.3);
+    transform: translateY(-4px);
+}
+
+/* Enhanced DataFrames */
+.stDataFrame {
+    border-radius: 16px;
+    overflow: hidden;
+    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
+    background: var(--glass-bg);
+    backdrop-filter: blur(15px);
+    -webkit-backdrop-filter: blur(15px);
+    border: 1px solid var(--glass-border);
+}
+
+/* Enhanced Messages */
+.stSuccess {
+    background: rgba(127, 219, 218, 0.1);
+    backdrop-filter: blur(10px);
+    -webkit-backdrop-filter: blur(10px);
+    border-left: 4px solid #7FDBDA;
+    border-radius: 12px;
+    color: var(--text-primary);
+}
+
+.stError {
+    background: rgba(255, 107, 107, 0.1);
+    backdrop-filter: blur(10px);
+    -webkit-backdrop-filter: blur(10px);
+    border-left: 4px solid #FF6B6B;
+    border-radius: 12px;
+    color: var(--text-primary);
+}
+
+.stWarning {
+    background: rgba(255, 193, 7, 0.1);
+    backdrop-filter: blur(10px);
+    -webkit-backdrop-filter: blur(10px);
+    border-left: 4px solid #FFC107;
+    border-radius: 12px;
+    color: var(--text-primary);
+}
+
+.stInfo {
+    background: var(--glass-bg);
+    backdrop-filter: blur(10px);
+    -webkit-backdrop-filter: blur(10px);
+    border-left: 4px solid var(--text-accent);
+    border-radius: 12px;
+    color: var(--text-primary);
+}
+
+/* Enhanced Input Elements */
+.stSelectbox > div > div,
+.stSlider > div,
+.stNumberInput > div {
+    background: var(--glass-bg);
+    backdrop-filter: blur(10px);
+    -webkit-backdrop-filter: blur(10px);
+    border-radius: 12px;
+    border: 1px solid var(--glass-border);
+}
+
+/* Floating Elements Animation */
+@keyframes float {
+    0%, 100% { transform: translateY(0px); }
+    50% { transform: translateY(-10px); }
+}
+
+.floating {
+    animation: float 3s ease-in-out infinite;
+}
+
+/* Pulse Animation for Interactive Elements */
+@keyframes pulse {
+    0% { box-shadow: 0 0 0 0 rgba(0, 196, 255, 0.4); }
+    70% { box-shadow: 0 0 0 10px rgba(0, 196, 255, 0); }
+    100% { box-shadow: 0 0 0 0 rgba(0, 196, 255, 0); }
+}
+
+.pulse {
+    animation: pulse 2s infinite;
+}
+
+/* Responsive Design */
+@media (max-width: 768px) {
+    .tidetrace-title {
+        font-size: 2.5rem;
+    }
+    
+    .card-container {
+        padding: 1.5rem;
+        margin-bottom: 1.5rem;
+    }
+    
+    .sub-header {
+        font-size: 1.5rem;
+        padding: 1rem 1.5rem;
+    }
+}
+
+/* Custom Scrollbar */
+::-webkit-scrollbar {
+    width: 8px;
+}
+
+::-webkit-scrollbar-track {
+    background: rgba(11, 20, 38, 0.3);
+}
+
+::-webkit-scrollbar-thumb {
+    background: var(--wave-gradient);
+    border-radius: 4px;
+}
+
+::-webkit-scrollbar-thumb:hover {
+    background: linear-gradient(45deg, #00C4FF, #7FDBDA);
+}
+
+/* Text Styling */
+h1, h2, h3, h4, h5, h6 {
+    color: var(--text-primary) !important;
+}
+
+p, span, div {
+    color: var(--text-secondary) !important;
+}
+
+.metric-label {
+    color: var(--text-muted) !important;
+}
+
+.metric-value {
+    color: var(--text-primary) !important;
+    font-weight: 600 !important;
+}
+</style>
+
+<script>
+// Enhanced navbar scroll behavior
+document.addEventListener('DOMContentLoaded', function() {
+    let lastScrollTop = 0;
+    let ticking = false;
+    
+    function updateNavbar() {
+        const navbar = document.querySelector('.tidetrace-navbar');
+        const scrollTop = window.pageYOffset || document.documentElement.scrollTop;
+        
+        if (scrollTop > lastScrollTop && scrollTop > 100) {
+            if (navbar) {
+                navbar.classList.add('hidden');
+            }
+        } else {
+            if (navbar) {
+                navbar.classList.remove('hidden');
+            }
+        }
+        
+        lastScrollTop = scrollTop;
+        ticking = false;
+    }
+    
+    function requestTick() {
+        if (!ticking) {
+            requestAnimationFrame(updateNavbar);
+            ticking = true;
+        }
+    }
+    
+    window.addEventListener('scroll', requestTick);
+    
+    // Add floating animation to cards
+    setTimeout(() => {
+        const cards = document.querySelectorAll('.card-container');
+        cards.forEach((card, index) => {
+            setTimeout(() => {
+                card.style.animationDelay = `${index * 0.1}s`;
+                card.classList.add('floating');
+            }, index * 100);
+        });
+    }, 1000);
+});
+</script>
+"""
+
+# Enhanced Plotly theme with ocean colors
+PLOTLY_THEME = {
+    "layout": {
+        "plot_bgcolor": "rgba(255, 255, 255, 0.05)",
+        "paper_bgcolor": "rgba(255, 255, 255, 0.05)",
+        "font": {"family": "Poppins, sans-serif", "color": "#F8FFFE", "size": 12},
+        "xaxis": {
+            "gridcolor": "rgba(255, 255, 255, 0.1)",
+            "linecolor": "rgba(255, 255, 255, 0.2)",
+            "tickcolor": "rgba(255, 255, 255, 0.2)",
+            "titlefont": {"color": "#F8FFFE"}
+        },
+        "yaxis": {
+            "gridcolor": "rgba(255, 255, 255, 0.1)",
+            "linecolor": "rgba(255, 255, 255, 0.2)",
+            "tickcolor": "rgba(255, 255, 255, 0.2)",
+            "titlefont": {"color": "#F8FFFE"}
+        },
+        "colorway": ["#00C4FF", "#7FDBDA", "#4A90E2", "#FF6B6B", "#2E4F99", "#1B2951"]
+    }
+}
+
+
+@lru_cache(maxsize=None)
+def plotly_express():
+    """``plotly.express`` with the TideTrace template registered and set as its default."""
+    import plotly.express as px
+    import plotly.io as pio
+
+    pio.templates[TEMPLATE_NAME] = PLOTLY_THEME
+    px.defaults.template = TEMPLATE_NAME
+    return px
@@ -0,0 +1,105 @@
+"""Vectorized decoding of CF ``<unit> since <epoch>`` time coordinates."""
+import re
+
+import numpy as np
+
+DEFAULT_UNITS = 'days since 1770-01-01 00:00:00'
+MISSING = -1
+
+UNIT_SECONDS = {
+    'day': 86400, 'days': 86400, 'd': 86400,
+    'hour': 3600, 'hours': 3600, 'hr': 3600, 'hrs': 3600, 'h': 3600,
+    'minute': 60, 'minutes': 60, 'min': 60, 'mins': 60,
+    'second': 1, 'seconds': 1, 'sec': 1, 'secs': 1, 's': 1,
+}
+GREGORIAN_CALENDARS = ('standard', 'gregorian', 'proleptic_gregorian')
+
+_UNITS_PATTERN = re.compile(
+    r'^\s*(?P<unit>\w+)\s+since\s+'
+    r'(?P<date>[+-]?\d{1,4}-\d{1,2}-\d{1,2})'
+    r'(?:[ T](?P<time>\d{1,2}:\d{1,2}(?::\d{1,2}(?:\.\d+)?)?))?'
+    r'\s*(?:Z|UTC|GMT|[+-]00:?00)?\s*$',
+    re.IGNORECASE,
+)
+
+
+def parse_cf_units(units: str) -> tuple:
+    """Split a CF time ``units`` string into (seconds per unit, epoch as datetime64[s])."""
+    match = _UNITS_PATTERN.match(units or '')
+    if match is None:
+        raise ValueError(f"Unsupported CF time units: {units!r}")
+    unit = match.group('unit').lower()
+    if unit not in UNIT_SECONDS:
+        raise ValueError(f"Unsupported CF time unit {unit!r} in {units!r}")
+
+    year, month, day = (int(part) for part in match.group('date').split('-'))
+    epoch = np.datetime64(f'{year:04d}-{month:02d}-{day:02d}', 's')
+    if match.group('time'):
+        fields = match.group('time').split(':') + ['0']
+        epoch += np.timedelta64(int(fields[0]) * 3600 + int(fields[1]) * 60 + int(float(fields[2])), 's')
+    return UNIT_SECONDS[unit], epoch
+
+
+def decode_times(values: np.ndarray, units: str = DEFAULT_UNITS, calendar: str = 'standard') -> np.ndarray:
+    """Convert numeric CF times to ``datetime64[s]``; NaN values become NaT."""
+    if (calendar or 'standard').lower() not in GREGORIAN_CALENDARS:
+        raise ValueError(f"Unsupported calendar {calendar!r}; only Gregorian calendars are decoded.")
+    seconds_per_unit, epoch = parse_cf_units(units)
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.isfinite(values)
+    offsets = np.zeros(values.shape, dtype=np.int64)
+    offsets[valid] = np.round(values[valid] * seconds_per_unit).astype(np.int64)
+    times = epoch + offsets.astype('timedelta64[s]')
+    times[~valid] = np.datetime64('NaT')
+    return times
+
+
+def civil_from_days(days: np.ndarray) -> tuple:
+    """Proleptic Gregorian (year, month, day, day_of_year) from days since 1970-01-01.
+
+    Integer-only arithmetic (Hinnant's ``civil_from_days``), which is several
+    times faster than casting ``datetime64`` arrays to year and month units.
+    """
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    day_of_march_year = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * day_of_march_year + 2) // 153
+    day = day_of_march_year - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+    day_of_year = np.where(month <= 2, day_of_march_year - 305, day_of_march_year + 60 + leap)
+    return year, month, day, day_of_year
+
+
+def time_parts(times: np.ndarray) -> dict:
+    """Integer ``year``/``month``/``decade``/``day_of_year`` columns; NaT rows hold ``MISSING``."""
+    days = times.astype('datetime64[D]').view(np.int64)
+    valid = ~np.isnat(times)
+    first = int(days.min(where=valid, initial=np.iinfo(np.int64).max)) if valid.any() else 0
+    last = int(days.max(where=valid, initial=np.iinfo(np.int64).min)) if valid.any() else 0
+    span = last - first + 1
+    if span < len(days):
+        # Observation dates cover far fewer distinct days than rows: decode the
+        # calendar once per day in range and gather.
+        index = np.where(valid, days - first, 0)
+        days = np.arange(first, last + 1, dtype=np.int64)
+    else:
+        index = None
+        days = np.where(valid, days, 0)
+
+    year, month, _, day_of_year = civil_from_days(days)
+    parts = {
+        'year': year.astype(np.int16),
+        'month': month.astype(np.int8),
+        'decade': (year // 10 * 10).astype(np.int16),
+        'day_of_year': day_of_year.astype(np.int16),
+    }
+    for name, column in parts.items():
+        if index is not None:
+            column = np.take(column, index)
+        column[~valid] = MISSING
+        parts[name] = column
+    return parts
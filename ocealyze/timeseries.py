@@ -0,0 +1,177 @@
+"""Yearly and monthly means over every observation, re-aggregated per region and depth band.
+
+Each file is streamed once in a worker process into sparse partials. These
+are counts, sums and sums of squares per (1° cell, depth band, year, month),
+reduced with ``np.bincount`` on flattened indices. Picking a region or depth
+band then only selects and sums the stored cells, so no data is reread.
+Regions are matched on cell centres, to the resolution of the partials.
+
+Trends are ordinary least squares fits to the yearly means (or deseasonalized
+monthly means), computed in closed form from the sums of x, y, x², xy and y².
+Their confidence intervals use the t distribution with n - 2 degrees of
+freedom. They describe the series of means, not the individual observations,
+which are strongly correlated within a year.
+"""
+import numpy as np
+
+from ocealyze.climatology import MONTHS, GridAccumulator, horizontal_cells
+from ocealyze.handles import open_dataset
+from ocealyze.prediction import grid_centers
+from ocealyze.ragged import OBSERVED_VARIABLES, aligned_chunks, decode_time_parts
+from ocealyze.reports import DEPTH_ZONE_EDGES, depth_zone_index
+from ocealyze.sampling import CHUNK_ELEMENTS, netcdf_chunks, read_column
+from ocealyze.spatial import region_mask
+
+SERIES_RESOLUTION = 1.0
+# Bumped whenever the partials change meaning, so stored ones are rebuilt.
+SERIES_VERSION = 2
+FIRST_YEAR = 1700
+N_YEARS = 400
+CONFIDENCE = 0.95
+
+
+class SeriesPartials:
+    """Per-variable accumulators keyed by horizontal cell, depth band, year and month."""
+
+    def __init__(self, variables=OBSERVED_VARIABLES, resolution: float = SERIES_RESOLUTION,
+                 band_edges=DEPTH_ZONE_EDGES):
+        self.variables = tuple(variables)
+        self.resolution = float(resolution)
+        self.band_edges = np.asarray(band_edges, dtype=np.float64)
+        self.grids = {name: GridAccumulator() for name in self.variables}
+
+    @property
+    def n_bands(self) -> int:
+        return len(self.band_edges) - 1
+
+    def depth_bands(self, depth: np.ndarray) -> np.ndarray:
+        """Band index per depth, closed at the bottom like the depth tab's zones; -1 outside the bands."""
+        return depth_zone_index(depth, self.band_edges)
+
+    def update(self, name: str, horizontal: np.ndarray, band: np.ndarray, year: np.ndarray, month: np.ndarray,
+               values: np.ndarray):
+        year_index = year.astype(np.int64) - FIRST_YEAR
+        keep = ((horizontal >= 0) & (band >= 0) & (year_index >= 0) & (year_index < N_YEARS) & (month >= 1)
+                & np.isfinite(values))
+        cells = ((horizontal[keep] * self.n_bands + band[keep]) * N_YEARS + year_index[keep]) * MONTHS
+        self.grids[name].update(cells + (month[keep] - 1), values[keep])
+
+    def merge(self, other: 'SeriesPartials'):
+        for name, grid in other.grids.items():
+            self.grids[name].merge(grid)
+
+    def compact(self):
+        for grid in self.grids.values():
+            grid.compact()
+
+    def monthly(self, name: str, bounds: tuple = None, band: int = None) -> dict:
+        """``(years, 12)`` counts, sums and sums of squares over a region and/or depth band."""
+        grid = self.grids[name]
+        grid.compact()
+        cells = grid.cells
+        period = cells % (N_YEARS * MONTHS)
+        selected = np.ones(len(cells), dtype=bool)
+        if band is not None:
+            selected &= (cells // (N_YEARS * MONTHS)) % self.n_bands == band
+        if bounds is not None:
+            lat, lon = grid_centers(self.resolution)
+            horizontal = cells // (N_YEARS * MONTHS * self.n_bands)
+            selected &= region_mask(lat[horizontal // len(lon)], lon[horizontal % len(lon)], bounds)
+
+        def reduce(values):
+            return np.bincount(period[selected], weights=values[selected], minlength=N_YEARS * MONTHS)
+
+        counts, sums, squares = reduce(grid.counts), reduce(grid.sums), reduce(grid.squares)
+        present = np.flatnonzero(counts.reshape(N_YEARS, MONTHS).sum(axis=1))
+        span = slice(present[0], present[-1] + 1) if len(present) else slice(0, 0)
+        return {
+            'years': np.arange(N_YEARS)[span] + FIRST_YEAR,
+            'count': np.rint(counts).astype(np.int64).reshape(N_YEARS, MONTHS)[span],
+            'sum': sums.reshape(N_YEARS, MONTHS)[span],
+            'sum_squares': squares.reshape(N_YEARS, MONTHS)[span],
+        }
+
+
+def series_file(file_path: str, variables=OBSERVED_VARIABLES, resolution: float = SERIES_RESOLUTION,
+                chunk_size: int = CHUNK_ELEMENTS) -> SeriesPartials:
+    """Stream one WOD file into time-series partials."""
+    partials = SeriesPartials(variables, resolution)
+    with open_dataset(file_path) as dataset:
+        if 'z' not in dataset.variables or 'time' not in dataset.variables:
+            return partials
+        horizontal = horizontal_cells(read_column(dataset.variables['lat']), read_column(dataset.variables['lon']),
+                                      resolution)
+        parts = decode_time_parts(dataset, read_column(dataset.variables['time'], np.float64))
+        bands = np.concatenate(
+            [partials.depth_bands(chunk) for chunk in netcdf_chunks(dataset.variables['z'], chunk_size)]
+            or [np.zeros(0, dtype=np.int8)]
+        )
+        for name in variables:
+            if name not in dataset.variables or f'{name}_row_size' not in dataset.variables:
+                continue
+            for cast, z_row, values in aligned_chunks(dataset, name, chunk_size):
+                partials.update(name, horizontal[cast], bands[z_row], parts['year'][cast], parts['month'][cast],
+                                values)
+    partials.compact()
+    return partials
+
+
+def period_means(monthly: dict) -> dict:
+    """Yearly means and the mean seasonal cycle from ``SeriesPartials.monthly``."""
+    def moments(count, total, squares):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            std = np.sqrt(np.maximum(squares / count - mean * mean, 0.0))
+        return mean, std
+
+    count, total, squares = monthly['count'], monthly['sum'], monthly['sum_squares']
+    year_count = count.sum(axis=1)
+    year_mean, year_std = moments(year_count, total.sum(axis=1), squares.sum(axis=1))
+    month_count = count.sum(axis=0)
+    month_mean, month_std = moments(month_count, total.sum(axis=0), squares.sum(axis=0))
+    cell_mean, _ = moments(count, total, squares)
+    return {
+        'years': monthly['years'], 'year_count': year_count, 'year_mean': year_mean, 'year_std': year_std,
+        'month_count': month_count, 'month_mean': month_mean, 'month_std': month_std,
+        # Monthly means minus the mean seasonal cycle, NaN for months without data.
+        'anomaly': cell_mean - month_mean,
+    }
+
+
+def linear_trend(x: np.ndarray, y: np.ndarray, confidence: float = CONFIDENCE) -> dict:
+    """Least squares line through finite ``(x, y)`` with a ``confidence`` interval on the slope; None below 3 points."""
+    from scipy import stats
+
+    keep = np.isfinite(x) & np.isfinite(y)
+    x, y = np.asarray(x, dtype=np.float64)[keep], np.asarray(y, dtype=np.float64)[keep]
+    n = len(x)
+    if n < 3:
+        return None
+    # Centre x first: sums of squared calendar years lose precision.
+    origin = x[0]
+    x = x - origin
+    sx, sy, sxx, sxy, syy = x.sum(), y.sum(), (x * x).sum(), (x * y).sum(), (y * y).sum()
+    x_spread = sxx - sx * sx / n
+    if x_spread <= 0:
+        return None
+    covariance = sxy - sx * sy / n
+    y_spread = syy - sy * sy / n
+    slope = covariance / x_spread
+    intercept = (sy - slope * sx) / n
+    residual = np.sqrt(max(y_spread - slope * covariance, 0.0) / (n - 2))
+    stderr = residual / np.sqrt(x_spread)
+    t = stats.t.ppf((1 + confidence) / 2, n - 2)
+    return {
+        'n': n, 'slope': slope, 'intercept': intercept - slope * origin, 'stderr': stderr,
+        'low': slope - t * stderr, 'high': slope + t * stderr, 'confidence': confidence,
+        'r2': covariance * covariance / (x_spread * y_spread) if y_spread > 0 else 0.0,
+        'p_value': 2 * stats.t.sf(abs(slope / stderr), n - 2) if stderr > 0 else 0.0,
+        'x_mean': origin + sx / n, 'x_spread': x_spread, 'residual_std': residual, 't': t,
+    }
+
+
+def trend_band(trend: dict, x: np.ndarray) -> tuple:
+    """Fitted line and its confidence band for the mean at ``x``."""
+    fitted = trend['intercept'] + trend['slope'] * x
+    half = trend['t'] * trend['residual_std'] * np.sqrt(1 / trend['n'] + (x - trend['x_mean']) ** 2 / trend['x_spread'])
+    return fitted, fitted - half, fitted + half
@@ -0,0 +1,104 @@
+"""Rule-based water-mass labelling in temperature-salinity space.
+
+A rule is a dict with a ``name`` and either T/S ranges or a T-S polygon:
+
+* ``t_min``/``t_max``/``s_min``/``s_max`` bounds (missing or NaN means
+  unbounded), compared strictly unless ``inclusive`` is true;
+* ``polygon``: (salinity, temperature) vertices, tested with the even-odd rule.
+
+Rules are evaluated in order with ``np.select`` chunk by chunk, so the first
+matching rule wins and rows matching none fall into ``OTHER``. Labels are
+small integer codes into ``categories(rules)``, with ``MISSING`` where
+temperature or salinity is absent. ``label_dataset`` labels a WOD file's depth
+rows straight from its ragged arrays, without an observation table.
+"""
+import netCDF4 as nc
+import numpy as np
+
+from ocealyze.geometry import points_in_polygon
+from ocealyze.ragged import ObservationTable, aligned_columns
+
+OTHER = '🌐 Other'
+MISSING = -1
+CHUNK_ROWS = 1 << 20
+
+DEFAULT_RULES = (
+    {'name': '🌴 Tropical', 't_min': 20.0, 's_min': 34.0, 's_max': 36.0},
+    {'name': '🧊 Polar', 't_max': 5.0, 's_min': 34.0},
+    {'name': '🌊 Temperate', 't_min': 5.0, 't_max': 20.0, 's_min': 33.0, 's_max': 35.0, 'inclusive': True},
+)
+
+
+def parse_polygon(text: str) -> list:
+    """``"S,T; S,T; ..."`` as a list of (salinity, temperature) vertices; at least three are required."""
+    vertices = []
+    for vertex in text.split(';'):
+        if not vertex.strip():
+            continue
+        parts = vertex.split(',')
+        try:
+            point = [float(part) for part in parts]
+        except ValueError:
+            raise ValueError(f"Polygon vertex {vertex.strip()!r} is not a pair of numbers") from None
+        if len(point) != 2 or not np.all(np.isfinite(point)):
+            raise ValueError(f"Polygon vertex {vertex.strip()!r} must be two finite numbers 'S,T'")
+        vertices.append(point)
+    if len(vertices) < 3:
+        raise ValueError(f"A polygon needs at least three vertices, got {len(vertices)}")
+    return vertices
+
+
+def categories(rules) -> list:
+    return [rule['name'] for rule in rules] + [OTHER]
+
+
+def _bounded(rule: dict, key: str) -> bool:
+    value = rule.get(key)
+    return value is not None and not np.isnan(value)
+
+
+def rule_mask(rule: dict, temperature: np.ndarray, salinity: np.ndarray) -> np.ndarray:
+    if rule.get('polygon'):
+        return points_in_polygon(salinity, temperature, rule['polygon'])
+
+    inclusive = bool(rule.get('inclusive', False))
+    mask = np.ones(temperature.shape, dtype=bool)
+    for values, low, high in ((temperature, 't_min', 't_max'), (salinity, 's_min', 's_max')):
+        if _bounded(rule, low):
+            mask &= values >= rule[low] if inclusive else values > rule[low]
+        if _bounded(rule, high):
+            mask &= values <= rule[high] if inclusive else values < rule[high]
+    return mask
+
+
+def classify(temperature: np.ndarray, salinity: np.ndarray, rules=DEFAULT_RULES) -> np.ndarray:
+    """Code of the first matching rule per row, ``len(rules)`` for ``OTHER``."""
+    codes = np.select(
+        [rule_mask(rule, temperature, salinity) for rule in rules], np.arange(len(rules), dtype=np.int8),
+        default=np.int8(len(rules))
+    ).astype(np.int8)
+    codes[~(np.isfinite(temperature) & np.isfinite(salinity))] = MISSING
+    return codes
+
+
+def label_water_masses(table: ObservationTable, out: np.ndarray, rules=DEFAULT_RULES,
+                       chunk_size: int = CHUNK_ROWS):
+    for start in range(0, len(table), chunk_size):
+        stop = min(start + chunk_size, len(table))
+        out[start:stop] = classify(table['Temperature'][start:stop], table['Salinity'][start:stop], rules)
+
+
+def label_dataset(dataset: nc.Dataset, out: np.ndarray, rules=DEFAULT_RULES, chunk_size: int = CHUNK_ROWS):
+    """Write the code of every depth row of a file into ``out``."""
+    out[:] = MISSING
+    for _, z_row, values in aligned_columns(dataset, ('Temperature', 'Salinity'), chunk_size=chunk_size):
+        out[z_row] = classify(values[:, 0], values[:, 1], rules)
+
+
+def category_counts(codes: np.ndarray, n_categories: int, chunk_size: int = CHUNK_ROWS) -> np.ndarray:
+    """Rows per category code, ignoring ``MISSING``."""
+    counts = np.zeros(n_categories + 1, dtype=np.int64)
+    for start in range(0, len(codes), chunk_size):
+        counts += np.bincount(np.asarray(codes[start:start + chunk_size], dtype=np.int64) + 1,
+                              minlength=n_categories + 1)
+    return counts[1:]
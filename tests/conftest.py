@@ -0,0 +1,74 @@
+"""Small WOD contiguous ragged-array files written directly with netCDF4.
+
+``write_wod`` returns the raw arrays it wrote, so tests can rebuild the
+expected per-observation rows with a plain per-cast loop.
+"""
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+UNITS = 'days since 1770-01-01 00:00:00'
+VARIABLES = ('Temperature', 'Salinity', 'Oxygen')
+
+
+def write_wod(path, n_casts: int = 60, seed: int = 0, chunk: int = None) -> dict:
+    rng = np.random.default_rng(seed)
+    z_sizes = rng.integers(0, 25, n_casts)
+    sizes = {
+        'z': z_sizes,
+        'Temperature': np.where(rng.random(n_casts) < 0.8, z_sizes, 0),
+        'Salinity': np.where(rng.random(n_casts) < 0.7, z_sizes, 0),
+        # Bottle casts that stop short of the deepest CTD levels.
+        'Oxygen': np.where(rng.random(n_casts) < 0.5, np.maximum(z_sizes - rng.integers(0, 4, n_casts), 0), 0),
+    }
+    lat = rng.uniform(-80, 80, n_casts)
+    lon = rng.uniform(-180, 180, n_casts)
+    time = rng.uniform(150 * 365, 250 * 365, n_casts)
+    time[rng.random(n_casts) < 0.1] = np.nan
+    # Depths are unique row numbers (plus 0.5), so sampled rows can be traced back to their source row.
+    values = {'z': np.arange(z_sizes.sum()) + 0.5}
+    for name in VARIABLES:
+        data = rng.normal(10, 5, int(sizes[name].sum()))
+        data[rng.random(len(data)) < 0.05] = np.nan
+        values[name] = data
+
+    with nc.Dataset(path, 'w') as dataset:
+        dataset.createDimension('casts', n_casts)
+        for name, counts in sizes.items():
+            dataset.createDimension(f'{name}_obs', int(counts.sum()))
+
+        def variable(name, dtype, dimension):
+            chunking = {'chunksizes': (chunk,)} if chunk and len(dataset.dimensions[dimension]) else {}
+            return dataset.createVariable(name, dtype, (dimension,), fill_value=nc.default_fillvals[dtype],
+                                          zlib=True, **chunking)
+
+        variable('lat', 'f4', 'casts')[:] = lat
+        variable('lon', 'f4', 'casts')[:] = lon
+        time_variable = variable('time', 'f8', 'casts')
+        time_variable.units = UNITS
+        time_variable.calendar = 'gregorian'
+        time_variable[:] = np.ma.masked_invalid(time)
+        for name, counts in sizes.items():
+            variable(f'{name}_row_size', 'i4', 'casts')[:] = counts
+            variable(name, 'f4', f'{name}_obs')[:] = np.ma.masked_invalid(values[name])
+    return {'sizes': sizes, 'values': values, 'lat': lat, 'lon': lon, 'time': time}
+
+
+def expected_rows(raw: dict) -> dict:
+    """Per-observation rows of a ``write_wod`` file, built cast by cast."""
+    rows = {name: [] for name in ('cast', 'z') + VARIABLES}
+    offsets = {name: np.concatenate(([0], np.cumsum(counts)[:-1])) for name, counts in raw['sizes'].items()}
+    for cast, levels in enumerate(raw['sizes']['z']):
+        for level in range(levels):
+            rows['cast'].append(cast)
+            rows['z'].append(raw['values']['z'][offsets['z'][cast] + level])
+            for name in VARIABLES:
+                have = level < raw['sizes'][name][cast]
+                rows[name].append(raw['values'][name][offsets[name][cast] + level] if have else np.nan)
+    return {name: np.asarray(values) for name, values in rows.items()}
+
+
+@pytest.fixture
+def wod(tmp_path):
+    path = str(tmp_path / 'wod.nc')
+    return path, write_wod(path)
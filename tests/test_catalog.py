@@ -0,0 +1,175 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import expected_rows, write_wod
+from ocealyze.catalog import CATALOG_FILE, Catalog
+from ocealyze.clustering import CLUSTER_FEATURES
+from ocealyze.watermass import MISSING, classify
+
+
+@pytest.fixture
+def tree(tmp_path):
+    data = tmp_path / 'data'
+    raws = []
+    for index, name in enumerate(['north/a.nc', 'south/a.nc', 'b.nc']):
+        path = data / name
+        os.makedirs(path.parent, exist_ok=True)
+        raws.append(write_wod(str(path), n_casts=40, seed=index))
+    return str(data), str(tmp_path / 'cache'), raws
+
+
+def observed(raws, name, bounds=None):
+    """Every value of ``name`` from a per-cast loop, optionally inside ``bounds``."""
+    values = []
+    for raw in raws:
+        offset = 0
+        for cast, size in enumerate(raw['sizes'][name]):
+            lat, lon = np.float32(raw['lat'][cast]), np.float32(raw['lon'][cast])
+            if bounds is None or (bounds[0] <= lat <= bounds[1] and bounds[2] <= lon <= bounds[3]):
+                values.extend(raw['values'][name][offset:offset + size])
+            offset += size
+    values = np.asarray(values, dtype=np.float32).astype(np.float64)
+    return values[np.isfinite(values)]
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_summary_over_a_directory_matches_every_value(tree, max_workers):
+    data, cache, raws = tree
+    catalog = Catalog.scan(data, max_workers=max_workers, root=cache)
+    assert len(catalog.files) == 3
+    assert os.path.exists(os.path.join(cache, CATALOG_FILE))
+
+    values = observed(raws, 'Temperature')
+    summary = catalog.summarize('Temperature').to_dict()
+    assert summary['count'] == len(values)
+    assert summary['mean'] == pytest.approx(values.mean())
+    assert summary['std'] == pytest.approx(values.std())
+    assert (summary['min'], summary['max']) == (values.min(), values.max())
+    assert catalog.summarize('Temperature').to_dict() == summary
+
+
+def test_histogram_over_a_region_matches_np_histogram(tree):
+    data, cache, raws = tree
+    catalog = Catalog.scan(data, max_workers=1, root=cache)
+    bounds = (-40, 60, -120, 90)
+    values = observed(raws, 'Salinity', bounds)
+    counts, edges = catalog.histogram('Salinity', bins=30, bounds=bounds)
+    expected, expected_edges = np.histogram(values, bins=30)
+    np.testing.assert_allclose(edges, expected_edges)
+    np.testing.assert_array_equal(counts, expected)
+
+    fixed = np.array([-5.0, 0, 5, 10, 15, 30])
+    counts, _ = catalog.histogram('Salinity', edges=fixed, bounds=bounds)
+    np.testing.assert_array_equal(counts, np.histogram(values, bins=fixed)[0])
+
+
+def test_rescan_reuses_the_index_and_picks_up_changes(tree):
+    data, cache, raws = tree
+    first = Catalog.scan(data, max_workers=1, root=cache)
+    again = Catalog.scan(data, max_workers=1, root=cache)
+    assert again.fingerprint() == first.fingerprint()
+
+    # Pooled handles hold HDF5's file lock: replace the file rather than rewriting it in place.
+    staging = os.path.join(os.path.dirname(data), 'b.nc')
+    raws[2] = write_wod(staging, n_casts=10, seed=9)
+    os.replace(staging, os.path.join(data, 'b.nc'))
+    changed = Catalog.scan(data, max_workers=1, root=cache)
+    assert changed.fingerprint() != first.fingerprint()
+    assert changed.metadata()['total_casts'] == 90
+    assert changed.summarize('Oxygen').moments.count == len(observed(raws, 'Oxygen'))
+
+
+def test_select_prunes_files_outside_the_region(tree):
+    data, cache, _ = tree
+    catalog = Catalog.scan(data, max_workers=1, root=cache)
+    assert catalog.select((85, 89, 0, 10)) == []
+    assert len(catalog.select((-90, 90, -180, 180))) == 3
+
+
+def test_table_uses_the_scan_root(tree):
+    data, cache, raws = tree
+    catalog = Catalog.scan(data, max_workers=1, root=cache)
+    table = catalog.table(('Temperature',))
+    assert len(table) == sum(raw['sizes']['z'].sum() for raw in raws)
+    assert not os.path.exists(os.path.join(data, '.ocealyze-cache'))
+    assert len([name for name in os.listdir(cache) if name.startswith('a-')]) == 2
+
+
+def expected_region_rows(raw, bounds=None):
+    """``expected_rows`` of a file, restricted to casts inside ``bounds``."""
+    expected = expected_rows(raw)
+    if bounds is None:
+        return expected
+    lat, lon = raw['lat'].astype(np.float32), raw['lon'].astype(np.float32)
+    inside = (lat >= bounds[0]) & (lat <= bounds[1]) & (lon >= bounds[2]) & (lon <= bounds[3])
+    keep = inside[expected['cast']]
+    return {name: values[keep] for name, values in expected.items()}
+
+
+@pytest.mark.parametrize('bounds', [None, (-40, 60, -120, 90)])
+def test_kmeans_streams_every_observation(tree, bounds):
+    data, cache, raws = tree
+    catalog = Catalog.scan(data, max_workers=2, root=cache)
+    scaler, kmeans = catalog.fit_kmeans(3, bounds=bounds, chunk_size=64, epochs=2, seed=0)
+    counts, means = catalog.clusters(scaler, kmeans, {'k': 3}, bounds=bounds)
+
+    rows = []
+    for raw in raws:
+        expected = expected_region_rows(raw, bounds)
+        X = np.column_stack([expected[name] for name in CLUSTER_FEATURES]).astype(np.float32)
+        rows.append(X[np.isfinite(X).all(axis=1)].astype(np.float64))
+    X = np.concatenate(rows)
+    labels = kmeans.predict(scaler.transform(X))
+    # Every complete row is counted, not only those a sampled table would keep.
+    table = catalog.table(bounds=bounds, max_observations=200, seed=0)
+    assert counts.sum() == len(X) > len(table.valid_rows(*CLUSTER_FEATURES))
+    np.testing.assert_array_equal(counts, np.bincount(labels, minlength=3))
+    for cluster in range(3):
+        np.testing.assert_allclose(means[:, cluster], X[labels == cluster].mean(axis=0), rtol=1e-6)
+
+    # The second query is served from the aggregates and the per-file label columns.
+    again, _ = catalog.clusters(scaler, kmeans, {'k': 3}, bounds=bounds)
+    np.testing.assert_array_equal(again, counts)
+
+
+@pytest.mark.parametrize('bounds', [None, (-40, 60, -120, 90)])
+def test_water_masses_count_every_observation(tree, bounds):
+    data, cache, raws = tree
+    catalog = Catalog.scan(data, max_workers=2, root=cache)
+    rules = [{'name': 'warm', 't_min': 10.0}, {'name': 'salty', 's_min': 10.0}]
+    counts = catalog.water_masses(rules, bounds)
+
+    codes = []
+    for raw in raws:
+        expected = expected_region_rows(raw, bounds)
+        codes.append(classify(expected['Temperature'].astype(np.float32), expected['Salinity'].astype(np.float32), rules))
+    codes = np.concatenate(codes)
+    np.testing.assert_array_equal(counts, np.bincount(codes[codes != MISSING], minlength=3))
+    table = catalog.table(bounds=bounds, max_observations=200, seed=0)
+    assert counts.sum() > len(table.valid_rows('Temperature', 'Salinity'))
+    np.testing.assert_array_equal(catalog.water_masses(rules, bounds), counts)
+
+
+@pytest.mark.parametrize('bounds', [None, (-40, 60, -120, 90)])
+def test_depth_profile_covers_more_rows_than_the_table_budget(tmp_path, bounds):
+    path = str(tmp_path / 'wod.nc')
+    raw = write_wod(path, n_casts=300, seed=4, chunk=64)
+    catalog = Catalog.scan(path, max_workers=1, root=str(tmp_path / 'cache'))
+    budget = 500
+    assert raw['sizes']['z'].sum() > budget
+    assert len(catalog.table(bounds=bounds, max_observations=budget, seed=0)) <= budget
+
+    edges = np.arange(0.0, 4001.0, 250.0)
+    profile = catalog.depth_profile('Temperature', edges, clip_to_range=True, bounds=bounds).to_dict()
+    expected = expected_region_rows(raw, bounds)
+    depth = expected['z'].astype(np.float32).astype(np.float64)
+    values = expected['Temperature'].astype(np.float32).astype(np.float64)
+    plausible = np.isfinite(values) & (values >= -3) & (values <= 40)
+    counts, _ = np.histogram(depth[plausible], bins=edges)
+    np.testing.assert_array_equal(profile['count'], counts)
+    assert profile['count'].sum() > budget
+    for index in np.flatnonzero(counts):
+        selected = values[plausible & (depth >= edges[index]) & (depth < edges[index + 1])]
+        assert profile['mean'][index] == pytest.approx(selected.mean())
@@ -0,0 +1,40 @@
+import json
+import os
+
+import pandas as pd
+
+from conftest import write_wod
+from ocealyze.cli import find_files, main, output_names
+
+
+def test_output_names_are_paths_below_the_common_directory(tmp_path):
+    data = tmp_path / 'data'
+    for name in ('north/a.nc', 'south/a.nc', 'b.nc'):
+        os.makedirs((data / name).parent, exist_ok=True)
+        (data / name).touch()
+    files = find_files([str(data)])
+    assert sorted(output_names([str(data)], files).values()) == ['b', 'north/a', 'south/a']
+
+    listed = [str(data / 'north/a.nc'), str(data / 'south/a.nc')]
+    assert sorted(output_names(listed, find_files(listed + listed[:1])).values()) == ['north/a', 'south/a']
+    assert list(output_names([listed[0]], [listed[0]]).values()) == ['a']
+
+
+def test_files_with_the_same_name_get_their_own_outputs(tmp_path):
+    data = tmp_path / 'data'
+    for seed, name in enumerate(('north/a.nc', 'south/a.nc')):
+        os.makedirs((data / name).parent, exist_ok=True)
+        write_wod(str(data / name), n_casts=30, seed=seed)
+    output, cache = tmp_path / 'out', tmp_path / 'cache'
+
+    status = main([str(data), '-o', str(output), '--workers', '1', '--clusters', '0', '--no-models',
+                   '--max-observations', '500', '--cache-dir', str(cache)])
+    assert status == 0
+    counts = [pd.read_csv(output / name / 'summary.csv')['Total_Measurements'].tolist()
+              for name in ('north/a', 'south/a')]
+    assert counts[0] != counts[1]
+    runs = json.loads((output / 'runs.json').read_text())['runs']
+    assert len(runs) == 2 and all('error' not in run for run in runs)
+    # Aggregates and decoded tables go to the shared cache, not next to the data.
+    assert (cache / 'aggregates').is_dir()
+    assert not (data / 'north' / '.ocealyze-cache').exists()
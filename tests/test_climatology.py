@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from conftest import VARIABLES, expected_rows
+from ocealyze.catalog import Catalog
+from ocealyze.climatology import (ClimatologyGrid, climatology_levels, climatology_map, grid_file,
+                                  horizontal_cells, write_climatology)
+from ocealyze.profiles import standard_depth_edges
+
+RESOLUTION = 10.0
+
+
+def dense_grid(raw: dict, name: str) -> tuple:
+    """Counts, sums and sums of squares on (month, depth, lat, lon), accumulated with ``np.add.at``."""
+    rows = expected_rows(raw)
+    cast = rows['cast']
+    times = np.datetime64('1770-01-01', 's') + np.round(np.nan_to_num(raw['time']) * 86400).astype('timedelta64[s]')
+    month = times.astype('datetime64[M]').astype(np.int64) % 12
+    edges = standard_depth_edges()
+    level = np.searchsorted(edges, rows['z'].astype(np.float32), side='right') - 1
+    lat = raw['lat'].astype(np.float32)[cast].astype(np.float64)
+    lon = raw['lon'].astype(np.float32)[cast].astype(np.float64)
+    values = rows[name].astype(np.float32).astype(np.float64)
+    keep = np.isfinite(values) & np.isfinite(raw['time'][cast]) & (level < len(edges) - 1)
+    index = (month[cast][keep], level[keep], ((lat[keep] + 90) // RESOLUTION).astype(int),
+             ((lon[keep] + 180) // RESOLUTION).astype(int))
+    shape = (12, len(edges) - 1, 18, 36)
+    counts, sums, squares = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    np.add.at(counts, index, 1)
+    np.add.at(sums, index, values[keep])
+    np.add.at(squares, index, values[keep] ** 2)
+    return counts, sums, squares
+
+
+def test_horizontal_cells():
+    cells = horizontal_cells(np.array([-90.0, 0.0, 89.9, np.nan]), np.array([-180.0, 5.0, 179.9, 0.0]), RESOLUTION)
+    np.testing.assert_array_equal(cells, [0, 9 * 36 + 18, 17 * 36 + 35, -1])
+
+
+def test_written_climatology_matches_dense_accumulation(wod, tmp_path):
+    path, raw = wod
+    climatology = grid_file(path, RESOLUTION, chunk_size=100)
+    output = str(tmp_path / 'climatology.nc')
+    write_climatology(climatology, output, {'source': 'test'})
+
+    levels = climatology_levels(output)
+    assert levels['resolution'] == RESOLUTION
+    assert levels['variables'] == sorted(VARIABLES)
+    for name in VARIABLES:
+        counts, sums, squares = dense_grid(raw, name)
+        assert climatology.observations()[name] == counts.sum()
+        for depth_index in np.unique(np.nonzero(counts)[1])[:4]:
+            for month in (None, *np.unique(np.nonzero(counts[:, depth_index])[0] + 1)[:3]):
+                index = slice(None) if month is None else month - 1
+                count = counts[index, depth_index].reshape(-1, 18, 36).sum(axis=0)
+                total = sums[index, depth_index].reshape(-1, 18, 36).sum(axis=0)
+                square = squares[index, depth_index].reshape(-1, 18, 36).sum(axis=0)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    mean = total / count
+                    std = np.sqrt(np.maximum(square / count - mean * mean, 0))
+                written = climatology_map(output, name, depth_index, month)
+                np.testing.assert_array_equal(written['count'], count)
+                np.testing.assert_allclose(written['mean'], mean, rtol=1e-5, equal_nan=True)
+                np.testing.assert_allclose(written['std'], std, rtol=1e-3, atol=1e-4, equal_nan=True)
+
+
+def test_partials_merge_and_catalog_writes_once(wod, tmp_path):
+    path, _ = wod
+    whole = grid_file(path, RESOLUTION)
+    merged = ClimatologyGrid(RESOLUTION)
+    merged.merge(grid_file(path, RESOLUTION, chunk_size=50))
+    merged.merge(ClimatologyGrid(RESOLUTION))
+    merged.compact()
+    for name in VARIABLES:
+        np.testing.assert_array_equal(merged.grids[name].cells, whole.grids[name].cells)
+        np.testing.assert_allclose(merged.grids[name].sums, whole.grids[name].sums)
+
+    catalog = Catalog.scan(path, max_workers=1, root=str(tmp_path / 'cache'))
+    assert catalog.climatology(RESOLUTION, build=False) is None
+    written = catalog.climatology(RESOLUTION)
+    assert catalog.climatology(RESOLUTION, build=False) == written
+
+
+def test_bounds_blank_cells_outside_the_region(wod, tmp_path):
+    path, _ = wod
+    output = str(tmp_path / 'climatology.nc')
+    write_climatology(grid_file(path, RESOLUTION), output)
+    whole = climatology_map(output, 'Temperature', 0)
+    region = climatology_map(output, 'Temperature', 0, bounds=(0, 90, 0, 180))
+    north_east = (whole['lat'][:, None] > 0) & (whole['lon'][None, :] > 0)
+    np.testing.assert_array_equal(region['count'], np.where(north_east, whole['count'], 0))
+    assert pytest.approx(np.nansum(region['mean'])) == np.nansum(np.where(north_east, whole['mean'], np.nan))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from ocealyze.clustering import (CLUSTER_FEATURES, UNLABELLED, assign_labels, cluster_means, fit_kmeans,
+                                 fit_streaming_kmeans, sweep_kmeans)
+from ocealyze.ragged import ObservationTable
+
+CENTRES = np.array([[2.0, 34.0, 6.0], [15.0, 35.5, 4.0], [28.0, 36.5, 2.0]])
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(0)
+    truth = rng.integers(0, 3, 6000)
+    X = (CENTRES[truth] + rng.normal(0, 0.2, (6000, 3))).astype(np.float32)
+    X[rng.random(6000) < 0.05, 2] = np.nan
+    columns = {'cast': np.repeat(np.arange(600), 10)}
+    columns.update({name: X[:, i] for i, name in enumerate(CLUSTER_FEATURES)})
+    sizes = np.full(600, 10)
+    return ObservationTable(columns, {}, np.arange(600) * 10, sizes), truth
+
+
+def test_streaming_kmeans_recovers_separated_clusters(table):
+    table, truth = table
+    scaler, kmeans = fit_streaming_kmeans(table, 3, chunk_size=500, epochs=2, seed=0)
+    labels = np.empty(len(table), dtype=np.int8)
+    assign_labels(table, scaler, kmeans, labels, chunk_size=700)
+
+    missing = ~np.isfinite(table['Oxygen'])
+    assert np.all(labels[missing] == UNLABELLED)
+    # Every true cluster maps onto exactly one fitted cluster.
+    for cluster in range(3):
+        assert len(np.unique(labels[(truth == cluster) & ~missing])) == 1
+    assert len(np.unique(labels[~missing])) == 3
+
+    counts, means = cluster_means(table, labels, 3, chunk_size=333)
+    for cluster in range(3):
+        rows = (labels == cluster)
+        assert counts[cluster] == rows.sum()
+        for i, name in enumerate(CLUSTER_FEATURES):
+            assert means[i, cluster] == pytest.approx(np.asarray(table[name][rows], dtype=np.float64).mean())
+
+
+def test_streaming_kmeans_needs_complete_rows():
+    columns = {'cast': np.zeros(4, dtype=np.int64)}
+    columns.update({name: np.full(4, np.nan, dtype=np.float32) for name in CLUSTER_FEATURES})
+    table = ObservationTable(columns, {}, np.array([0]), np.array([4]))
+    with pytest.raises(ValueError):
+        fit_streaming_kmeans(table, 2)
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_sweep_matches_individual_fits(max_workers):
+    rng = np.random.default_rng(1)
+    X = CENTRES[rng.integers(0, 3, 400)] + rng.normal(0, 0.2, (400, 3))
+    results = sweep_kmeans(X, [2, 3, 4, 1000], n_init=2, seed=0, max_workers=max_workers)
+    # Counts above the number of rows are skipped.
+    assert len(results) == 3
+    for k, (kmeans, inertia, silhouette) in zip([2, 3, 4], results):
+        _, expected_inertia, expected_silhouette = fit_kmeans(X, k, n_init=2, seed=0)
+        assert kmeans.n_clusters == k
+        assert inertia == pytest.approx(expected_inertia)
+        assert silhouette == pytest.approx(expected_silhouette)
+    silhouettes = [silhouette for _, _, silhouette in results]
+    assert np.argmax(silhouettes) == 1
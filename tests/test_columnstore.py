@@ -0,0 +1,85 @@
+import netCDF4 as nc
+import numpy as np
+
+from conftest import VARIABLES, write_wod
+from ocealyze.columnstore import (cached_column, cached_observation_table, is_table_cached, load_observation_table,
+                                  load_table, save_table, table_dir, table_options)
+from ocealyze.ragged import build_observation_table
+
+
+def assert_tables_equal(left, right):
+    assert set(left.columns) == set(right.columns)
+    for name in left.columns:
+        np.testing.assert_array_equal(left[name], right[name])
+    for name in left.casts:
+        np.testing.assert_array_equal(left.casts[name], right.casts[name])
+    np.testing.assert_array_equal(left.offsets, right.offsets)
+    np.testing.assert_array_equal(left.sizes, right.sizes)
+
+
+def test_save_and_load_round_trip(wod, tmp_path):
+    path, _ = wod
+    with nc.Dataset(path) as dataset:
+        table = build_observation_table(dataset)
+    directory = str(tmp_path / 'cache' / 'table')
+    save_table(table, directory, {'variables': list(VARIABLES)})
+    loaded = load_table(directory)
+    assert isinstance(loaded['z'], np.memmap)
+    assert_tables_equal(loaded, table)
+    assert load_table(str(tmp_path / 'cache' / 'missing')) is None
+
+
+def test_observation_table_is_built_once_then_served_from_the_cache(wod, tmp_path):
+    path, _ = wod
+    root = str(tmp_path / 'cache')
+    options = table_options(VARIABLES)
+    builds = []
+
+    def build():
+        builds.append(1)
+        with nc.Dataset(path) as dataset:
+            return build_observation_table(dataset, VARIABLES)
+
+    assert not is_table_cached(path, VARIABLES, root=root)
+    first = cached_observation_table(path, build, options, root)
+    second = cached_observation_table(path, build, options, root)
+    assert len(builds) == 1
+    assert is_table_cached(path, VARIABLES, root=root)
+    assert_tables_equal(first, second)
+    assert_tables_equal(load_observation_table(path, VARIABLES, root=root), second)
+
+
+def test_sampled_tables_are_cached_separately(wod, tmp_path):
+    path, _ = wod
+    root = str(tmp_path / 'cache')
+    full = load_observation_table(path, root=root)
+    sampled = load_observation_table(path, sample_size=100, seed=3, root=root)
+    assert len(sampled) == 100 < len(full)
+    assert is_table_cached(path, sample_size=100, seed=3, root=root)
+    assert not is_table_cached(path, sample_size=100, seed=4, root=root)
+
+
+def test_rewriting_the_file_changes_its_cache_directory(tmp_path):
+    path = str(tmp_path / 'wod.nc')
+    write_wod(path, seed=0)
+    before = table_dir(path, table_options())
+    write_wod(path, seed=1)
+    assert table_dir(path, table_options()) != before
+
+
+def test_cached_column_fills_once_into_a_memmap(tmp_path):
+    root = str(tmp_path / 'cache')
+    calls = []
+
+    def fill(out):
+        calls.append(1)
+        out[:] = np.arange(len(out)) * 2
+
+    first = cached_column(root, 'double', {'n': 50}, 50, np.int32, fill)
+    second = cached_column(root, 'double', {'n': 50}, 50, np.int32, fill)
+    assert len(calls) == 1
+    assert isinstance(second, np.memmap) and second.dtype == np.int32
+    np.testing.assert_array_equal(first, np.arange(50) * 2)
+    np.testing.assert_array_equal(second, first)
+    cached_column(root, 'double', {'n': 51}, 51, np.int32, fill)
+    assert len(calls) == 2
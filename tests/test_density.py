@@ -0,0 +1,32 @@
+import numpy as np
+
+from ocealyze.density import density_cells
+
+
+def test_density_cells_match_a_2d_histogram():
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-90, 90, 20_000)
+    lon = rng.uniform(-180, 180, 20_000)
+    lat[:50] = np.nan
+    lon[50:60] = 180.0
+    lon[60:70] = -180.0
+    cells = density_cells(lat, lon, resolution=5.0)
+
+    valid = np.isfinite(lat)
+    counts, _, _ = np.histogram2d(lat[valid], lon[valid], bins=[np.arange(-90, 91, 5), np.arange(-180, 181, 5)])
+    rows, cols = np.nonzero(counts)
+    np.testing.assert_allclose(cells['lat'], rows * 5 - 87.5)
+    np.testing.assert_allclose(cells['lon'], cols * 5 - 177.5)
+    np.testing.assert_array_equal(cells['count'], counts[rows, cols])
+    assert cells['count'].sum() == valid.sum()
+
+
+def test_density_cells_put_the_antimeridian_in_the_last_column():
+    cells = density_cells(np.array([0.0, 0.0]), np.array([180.0, -180.0]), resolution=2.0)
+    np.testing.assert_allclose(np.sort(cells['lon']), [-179.0, 179.0])
+    np.testing.assert_array_equal(cells['count'], [1, 1])
+
+
+def test_density_cells_of_nothing_are_empty():
+    cells = density_cells(np.array([np.nan]), np.array([0.0]))
+    assert len(cells['lat']) == len(cells['lon']) == len(cells['count']) == 0
@@ -0,0 +1,124 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import write_wod
+from ocealyze import diskcache
+from ocealyze.columnstore import (BYTES_ENV, cache_budget, cached_column, evict_cache, load_observation_table,
+                                  table_dir, table_options)
+from ocealyze.diskcache import DiskCache, spec_key
+
+
+def test_values_are_computed_once_and_shared(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'answer': 42}
+
+    assert DiskCache(str(tmp_path)).get_or_compute({'q': 1}, compute) == {'answer': 42}
+    assert DiskCache(str(tmp_path)).get_or_compute({'q': 1}, compute) == {'answer': 42}
+    array = DiskCache(str(tmp_path)).get_or_compute({'q': 2}, lambda: np.arange(5))
+    assert len(calls) == 1
+    reloaded = DiskCache(str(tmp_path), memory_entries=0).get_or_compute({'q': 2}, None)
+    assert isinstance(reloaded, np.memmap)
+    np.testing.assert_array_equal(reloaded, array)
+
+
+def test_read_only_hits_are_served_not_deleted(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), memory_entries=0)
+    cache.get_or_compute({'q': 1}, lambda: np.arange(3))
+
+    def read_only(path, *args, **kwargs):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(diskcache.os, 'utime', read_only)
+    value = cache.get_or_compute({'q': 1}, lambda: pytest.fail('recomputed a stored value'))
+    np.testing.assert_array_equal(value, np.arange(3))
+    assert os.path.exists(cache.path(spec_key({'q': 1}), diskcache.ARRAY_SUFFIX))
+
+
+def test_corrupt_entries_are_recomputed(tmp_path):
+    cache = DiskCache(str(tmp_path), memory_entries=0)
+    path = cache.path(spec_key({'q': 1}), diskcache.OBJECT_SUFFIX)
+    with open(path, 'wb') as handle:
+        handle.write(b'not a joblib file')
+    assert cache.get_or_compute({'q': 1}, lambda: 'fresh') == 'fresh'
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=3 * (128 * 8 + 128), memory_entries=0)
+    for key in range(5):
+        cache.get_or_compute({'key': key}, lambda: np.zeros(128))
+        # A read refreshes the first entry, so it outlives the later ones.
+        cache.get_or_compute({'key': 0}, None)
+    stored = {name for name in os.listdir(tmp_path) if name.endswith('.npy')}
+    assert spec_key({'key': 0}) + '.npy' in stored
+    assert spec_key({'key': 4}) + '.npy' in stored
+    assert len(stored) < 5
+
+
+def fill(value):
+    def fill_column(out):
+        out[:] = value
+    return fill_column
+
+
+def test_columns_share_the_root_budget(tmp_path):
+    root = str(tmp_path)
+    paths = []
+    for index in range(4):
+        paths.append(cached_column(root, 'column', {'index': index}, 1000, np.float64, fill(index)).filename)
+        os.utime(paths[-1], ns=(index * 10**9, index * 10**9))
+    evict_cache(root, max_bytes=2 * os.path.getsize(paths[0]))
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+
+
+def test_tables_and_columns_are_evicted_by_last_use(wod, tmp_path):
+    path, _ = wod
+    root = str(tmp_path / 'cache')
+    load_observation_table(path, root=root)
+    directory = table_dir(path, table_options(), root)
+    os.utime(os.path.join(directory, 'manifest.json'), ns=(0, 0))
+    column = cached_column(root, 'column', {}, 10, np.int8, fill(1))
+    assert os.path.isdir(directory)
+
+    evict_cache(root, max_bytes=column.nbytes + 1024)
+    assert not os.path.exists(directory)
+    assert os.path.exists(column.filename)
+    # An evicted table is converted again on the next load.
+    assert len(load_observation_table(path, root=root)) > 0
+
+
+def test_stale_and_orphaned_tables_are_deleted(tmp_path):
+    root = str(tmp_path / 'cache')
+    path = str(tmp_path / 'wod.nc')
+    write_wod(path, seed=0)
+    load_observation_table(path, root=root)
+    old = table_dir(path, table_options(), root)
+
+    # Replace the file, as a new download would; the next load converts it again.
+    staging = str(tmp_path / 'new.nc')
+    write_wod(staging, seed=1)
+    os.replace(staging, path)
+    load_observation_table(path, root=root)
+    new = table_dir(path, table_options(), root)
+    assert new != old
+    assert not os.path.exists(old) and os.path.isdir(new)
+
+    other = str(tmp_path / 'other.nc')
+    write_wod(other, seed=2)
+    load_observation_table(other, root=root)
+    orphan = table_dir(other, table_options(), root)
+    os.remove(other)
+    evict_cache(root)
+    assert not os.path.exists(orphan) and os.path.isdir(new)
+    assert not [name for name in os.listdir(root) if name.startswith('.evicted-')]
+
+
+def test_cache_budget_reads_the_environment(monkeypatch):
+    monkeypatch.setenv(BYTES_ENV, '2e9')
+    assert cache_budget() == 2_000_000_000
+    monkeypatch.delenv(BYTES_ENV)
+    assert cache_budget() == 16 << 30
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import write_wod
+from ocealyze.catalog import Catalog, source_fingerprint
+from ocealyze.handles import DatasetPool
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for index in range(3):
+        paths.append(str(tmp_path / f'wod{index}.nc'))
+        write_wod(paths[-1], n_casts=10, seed=index)
+    return paths
+
+
+def test_returned_handles_are_reused(files):
+    pool = DatasetPool()
+    with pool.dataset(files[0]) as first:
+        pass
+    with pool.dataset(files[0]) as second:
+        assert second is first
+        # A concurrent borrower of the same file gets its own handle.
+        with pool.dataset(files[0]) as third:
+            assert third is not second
+    assert pool.open_count() == 2
+    pool.close_all()
+    assert pool.open_count() == 0
+
+
+def test_pool_closes_handles_beyond_its_limit(files):
+    pool = DatasetPool(max_open=2)
+    handles = []
+    for path in files:
+        with pool.dataset(path) as dataset:
+            handles.append(dataset)
+    assert pool.open_count() == 2
+    assert not handles[0].isopen() and handles[2].isopen()
+    pool.close_all()
+
+
+def test_idle_handles_expire(files):
+    pool = DatasetPool(idle_seconds=0)
+    with pool.dataset(files[0]) as first:
+        pass
+    with pool.dataset(files[1]):
+        pass
+    assert not first.isopen()
+    pool.close_all()
+
+
+def test_replaced_files_are_reopened(files, tmp_path):
+    pool = DatasetPool()
+    with pool.dataset(files[0]) as first:
+        old = first.variables['lat'][:]
+    staging = str(tmp_path / 'staging.nc')
+    raw = write_wod(staging, n_casts=12, seed=9)
+    os.replace(staging, files[0])
+    with pool.dataset(files[0]) as second:
+        assert second is not first
+        np.testing.assert_allclose(second.variables['lat'][:], raw['lat'].astype(np.float32))
+    assert len(old) == 10 and not first.isopen()
+    pool.close_all()
+
+
+def test_handles_are_closed_after_a_failed_read(files):
+    pool = DatasetPool()
+    with pytest.raises(KeyError):
+        with pool.dataset(files[0]) as dataset:
+            dataset.variables['missing']
+    assert not dataset.isopen() and pool.open_count() == 0
+
+
+def test_source_fingerprint_matches_a_fresh_scan(files, tmp_path):
+    directory = str(tmp_path)
+    catalog = Catalog.scan(directory, max_workers=1, root=str(tmp_path / 'cache'))
+    assert source_fingerprint(directory) == catalog.fingerprint()
+    before = source_fingerprint(directory)
+    os.utime(files[1], ns=(0, 0))
+    assert source_fingerprint(directory) != before
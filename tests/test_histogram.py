@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from ocealyze.histogram import FILTERS, stream_histogram, value_range
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    data = np.concatenate([rng.normal(5, 3, 10_000), rng.integers(-2, 12, 500).astype(np.float64)])
+    data[rng.random(len(data)) < 0.05] = np.nan
+    return data.astype(np.float32)
+
+
+def chunked(data, size=777):
+    return lambda: (data[start:start + size] for start in range(0, len(data), size))
+
+
+def test_uniform_bins_match_np_histogram(values):
+    counts, edges = stream_histogram(chunked(values), bins=40)
+    finite = values[np.isfinite(values)].astype(np.float64)
+    expected, expected_edges = np.histogram(finite, bins=40)
+    np.testing.assert_allclose(edges, expected_edges)
+    np.testing.assert_array_equal(counts, expected)
+
+
+def test_explicit_non_uniform_edges_match_np_histogram(values):
+    edges = np.array([-10, -1, 0, 0.5, 2, 5, 8, 20])
+    counts, _ = stream_histogram(chunked(values), edges=edges)
+    expected, _ = np.histogram(values[np.isfinite(values)], bins=edges)
+    np.testing.assert_array_equal(counts, expected)
+
+
+def test_right_closed_bins_count_edges_into_the_lower_bin(values):
+    edges = np.arange(-2, 13, 2.0)
+    counts, _ = stream_histogram(chunked(values), edges=edges, right=True)
+    finite = values[np.isfinite(values)].astype(np.float64)
+    expected = [np.sum((finite > low) & (finite <= high)) for low, high in zip(edges[:-1], edges[1:])]
+    # The first bin is closed on both sides.
+    expected[0] += np.sum(finite == edges[0])
+    np.testing.assert_array_equal(counts, expected)
+
+
+def test_positive_filter_drops_zero_and_negative_values(values):
+    keep = FILTERS['positive']
+    counts, edges = stream_histogram(chunked(values), bins=25, keep=keep)
+    positive = values[values > 0].astype(np.float64)
+    expected, expected_edges = np.histogram(positive, bins=25)
+    np.testing.assert_allclose(edges, expected_edges)
+    np.testing.assert_array_equal(counts, expected)
+    assert value_range(chunked(values), keep) == (positive.min(), positive.max())
+
+
+def test_empty_and_constant_sources():
+    counts, edges = stream_histogram(chunked(np.full(10, np.nan)), bins=5)
+    assert counts.sum() == 0 and len(edges) == 6
+    counts, edges = stream_histogram(chunked(np.full(10, 3.0)), bins=5)
+    assert counts.sum() == 10 and edges[0] < 3 < edges[-1]
@@ -0,0 +1,58 @@
+import json
+
+from ocealyze import instrumentation
+from ocealyze.instrumentation import add, cache_miss, collect, configure_log, section, timed
+
+
+def test_counters_reach_every_open_section():
+    with collect() as records:
+        with section('outer', tab='map'):
+            add('rows', 10)
+            with section('inner'):
+                add('rows', 5)
+                add('bytes_read', 20)
+    outer, inner = records
+    assert (outer['section'], inner['section']) == ('outer', 'inner')
+    assert (outer['rows'], inner['rows']) == (15, 5)
+    assert outer['bytes_read'] == inner['bytes_read'] == 20
+    assert inner['parent'] == 'outer' and inner['depth'] == 1
+    assert outer['tab'] == 'map'
+
+
+def test_cached_sections_report_hits_and_misses():
+    store = {}
+
+    @timed('lookup', cached=True)
+    def lookup(key):
+        if key not in store:
+            cache_miss()
+            store[key] = key * 2
+        return store[key]
+
+    with collect() as records:
+        with section('run'):
+            lookup(1)
+            lookup(1)
+    run, miss, hit = records
+    assert (miss['cache'], hit['cache']) == ('miss', 'hit')
+    assert (run['cache_hits'], run['cache_misses']) == (1, 1)
+    assert run['cache'] is None
+
+
+def test_configure_log_writes_json_lines(tmp_path, monkeypatch):
+    monkeypatch.delenv(instrumentation.LOG_ENV, raising=False)
+    assert not configure_log()
+    path = str(tmp_path / 'perf.jsonl')
+    try:
+        assert configure_log(path)
+        assert configure_log(path)
+        with section('logged'):
+            add('rows', 3)
+    finally:
+        for handler in list(instrumentation.LOGGER.handlers):
+            if getattr(handler, 'baseFilename', None) == path:
+                instrumentation.LOGGER.removeHandler(handler)
+                handler.close()
+    lines = open(path).read().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])['rows'] == 3
@@ -0,0 +1,40 @@
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from ocealyze.models import ModelRegistry, estimator_spec
+
+
+def fitted(X, y):
+    return LinearRegression().fit(X, y)
+
+
+def test_models_are_fitted_once_and_shared_through_the_directory(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    y = X @ [1.0, -2.0, 0.5] + 3
+    spec = {'dataset': 'abc', 'model': estimator_spec(LinearRegression())}
+    fits = []
+
+    def fit():
+        fits.append(1)
+        return fitted(X, y)
+
+    first = ModelRegistry(str(tmp_path)).get_or_fit(spec, fit)
+    # A fresh registry, as in another process, finds the stored model.
+    second = ModelRegistry(str(tmp_path)).get_or_fit(spec, fit)
+    assert len(fits) == 1
+    np.testing.assert_allclose(second.coef_, first.coef_)
+    np.testing.assert_allclose(second.predict(X[:5]), y[:5])
+
+    ModelRegistry(str(tmp_path)).get_or_fit(dict(spec, dataset='other'), fit)
+    assert len(fits) == 2
+
+
+def test_registry_evicts_least_recently_used_models(tmp_path):
+    X = np.arange(20, dtype=np.float64).reshape(10, 2)
+    registry = ModelRegistry(str(tmp_path), max_bytes=1, memory_entries=0)
+    registry.get_or_fit({'n': 1}, lambda: fitted(X, X[:, 0]))
+    registry.get_or_fit({'n': 2}, lambda: fitted(X, X[:, 1]))
+    stored = [name for name in sorted(tmp_path.iterdir()) if name.suffix == '.joblib']
+    # Only the model just written survives a budget smaller than any model.
+    assert len(stored) == 1
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from ocealyze.prediction import grid_centers, predict_grid, predict_with_spread
+
+
+@pytest.fixture(scope='module')
+def forest():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(-80, 80, 2000), rng.uniform(-180, 180, 2000), rng.uniform(0, 2000, 2000),
+                         rng.uniform(1950, 2020, 2000)])
+    y = 25 - 0.2 * np.abs(X[:, 0]) - 0.005 * X[:, 2] + rng.normal(0, 0.5, 2000)
+    return RandomForestRegressor(n_estimators=12, max_depth=8, random_state=0).fit(X, y), X
+
+
+@pytest.mark.parametrize('chunk_size, max_workers', [(1 << 16, 1), (97, 3)])
+def test_spread_matches_per_tree_predictions(forest, chunk_size, max_workers):
+    model, X = forest
+    per_tree = np.stack([tree.predict(X.astype(np.float32)) for tree in model.estimators_])
+    mean, std = predict_with_spread(model, X, chunk_size, max_workers)
+    np.testing.assert_allclose(mean, per_tree.mean(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(std, per_tree.std(axis=0), atol=1e-6)
+    np.testing.assert_allclose(mean, model.predict(X), rtol=1e-6)
+
+
+def test_predict_grid_lays_predictions_out_by_lat_and_lon(forest):
+    model, _ = forest
+    grid = predict_grid(model, 10.0, depth=100, year=2000, chunk_size=50)
+    lat, lon = grid_centers(10.0)
+    assert grid['mean'].shape == grid['std'].shape == (len(lat), len(lon)) == (18, 36)
+    point = np.array([[lat[4], lon[7], 100, 2000]])
+    assert grid['mean'][4, 7] == pytest.approx(model.predict(point)[0], rel=1e-5)
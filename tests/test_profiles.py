@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from ocealyze.profiles import (STANDARD_DEPTHS, ProfileAccumulator, depth_profile, standard_depth_edges,
+                               uniform_depth_edges)
+from ocealyze.ragged import ObservationTable
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(0)
+    depth = rng.uniform(0, 1200, 50_000)
+    temperature = 20 * np.exp(-depth / 400) + 2 + rng.normal(0, 1, len(depth))
+    depth[::17] = np.nan
+    temperature[::23] = np.nan
+    columns = {'cast': np.zeros(len(depth), dtype=np.int64), 'z': depth.astype(np.float32),
+               'Temperature': temperature.astype(np.float32)}
+    return ObservationTable(columns, {}, np.array([0]), np.array([len(depth)]))
+
+
+def test_profile_matches_per_bin_numpy(table):
+    edges = uniform_depth_edges(1000, 100)
+    profile = depth_profile(table, 'Temperature', edges, chunk_size=3001).to_dict()
+    depth = np.asarray(table['z'], dtype=np.float64)
+    values = np.asarray(table['Temperature'], dtype=np.float64)
+    width = (40 - -3) / 2048
+    for index, (low, high) in enumerate(zip(edges[:-1], edges[1:])):
+        selected = values[(depth >= low) & (depth < high) & np.isfinite(values)]
+        assert profile['count'][index] == len(selected)
+        assert profile['mean'][index] == pytest.approx(selected.mean())
+        assert profile['std'][index] == pytest.approx(selected.std(), rel=1e-6)
+        for q in (10, 25, 50, 75, 90):
+            assert profile[f'p{q}'][index] == pytest.approx(np.percentile(selected, q), abs=2 * width)
+    np.testing.assert_allclose(profile['depth'], np.arange(50, 1000, 100))
+
+
+def test_accumulators_merge_like_one_pass(table):
+    edges = standard_depth_edges(1000)
+    whole = ProfileAccumulator(edges, (-3, 40))
+    whole.update(table['z'], table['Temperature'])
+    parts = [ProfileAccumulator(edges, (-3, 40)) for _ in range(3)]
+    for part, rows in zip(parts, np.array_split(np.arange(len(table)), 3)):
+        part.update(table['z'][rows], table['Temperature'][rows])
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    np.testing.assert_array_equal(merged.histogram, whole.histogram)
+    np.testing.assert_allclose(merged.sums, whole.sums)
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+
+
+def test_standard_edges_put_one_level_in_each_bin():
+    edges = standard_depth_edges()
+    assert len(edges) == len(STANDARD_DEPTHS) + 1
+    assert np.all((edges[:-1] <= STANDARD_DEPTHS) & (STANDARD_DEPTHS < edges[1:]))
+    assert edges[0] == 0 and np.all(np.diff(edges) > 0)
+    assert len(standard_depth_edges(100)) == np.sum(STANDARD_DEPTHS <= 100) + 1
+
+
+def test_empty_bins_are_nan_and_clipping_drops_outliers(table):
+    edges = uniform_depth_edges(2000, 500)
+    profile = depth_profile(table, 'Temperature', edges, value_range=(5, 10), clip_to_range=True).to_dict()
+    assert profile['count'][-1] == 0 and np.isnan(profile['mean'][-1]) and np.isnan(profile['p50'][-1])
+    assert np.all(profile['p10'][:2] >= 5) and np.all(profile['p90'][:2] <= 10)
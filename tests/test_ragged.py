@@ -0,0 +1,93 @@
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+from conftest import VARIABLES, expected_rows, write_wod
+from ocealyze.ragged import (ObservationTable, aligned_columns, build_observation_table, concat_tables, expand_ranges,
+                             row_offsets)
+
+
+def assert_rows_match(table: ObservationTable, expected: dict, rows: np.ndarray):
+    np.testing.assert_array_equal(table['cast'], expected['cast'][rows])
+    np.testing.assert_allclose(table['z'], expected['z'][rows], rtol=1e-6)
+    for name in VARIABLES:
+        np.testing.assert_allclose(table[name], expected[name][rows].astype(np.float32), rtol=1e-6, equal_nan=True)
+
+
+def test_expand_ranges_matches_concatenated_aranges():
+    starts = np.array([5, 0, 9, 3])
+    lengths = np.array([2, 0, 3, 1])
+    expected = np.concatenate([np.arange(start, start + length) for start, length in zip(starts, lengths)])
+    np.testing.assert_array_equal(expand_ranges(starts, lengths), expected)
+    assert len(expand_ranges(np.array([4]), np.array([0]))) == 0
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_full_table_matches_per_cast_loop(wod, max_workers):
+    path, raw = wod
+    expected = expected_rows(raw)
+    with nc.Dataset(path) as dataset:
+        table = build_observation_table(dataset, max_workers=max_workers)
+
+    assert len(table) == raw['sizes']['z'].sum()
+    assert_rows_match(table, expected, np.arange(len(table)))
+    np.testing.assert_allclose(table['lat'], raw['lat'][expected['cast']].astype(np.float32))
+    np.testing.assert_array_equal(table.sizes, raw['sizes']['z'])
+    np.testing.assert_array_equal(table.offsets, row_offsets(raw['sizes']['z']))
+
+
+@pytest.mark.parametrize('chunk', [None, 16])
+def test_sampled_table_rows_come_from_their_source_rows(tmp_path, chunk):
+    path = str(tmp_path / 'wod.nc')
+    raw = write_wod(path, n_casts=200, seed=3, chunk=chunk)
+    expected = expected_rows(raw)
+    with nc.Dataset(path) as dataset:
+        table = build_observation_table(dataset, sample_size=300, seed=1)
+
+    assert len(table) == 300
+    # Depths are source row numbers plus 0.5.
+    rows = (table['z'] - 0.5).astype(np.int64)
+    assert np.all(np.diff(rows) > 0)
+    assert_rows_match(table, expected, rows)
+    np.testing.assert_array_equal(table.sizes, np.bincount(table['cast'], minlength=len(raw['sizes']['z'])))
+
+
+def test_select_casts_and_concat_keep_rows_aligned(wod):
+    path, raw = wod
+    with nc.Dataset(path) as dataset:
+        table = build_observation_table(dataset)
+    casts = np.flatnonzero(raw['sizes']['z'] > 0)[::3]
+    selected = table.select_casts(casts)
+    np.testing.assert_array_equal(selected['z'], table['z'][table.cast_rows(casts)])
+    np.testing.assert_array_equal(selected.casts['lat'], table.casts['lat'][casts])
+
+    both = concat_tables([table, selected])
+    assert len(both) == len(table) + len(selected)
+    assert both.n_casts == table.n_casts + selected.n_casts
+    np.testing.assert_array_equal(both['cast'][len(table):], selected['cast'] + table.n_casts)
+    np.testing.assert_array_equal(both.cast_rows(np.array([table.n_casts])), np.arange(selected.sizes[0]) + len(table))
+
+
+@pytest.mark.parametrize('shuffle', [False, True])
+def test_aligned_columns_match_the_per_cast_loop(tmp_path, shuffle):
+    path = str(tmp_path / 'wod.nc')
+    raw = write_wod(path, n_casts=120, seed=5, chunk=16)
+    expected = expected_rows(raw)
+    selected = np.random.default_rng(0).random(120) < 0.6
+    order = np.random.default_rng(1).permutation if shuffle else None
+    with nc.Dataset(path) as dataset:
+        chunks = list(aligned_columns(dataset, ('Temperature', 'Oxygen', 'Missing'), selected, chunk_size=40,
+                                      order=order))
+
+    cast = np.concatenate([cast for cast, _, _ in chunks])
+    z_row = np.concatenate([z_row for _, z_row, _ in chunks])
+    values = np.concatenate([values for _, _, values in chunks])
+    rows = np.argsort(z_row)
+    # Rows are those of selected casts that have a temperature level.
+    level = np.arange(len(expected['cast'])) - row_offsets(raw['sizes']['z'])[expected['cast']]
+    have = selected[expected['cast']] & (level < raw['sizes']['Temperature'][expected['cast']])
+    np.testing.assert_array_equal(z_row[rows], np.flatnonzero(have))
+    np.testing.assert_array_equal(cast[rows], expected['cast'][have])
+    for i, name in enumerate(('Temperature', 'Oxygen')):
+        np.testing.assert_allclose(values[rows, i], expected[name][have].astype(np.float32), equal_nan=True)
+    assert np.isnan(values[:, 2]).all()
@@ -0,0 +1,54 @@
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+from conftest import write_wod
+from ocealyze import sampling
+from ocealyze.sampling import netcdf_chunks, read_column, read_indices, sample_indices
+
+
+@pytest.mark.parametrize('block', [None, 64])
+def test_sample_indices_are_sorted_distinct_and_in_range(block):
+    indices = sample_indices(100_000, 500, seed=7, block=block)
+    assert len(indices) == 500
+    assert np.all(np.diff(indices) > 0)
+    assert indices[0] >= 0 and indices[-1] < 100_000
+    np.testing.assert_array_equal(indices, sample_indices(100_000, 500, seed=7, block=block))
+
+
+def test_sample_indices_returns_everything_when_size_covers_population():
+    np.testing.assert_array_equal(sample_indices(10, 50, seed=0), np.arange(10))
+    np.testing.assert_array_equal(sample_indices(10, None), np.arange(10))
+
+
+def test_block_sample_keeps_inclusion_probability_uniform():
+    hits = np.zeros(4096)
+    for seed in range(200):
+        hits[sample_indices(4096, 256, seed=seed, block=32, min_blocks=16)] += 1
+    # Every index is expected 200 * 256 / 4096 = 12.5 times; whole-block halves should agree closely.
+    assert abs(hits[:2048].mean() - hits[2048:].mean()) < 1.0
+    assert abs(hits.mean() - 12.5) < 1e-9
+
+
+@pytest.mark.parametrize('chunk', [None, 7, 64])
+def test_read_indices_matches_fancy_indexing(tmp_path, chunk, monkeypatch):
+    path = str(tmp_path / 'wod.nc')
+    write_wod(path, n_casts=120, seed=2, chunk=chunk)
+    # Small runs force several slices per read.
+    monkeypatch.setattr(sampling, 'MAX_RUN_ELEMENTS', 32)
+    with nc.Dataset(path) as dataset:
+        variable = dataset.variables['Temperature']
+        full = read_column(variable)
+        indices = np.sort(np.random.default_rng(0).choice(len(full), 200, replace=False))
+        np.testing.assert_array_equal(read_indices(variable, indices), full[indices])
+        assert len(read_indices(variable, indices[:0])) == 0
+
+
+def test_netcdf_chunks_cover_the_variable_in_order(tmp_path):
+    path = str(tmp_path / 'wod.nc')
+    write_wod(path, n_casts=80, seed=4, chunk=16)
+    with nc.Dataset(path) as dataset:
+        variable = dataset.variables['Salinity']
+        chunks = list(netcdf_chunks(variable, chunk_size=40))
+        assert all(len(chunk) == 32 for chunk in chunks[:-1])
+        np.testing.assert_array_equal(np.concatenate(chunks), read_column(variable))
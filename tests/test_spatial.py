@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from ocealyze.geometry import points_in_polygon
+from ocealyze.spatial import GridIndex, region_mask
+
+
+@pytest.fixture
+def positions():
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-90, 90, 5000)
+    lon = rng.uniform(-180, 180, 5000)
+    # Casts sitting exactly on the grid and antimeridian edges.
+    lat[:8] = [0, 10, -90, 90, 45, -45, 20, 60]
+    lon[:8] = [180, 180, -180, 180, -180, 0, 170, 180]
+    lat[8:20] = np.nan
+    return lat, lon
+
+
+@pytest.mark.parametrize('resolution', [1.0, 2.5, 0.7])
+@pytest.mark.parametrize('bounds', [
+    (-30, 30, -60, 60),
+    (-10, 90, 0, 180),
+    (0, 20, 170, 180),
+    (-90, 90, -180, 180),
+    (-90, 90, -180, -170),
+    (40, 70, 170, -170),
+    (-50, 50, 180, -175),
+    (-90, 90, 179.5, -180),
+    (-0.5, 0.5, -1, 1),
+])
+def test_query_bbox_matches_region_mask(positions, resolution, bounds):
+    lat, lon = positions
+    index = GridIndex(lat, lon, resolution)
+    expected = np.flatnonzero(region_mask(lat, lon, bounds))
+    np.testing.assert_array_equal(index.query_bbox(*bounds), expected)
+
+
+def test_edge_longitude_casts_are_found(positions):
+    lat, lon = positions
+    index = GridIndex(lat, lon)
+    assert {0, 1, 3, 7} <= set(index.query_bbox(-10, 90, 0, 180))
+    assert {2, 4} <= set(index.query_bbox(-90, 90, -180, -179))
+
+
+def test_query_polygon_matches_points_in_polygon(positions):
+    lat, lon = positions
+    index = GridIndex(lat, lon, 2.0)
+    vertices = np.array([[100, -20], [180, -20], [180, 40], [140, 60], [120, 10]])
+    valid = np.isfinite(lat)
+    expected = np.flatnonzero(valid & points_in_polygon(lon, lat, vertices))
+    np.testing.assert_array_equal(index.query_polygon(vertices), expected)
+
+
+def test_points_in_polygon_on_a_square():
+    square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    x = np.array([5, -1, 11, 5, 0.5, 9.5])
+    y = np.array([5, 5, 5, -3, 9.5, 0.5])
+    np.testing.assert_array_equal(points_in_polygon(x, y, square), [True, False, False, False, True, True])
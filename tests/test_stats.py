@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from ocealyze.stats import QuantileSketch, RunningMoments, StreamingSummary, summarize
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    # A large offset makes the naive sum-of-squares variance lose precision.
+    return rng.normal(1e6, 2.0, 60_000)
+
+
+def test_running_moments_merge_matches_numpy(values):
+    parts = []
+    for chunk in np.array_split(values, 17):
+        moments = RunningMoments()
+        for piece in np.array_split(chunk, 3):
+            moments.update(piece)
+        parts.append(moments)
+    merged = RunningMoments()
+    for moments in parts:
+        merged.merge(moments)
+    merged.merge(RunningMoments())
+
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert merged.variance == pytest.approx(values.var(), rel=1e-9)
+    assert (merged.min, merged.max) == (values.min(), values.max())
+    assert np.isnan(RunningMoments().variance)
+
+
+def rank_error(sorted_values, estimate, q):
+    return abs(np.searchsorted(sorted_values, estimate) / len(sorted_values) - q)
+
+
+def test_quantile_sketch_merges_stay_within_rank_error(values):
+    qs = np.array([0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+    sketches = []
+    for seed, chunk in enumerate(np.array_split(values, 9)):
+        sketch = QuantileSketch(k=256, seed=seed)
+        for piece in np.array_split(chunk, 5):
+            sketch.update(piece)
+        sketches.append(sketch)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+
+    assert merged.count == len(values)
+    assert sum(len(level) for level in merged.levels) < len(values) / 20
+    ordered = np.sort(values)
+    for q, estimate in zip(qs, merged.quantiles(qs)):
+        assert rank_error(ordered, estimate, q) < 0.02
+
+
+def test_small_sketches_are_exact():
+    sketch = QuantileSketch(k=2048)
+    sketch.update(np.arange(1, 101, dtype=np.float64))
+    np.testing.assert_array_equal(sketch.quantiles([0.25, 0.5, 1.0]), [25, 50, 100])
+    assert np.isnan(QuantileSketch().quantiles([0.5])).all()
+
+
+def test_summarize_matches_numpy_over_filtered_chunks():
+    rng = np.random.default_rng(1)
+    data = rng.normal(0, 1, 5000)
+    data[::11] = np.nan
+    summary = summarize(lambda: iter(np.array_split(data, 13)), keep=lambda chunk: chunk > 0).to_dict()
+    kept = data[data > 0]
+    assert summary['count'] == len(kept)
+    assert summary['mean'] == pytest.approx(kept.mean())
+    assert summary['std'] == pytest.approx(kept.std())
+    assert (summary['min'], summary['max']) == (kept.min(), kept.max())
+    assert summary['median'] == pytest.approx(np.median(kept), abs=0.01)
+    assert summary['p25'] <= summary['median'] <= summary['p75']
+
+
+def test_empty_summary_is_nan():
+    summary = StreamingSummary().to_dict()
+    assert summary['count'] == 0
+    assert np.isnan(summary['mean']) and np.isnan(summary['min']) and np.isnan(summary['median'])
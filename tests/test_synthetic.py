@@ -0,0 +1,33 @@
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+from ocealyze.ragged import build_observation_table
+from ocealyze.synthetic import write_synthetic_wod
+
+
+@pytest.mark.parametrize('block_observations, chunk_size', [(1 << 22, None), (500, 256)])
+def test_synthetic_file_has_the_requested_layout(tmp_path, block_observations, chunk_size):
+    path = str(tmp_path / 'synthetic.nc')
+    dimensions = write_synthetic_wod(path, 5000, seed=1, chunk_size=chunk_size, block_observations=block_observations)
+    assert dimensions['z_obs'] == 5000
+
+    with nc.Dataset(path) as dataset:
+        assert len(dataset.dimensions['casts']) == dimensions['casts']
+        z_sizes = dataset.variables['z_row_size'][:]
+        assert z_sizes.sum() == 5000
+        for name in ('Temperature', 'Salinity', 'Oxygen'):
+            sizes = dataset.variables[f'{name}_row_size'][:]
+            assert np.all(sizes <= z_sizes)
+            assert sizes.sum() == len(dataset.dimensions[f'{name}_obs']) == dimensions[f'{name}_obs']
+        table = build_observation_table(dataset)
+
+    assert len(table) == 5000
+    depth = np.asarray(table['z'])
+    assert np.all(depth >= 0)
+    # Depths increase down every cast.
+    same_cast = np.diff(table['cast']) == 0
+    assert np.all(np.diff(depth)[same_cast] > 0)
+    temperature = table['Temperature']
+    assert 0.5 < np.isfinite(temperature).mean() < 1
+    assert np.nanmin(temperature) > -5 and np.nanmax(temperature) < 40
@@ -0,0 +1,61 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from ocealyze.timecodec import MISSING, civil_from_days, decode_times, parse_cf_units, time_parts
+
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def test_civil_from_days_matches_datetime():
+    days = np.concatenate([np.arange(-200_000, 200_000, 97), [-719162, 0, 59, 60, 11016, 2932896]])
+    year, month, day, day_of_year = civil_from_days(days)
+    for index, offset in enumerate(days):
+        date = EPOCH + datetime.timedelta(days=int(offset))
+        assert (year[index], month[index], day[index]) == (date.year, date.month, date.day)
+        assert day_of_year[index] == date.timetuple().tm_yday
+
+
+@pytest.mark.parametrize('units, seconds, epoch', [
+    ('days since 1770-01-01 00:00:00', 86400, '1770-01-01T00:00:00'),
+    ('hours since 1900-1-1', 3600, '1900-01-01T00:00:00'),
+    ('seconds since 2000-01-01T12:30:15Z', 1, '2000-01-01T12:30:15'),
+    ('Minutes since 1950-06-15 06:00', 60, '1950-06-15T06:00:00'),
+])
+def test_parse_cf_units(units, seconds, epoch):
+    assert parse_cf_units(units) == (seconds, np.datetime64(epoch, 's'))
+
+
+@pytest.mark.parametrize('units', ['days after 1770-01-01', 'fortnights since 1770-01-01', '', None])
+def test_parse_cf_units_rejects_unsupported_units(units):
+    with pytest.raises(ValueError):
+        parse_cf_units(units)
+
+
+def test_decode_times_maps_nan_to_nat():
+    times = decode_times(np.array([0.0, 1.5, np.nan, 73048.25]), 'days since 1770-01-01 00:00:00')
+    expected = np.array(['1770-01-01T00:00:00', '1770-01-02T12:00:00', 'NaT', '1970-01-01T06:00:00'],
+                        dtype='datetime64[s]')
+    np.testing.assert_array_equal(times, expected)
+    with pytest.raises(ValueError):
+        decode_times(np.zeros(2), calendar='noleap')
+
+
+@pytest.mark.parametrize('spread_days', [30, 100_000])
+def test_time_parts_match_datetime_and_mark_nat_missing(spread_days):
+    rng = np.random.default_rng(0)
+    # A narrow span takes the decode-per-day path, a wide one decodes every row.
+    days = rng.integers(-spread_days, spread_days, 1000) + 5000
+    times = days.astype('datetime64[D]').astype('datetime64[s]') + rng.integers(0, 86400, 1000).astype('timedelta64[s]')
+    times[::7] = np.datetime64('NaT')
+    parts = time_parts(times)
+    for index, time in enumerate(times):
+        if np.isnat(time):
+            assert parts['year'][index] == parts['month'][index] == parts['decade'][index] == MISSING
+            continue
+        date = time.astype(datetime.datetime).date()
+        assert parts['year'][index] == date.year
+        assert parts['month'][index] == date.month
+        assert parts['decade'][index] == date.year // 10 * 10
+        assert parts['day_of_year'][index] == date.timetuple().tm_yday
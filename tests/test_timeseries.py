@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from conftest import expected_rows, write_wod
+from ocealyze.catalog import Catalog
+from ocealyze.reports import DEPTH_ZONE_EDGES, depth_zone_index
+from ocealyze.timeseries import FIRST_YEAR, SeriesPartials, linear_trend, period_means, series_file, trend_band
+
+
+def test_linear_trend_matches_linregress():
+    rng = np.random.default_rng(0)
+    years = np.arange(1900, 2021, dtype=np.float64)
+    means = 10 + 0.012 * (years - 1900) + rng.normal(0, 0.3, len(years))
+    means[::9] = np.nan
+    trend = linear_trend(years, means)
+    keep = np.isfinite(means)
+    expected = stats.linregress(years[keep], means[keep])
+    assert trend['n'] == keep.sum()
+    assert trend['slope'] == pytest.approx(expected.slope, rel=1e-9)
+    assert trend['intercept'] == pytest.approx(expected.intercept, rel=1e-9)
+    assert trend['stderr'] == pytest.approx(expected.stderr, rel=1e-9)
+    assert trend['r2'] == pytest.approx(expected.rvalue ** 2, rel=1e-9)
+    assert trend['p_value'] == pytest.approx(expected.pvalue, rel=1e-6, abs=1e-300)
+    t = stats.t.ppf(0.975, keep.sum() - 2)
+    assert (trend['low'], trend['high']) == pytest.approx((expected.slope - t * expected.stderr,
+                                                          expected.slope + t * expected.stderr))
+
+    fitted, low, high = trend_band(trend, years)
+    np.testing.assert_allclose(fitted, expected.intercept + expected.slope * years)
+    assert np.all(low < fitted) and np.all(fitted < high)
+
+
+def test_linear_trend_needs_three_distinct_points():
+    assert linear_trend(np.array([1.0, 2.0]), np.array([1.0, 2.0])) is None
+    assert linear_trend(np.array([5.0, 5.0, 5.0]), np.array([1.0, 2.0, 3.0])) is None
+
+
+def test_depth_bands_follow_the_depth_tab_zones():
+    depth = np.array([-1, 0, 0.5, 50, 50.5, 200, 1000, 4000, 4000.5, 11000, np.nan])
+    np.testing.assert_array_equal(depth_zone_index(depth), [-1, -1, 0, 0, 1, 1, 2, 3, 4, 4, -1])
+    np.testing.assert_array_equal(SeriesPartials().depth_bands(depth), depth_zone_index(depth))
+
+    # Each band holds exactly the depths the zone histogram counts.
+    rng = np.random.default_rng(0)
+    depth = np.concatenate([rng.uniform(0, 6000, 5000), DEPTH_ZONE_EDGES[:-1], [0.0] * 3])
+    positive = depth[depth > 0]
+    expected = [np.sum((positive > low) & (positive <= high))
+                for low, high in zip(DEPTH_ZONE_EDGES[:-1], DEPTH_ZONE_EDGES[1:])]
+    zones = depth_zone_index(depth)
+    np.testing.assert_array_equal(np.bincount(zones[zones >= 0], minlength=5), expected)
+
+
+def brute_force_monthly(raw: dict, name: str, bounds=None, band=None) -> pd.DataFrame:
+    rows = expected_rows(raw)
+    cast = rows['cast']
+    times = np.datetime64('1770-01-01', 's') + np.round(np.nan_to_num(raw['time']) * 86400).astype('timedelta64[s]')
+    frame = pd.DataFrame({
+        'year': times.astype('datetime64[Y]').astype(np.int64)[cast] + 1970,
+        'month': times.astype('datetime64[M]').astype(np.int64)[cast] % 12 + 1,
+        'value': rows[name].astype(np.float32).astype(np.float64),
+        'zone': depth_zone_index(rows['z'].astype(np.float32)),
+        'dated': np.isfinite(raw['time'])[cast],
+        # Regions are matched on the centres of the 1° cells.
+        'lat': np.floor(raw['lat'].astype(np.float32)[cast]) + 0.5,
+        'lon': np.floor(raw['lon'].astype(np.float32)[cast]) + 0.5,
+    })
+    frame = frame[frame['dated'] & frame['value'].notna() & (frame['zone'] >= 0)]
+    if band is not None:
+        frame = frame[frame['zone'] == band]
+    if bounds is not None:
+        frame = frame[frame['lat'].between(bounds[0], bounds[1]) & frame['lon'].between(bounds[2], bounds[3])]
+    return frame.groupby(['year', 'month'])['value'].agg(['count', 'sum'])
+
+
+@pytest.mark.parametrize('bounds, band', [(None, None), ((-40, 40, -90, 120), None), (None, 1), ((0, 80, -180, 0), 0)])
+def test_monthly_partials_match_a_groupby(wod, bounds, band):
+    path, raw = wod
+    partials = series_file(path, chunk_size=64)
+    monthly = partials.monthly('Temperature', bounds, band)
+    expected = brute_force_monthly(raw, 'Temperature', bounds, band)
+    years = monthly['years']
+    assert years[0] == expected.index.get_level_values('year').min()
+    assert years[-1] == expected.index.get_level_values('year').max()
+    for (year, month), row in expected.iterrows():
+        assert monthly['count'][year - years[0], month - 1] == row['count']
+        assert monthly['sum'][year - years[0], month - 1] == pytest.approx(row['sum'])
+    assert monthly['count'].sum() == expected['count'].sum()
+
+    means = period_means(monthly)
+    yearly = expected.groupby('year').sum()
+    dated = means['year_count'] > 0
+    np.testing.assert_array_equal(means['years'][dated], yearly.index)
+    np.testing.assert_allclose(means['year_mean'][dated], yearly['sum'] / yearly['count'])
+
+
+def test_catalog_partials_merge_files(tmp_path):
+    raws = []
+    for index in range(2):
+        raws.append(write_wod(str(tmp_path / f'wod{index}.nc'), seed=index))
+    catalog = Catalog.scan(str(tmp_path), max_workers=1, root=str(tmp_path / 'cache'))
+    merged = catalog.series_partials(('Salinity',)).monthly('Salinity')
+    total = sum(brute_force_monthly(raw, 'Salinity')['count'].sum() for raw in raws)
+    assert merged['count'].sum() == total
+    assert merged['years'][0] >= FIRST_YEAR
@@ -0,0 +1,84 @@
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+from conftest import expected_rows, write_wod
+from ocealyze.ragged import ObservationTable
+from ocealyze.watermass import (DEFAULT_RULES, MISSING, OTHER, categories, category_counts, classify, label_dataset,
+                                label_water_masses, parse_polygon)
+
+# write_wod draws every variable around 10, so these split its rows.
+FILE_RULES = [{'name': 'warm', 't_min': 10.0}, {'name': 'salty', 's_min': 10.0}]
+
+
+def classify_one(t, s, rules):
+    """First matching rule for one observation, written out as plain comparisons."""
+    if not (np.isfinite(t) and np.isfinite(s)):
+        return MISSING
+    for code, rule in enumerate(rules):
+        inclusive = rule.get('inclusive', False)
+        inside = True
+        for value, low, high in ((t, 't_min', 't_max'), (s, 's_min', 's_max')):
+            if low in rule:
+                inside &= value >= rule[low] if inclusive else value > rule[low]
+            if high in rule:
+                inside &= value <= rule[high] if inclusive else value < rule[high]
+        if inside:
+            return code
+    return len(rules)
+
+
+def test_classify_matches_a_per_row_loop():
+    rng = np.random.default_rng(0)
+    temperature = rng.uniform(-2, 32, 3000).astype(np.float32)
+    salinity = rng.uniform(32, 37, 3000).astype(np.float32)
+    # Values sitting exactly on rule bounds.
+    temperature[:6] = [5, 20, 20, 5, 30, np.nan]
+    salinity[:6] = [34, 34, 35, 33, 36, 35]
+    salinity[10] = np.nan
+    codes = classify(temperature, salinity)
+    expected = [classify_one(t, s, DEFAULT_RULES) for t, s in zip(temperature, salinity)]
+    np.testing.assert_array_equal(codes, expected)
+    assert codes.dtype == np.int8
+    assert categories(DEFAULT_RULES)[-1] == OTHER
+
+
+def test_polygon_rules_and_first_match_wins():
+    rules = [
+        {'name': 'triangle', 'polygon': [[34, 0], [36, 0], [35, 10]]},
+        {'name': 'cold', 't_max': 5.0},
+    ]
+    codes = classify(np.array([2.0, 2.0, 8.0, 20.0]), np.array([35.0, 33.0, 35.0, 35.0]), rules)
+    np.testing.assert_array_equal(codes, [0, 1, 0, 2])
+
+
+def test_chunked_labels_and_counts():
+    rng = np.random.default_rng(1)
+    columns = {'cast': np.zeros(1000, dtype=np.int64), 'Temperature': rng.uniform(-2, 30, 1000),
+               'Salinity': rng.uniform(32, 37, 1000)}
+    columns['Temperature'][::13] = np.nan
+    table = ObservationTable(columns, {}, np.array([0]), np.array([1000]))
+    out = np.empty(1000, dtype=np.int8)
+    label_water_masses(table, out, chunk_size=77)
+    expected = classify(columns['Temperature'], columns['Salinity'])
+    np.testing.assert_array_equal(out, expected)
+    counts = category_counts(out, len(categories(DEFAULT_RULES)), chunk_size=101)
+    np.testing.assert_array_equal(counts, np.bincount(expected[expected != MISSING], minlength=4))
+
+
+def test_file_labels_match_the_per_cast_loop(tmp_path):
+    path = str(tmp_path / 'wod.nc')
+    raw = write_wod(path, n_casts=150, seed=2, chunk=32)
+    expected = expected_rows(raw)
+    out = np.empty(len(expected['z']), dtype=np.int8)
+    with nc.Dataset(path) as dataset:
+        label_dataset(dataset, out, FILE_RULES, chunk_size=50)
+    np.testing.assert_array_equal(out, classify(expected['Temperature'], expected['Salinity'], FILE_RULES))
+    assert len(np.unique(out)) == 4
+
+
+def test_parse_polygon():
+    assert parse_polygon('34,0; 36, 0;35,10;') == [[34, 0], [36, 0], [35, 10]]
+    for text in ('abc', '34,0; 36; 35,10', '34,0; 36,0', '34,0,1; 36,0; 35,10', '34,nan; 36,0; 35,10'):
+        with pytest.raises(ValueError):
+            parse_polygon(text)